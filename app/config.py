@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -9,12 +10,116 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_MIN_SIZE: int = 5
     DATABASE_POOL_MAX_SIZE: int = 20
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    # Per-worker warmup: connections opened (and optionally prewarmed) before serving
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 0
+    DATABASE_POOL_WARMUP_TIMEOUT: float = 10.0
+    DATABASE_PREWARM_STATEMENTS: bool = False
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     REDIS_URL: str = "redis://localhost:6379/0"
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     LOG_LEVEL: str = "INFO"
 
+    # Worker startup budget (import + lifespan), logged as a warning when exceeded
+    STARTUP_TIME_BUDGET_MS: int = 2000
+
+    # Friend suggestions background refresh (safe to run in every worker)
+    FRIEND_SUGGESTIONS_JOB_ENABLED: bool = False
+    FRIEND_SUGGESTIONS_INTERVAL_SECONDS: float = 30.0
+    FRIEND_SUGGESTIONS_BATCH_SIZE: int = 100
+    FRIEND_SUGGESTIONS_TOP_K: int = 50
+
+    # In-process social graph snapshot for friendship/block point queries; requires
+    # CACHE_INVALIDATION_ENABLED when several workers or services write, or blocks made elsewhere
+    # stay unseen until the next reload
+    SOCIAL_GRAPH_ENABLED: bool = False
+    SOCIAL_GRAPH_RELOAD_SECONDS: float = 300.0
+    SOCIAL_GRAPH_COMPACT_THRESHOLD: int = 10000
+
+    # Cross-worker cache invalidation (LISTEN/NOTIFY, see sql/07_cache_invalidation.sql)
+    CACHE_INVALIDATION_ENABLED: bool = False
+    CACHE_INVALIDATION_KEEPALIVE_SECONDS: float = 30.0
+    CACHE_INVALIDATION_RECONNECT_MAX_SECONDS: float = 30.0
+
+    # Notification outbox dispatcher (safe to run in every worker)
+    NOTIFICATION_DISPATCHER_ENABLED: bool = False
+    NOTIFICATION_DISPATCH_INTERVAL_SECONDS: float = 2.0
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = 500
+    NOTIFICATION_SINK: str = "database"
+
+    # Social counter reconciliation (sql/15_social_counters.sql); one batch of users per tick
+    SOCIAL_COUNTERS_RECONCILE_ENABLED: bool = False
+    SOCIAL_COUNTERS_RECONCILE_INTERVAL_SECONDS: float = 60.0
+    SOCIAL_COUNTERS_RECONCILE_BATCH_SIZE: int = 1000
+
+    # Rows per server-side cursor fetch for NDJSON exports
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Block set export: format=auto answers a Bloom filter above this many users, else sorted binary UUIDs
+    BLOCK_SET_BLOOM_THRESHOLD: int = 10000
+    BLOCK_SET_BLOOM_FP_RATE: float = 0.001
+
+    # Idempotency-Key replay store ("memory" is per worker; use "redis" in production)
+    IDEMPOTENCY_BACKEND: str = "memory"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS: int = 30
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Single-flight coalescing of hot read SPs (TTL 0 = share in-flight calls only)
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_TTL_MS: int = 0
+
+    # Versioned cache of the list reads (memory | redis); writes invalidate by bumping user versions
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 262144
+
+    # Repeat views of the same profile count once per window (0 = count every view)
+    PROFILE_VIEW_DEDUP_WINDOW_SECONDS: int = 3600
+
+    # Per-IP route rate limits (disable for local load testing only)
+    RATE_LIMIT_ENABLED: bool = True
+
+    # Service storage: postgres (stored procedures) | memory (in-process mirror, benchmarks/tests only)
+    STORAGE_BACKEND: str = "postgres"
+
+    # Logging: rendered and written by a background thread; bounded queue drops (and counts) on overflow
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    # Sampled events, "event[@path prefix]=rate,..."; warnings, errors and 4xx/5xx requests are always kept
+    LOG_SAMPLE_RULES: str = "request_completed@/health=0.01"
+
+    # Per-request profiling: X-Profile-Token == admin token, or a random sample (middleware absent when disabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_ADMIN_TOKEN: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_OUTPUT_DIR: str = "/tmp/social-api-profiles"
+    PROFILING_MAX_FILES: int = 200
+
+    # Deadlines: X-Request-Timeout (ms) / X-Request-Deadline (epoch ms) cap statement_timeout; 0 = none
+    REQUEST_DEADLINES_ENABLED: bool = True
+    REQUEST_DEFAULT_TIMEOUT_MS: int = 0
+    # Requests still running after this long start watching for a client disconnect
+    REQUEST_DISCONNECT_WATCH_AFTER_MS: int = 100
+    # statement_timeout per repository SP call ("sp=ms,..."), SP_DEFAULT_TIMEOUT_MS for the rest; 0 = unlimited
+    SP_DEFAULT_TIMEOUT_MS: int = 0
+    SP_TIMEOUTS_MS: str = (
+        "sp_social_search_users=2000,"
+        "sp_social_search_user_ids=2000,"
+        "sp_social_get_who_viewed_my_profile=3000,"
+        "sp_social_get_who_viewed_my_profile_ids=3000"
+    )
+
+    # Tracing: sampled requests (or an incoming sampled traceparent) get spans; exporter file | memory
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORTER: str = "file"
+    TRACING_FILE_PATH: str = "/tmp/social-api-traces.jsonl"
+    TRACING_MEMORY_MAX_SPANS: int = 10000
+
     # API Documentation (Swagger UI / OpenAPI)
     ENABLE_DOCS: bool = True
     API_VERSION: str = "1.0.0"
@@ -23,4 +128,13 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+def __getattr__(name: str):
+    # `from app.config import settings` resolves lazily so importing this module
+    # never reads the environment on its own.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
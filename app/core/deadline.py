@@ -0,0 +1,127 @@
+"""
+Request deadlines and cancellation.
+
+DeadlineMiddleware gives every request a RequestDeadline in `current_deadline`
+(copied into the threadpool with the rest of the context). It expires at the
+earliest of `X-Request-Timeout` (ms from now), `X-Request-Deadline` (unix
+epoch ms) and REQUEST_DEFAULT_TIMEOUT_MS, or never. A client disconnect
+cancels it, which cancels the queries running for it.
+
+The repository turns the deadline and the SP's budget (SP_TIMEOUTS_MS, else
+SP_DEFAULT_TIMEOUT_MS) into the statement_timeout of each call, and raises
+DeadlineExceeded (504) or RequestCancelled (499) instead of running or
+finishing work nobody will read.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Set
+from app.config import get_settings
+from app.core.metrics import metrics
+
+class DeadlineExceeded(Exception):
+    status_code = 504
+
+class RequestCancelled(Exception):
+    status_code = 499
+
+class RequestDeadline:
+    def __init__(self, expires_at: Optional[float] = None):
+        # time.monotonic() based; None = no deadline
+        self.expires_at = expires_at
+        self.cancelled = False
+        self._connections: Set[Any] = set()
+        self._lock = threading.Lock()
+
+    def remaining_ms(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return (self.expires_at - time.monotonic()) * 1000
+
+    def check(self, what: str):
+        if self.cancelled:
+            metrics.increment("requests_cancelled", stage="before_call")
+            raise RequestCancelled(f"Client disconnected before {what}")
+        remaining = self.remaining_ms()
+        if remaining is not None and remaining <= 0:
+            metrics.increment("requests_deadline_exceeded", stage="before_call")
+            raise DeadlineExceeded(f"Request deadline passed before {what}")
+
+    def attach(self, conn):
+        """Register a connection running work for this request (cancelled on disconnect)"""
+        with self._lock:
+            if self.cancelled:
+                raise RequestCancelled("Client disconnected")
+            self._connections.add(conn)
+
+    def detach(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+
+    def cancel(self):
+        """Client went away: stop every query still running for it"""
+        # Under the lock, so a connection cannot be detached (and reused) mid-cancel
+        with self._lock:
+            self.cancelled = True
+            for conn in self._connections:
+                try:
+                    conn.cancel()
+                except Exception:
+                    pass
+
+def check_deadline(what: str):
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check(what)
+
+current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("current_deadline", default=None)
+
+def parse_deadline(timeout_header: Optional[str], deadline_header: Optional[str], default_timeout_ms: int) -> Optional[float]:
+    """Monotonic expiry from the request headers (malformed values are ignored)"""
+    now_monotonic = time.monotonic()
+    candidates = []
+    if default_timeout_ms > 0:
+        candidates.append(now_monotonic + default_timeout_ms / 1000)
+    try:
+        if timeout_header:
+            candidates.append(now_monotonic + float(timeout_header) / 1000)
+    except ValueError:
+        pass
+    try:
+        if deadline_header:
+            candidates.append(now_monotonic + float(deadline_header) / 1000 - time.time())
+    except ValueError:
+        pass
+    return min(candidates) if candidates else None
+
+@lru_cache
+def _sp_budgets() -> Dict[str, int]:
+    budgets = {}
+    for item in filter(None, (part.strip() for part in get_settings().SP_TIMEOUTS_MS.split(","))):
+        sp_name, ms = item.split("=", 1)
+        budgets[sp_name.strip()] = int(ms)
+    return budgets
+
+def statement_timeout_ms(sp_names: Iterable[str]) -> Optional[int]:
+    """
+    statement_timeout (ms) to SET LOCAL for a call, None to leave it unlimited.
+    Raises when the request's deadline has already passed.
+    """
+    default = get_settings().SP_DEFAULT_TIMEOUT_MS
+    budgets = _sp_budgets()
+    budget = None
+    for sp_name in sp_names:
+        sp_budget = budgets.get(sp_name, default)
+        # Several calls (a pipeline) share one timeout: unlimited (0) if any is, else the largest
+        budget = sp_budget if budget is None else (0 if 0 in (budget, sp_budget) else max(budget, sp_budget))
+    if budget is None:
+        budget = default
+
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check("the database call")
+        remaining = deadline.remaining_ms()
+        if remaining is not None and (budget == 0 or remaining < budget):
+            return max(1, int(remaining))
+    return budget or None
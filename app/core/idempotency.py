@@ -0,0 +1,148 @@
+"""
+Idempotency keys for POST endpoints.
+
+A client that sends `Idempotency-Key: <key>` gets the stored outcome of the
+first request with that key (per user) for IDEMPOTENCY_TTL_SECONDS, without the
+stored procedure running again. Concurrent duplicates wait for the first
+request to finish instead of executing in parallel.
+
+Outcomes are stored in Redis (IDEMPOTENCY_BACKEND=redis) or in a per-worker
+dict (memory, the default stand-in for development and tests).
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, Request, Response
+from app.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+class InMemoryIdempotencyStore:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float):
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    async def reserve(self, key: str, record: Dict, ttl: float) -> Optional[Dict]:
+        """Store `record` if the key is free and return None, else return the existing record"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            if len(self._entries) >= self.max_entries:
+                self._sweep(now)
+            self._entries[key] = (now + ttl, record)
+            return None
+
+    async def save(self, key: str, record: Dict, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, record)
+
+    async def release(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+class RedisIdempotencyStore:
+    async def reserve(self, key: str, record: Dict, ttl: float) -> Optional[Dict]:
+        from app.core.redis_client import get_redis
+        redis = get_redis()
+        if await redis.set(key, json.dumps(record), nx=True, px=int(ttl * 1000)):
+            return None
+        existing = await redis.get(key)
+        # Expired between SET and GET: treat as still in flight, the caller retries
+        return json.loads(existing) if existing else {"state": "in_flight", "fingerprint": record["fingerprint"]}
+
+    async def save(self, key: str, record: Dict, ttl: float):
+        from app.core.redis_client import get_redis
+        await get_redis().set(key, json.dumps(record, default=str), px=int(ttl * 1000))
+
+    async def release(self, key: str):
+        from app.core.redis_client import get_redis
+        await get_redis().delete(key)
+
+_store = None
+
+def get_idempotency_store():
+    global _store
+    if _store is None:
+        if get_settings().IDEMPOTENCY_BACKEND == "redis":
+            _store = RedisIdempotencyStore()
+        else:
+            _store = InMemoryIdempotencyStore()
+    return _store
+
+def _replay(record: Dict, response: Response) -> Any:
+    response.headers[REPLAYED_HEADER] = "true"
+    return record["body"]
+
+async def idempotent(request: Request, response: Response, user_id: str, handler: Callable[[], Any]) -> Any:
+    """
+    Run `handler` at most once per (user, Idempotency-Key).
+
+    Successful results are stored and replayed with the original status code;
+    errors release the key so the client's retry runs again.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+    settings = get_settings()
+    store = get_idempotency_store()
+    body = await request.body()
+    fingerprint = hashlib.sha256(request.method.encode() + request.url.path.encode() + b"\0" + body).hexdigest()
+    store_key = f"idempotency:{user_id}:{key}"
+    in_flight = {"state": "in_flight", "fingerprint": fingerprint}
+
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        try:
+            record = await store.reserve(store_key, in_flight, settings.IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS)
+        except Exception as e:
+            # The store is an optimization for retries; never fail the write because of it
+            logger.warning("idempotency_store_unavailable", error=str(e))
+            return handler()
+        if record is None:
+            break
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        if record["state"] == "completed":
+            logger.info("idempotent_replay", path=request.url.path)
+            return _replay(record, response)
+        if time.monotonic() >= deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(0.05)
+
+    try:
+        result = handler()
+    except BaseException:
+        # A failed SP rolled back, so there is nothing to protect: free the key
+        # and let the retry run (and fail or succeed) on its own
+        await store.release(store_key)
+        raise
+
+    try:
+        await store.save(store_key, {
+            "state": "completed",
+            "fingerprint": fingerprint,
+            "body": json.loads(json.dumps(result, default=str))
+        }, settings.IDEMPOTENCY_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("idempotency_store_unavailable", error=str(e))
+    return result
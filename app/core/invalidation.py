@@ -0,0 +1,134 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Triggers (sql/07_cache_invalidation.sql) publish `<kind>:<op>:<user_id>[:<user_id>]`
+on every change to friendships, blocks, favorites and user settings. Each worker
+runs one listener thread on a dedicated connection and dispatches the events to
+registered caches. After a lost connection the listener reconnects and flushes
+every cache wholesale, since notifications sent in between are gone.
+"""
+import select
+import threading
+import time
+from typing import List, NamedTuple, Optional, Protocol, Tuple
+import psycopg
+from app.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Fixed by the triggers in sql/07_cache_invalidation.sql
+CHANNEL = "social_invalidation"
+
+KINDS = {
+    "f": "friendship",
+    "b": "block",
+    "v": "favorite",
+    "s": "settings",
+}
+
+class InvalidationEvent(NamedTuple):
+    kind: str
+    op: str
+    user_ids: Tuple[str, ...]
+
+def parse_payload(payload: str) -> Optional[InvalidationEvent]:
+    parts = payload.split(":")
+    if len(parts) < 3 or parts[0] not in KINDS:
+        return None
+    return InvalidationEvent(KINDS[parts[0]], parts[1], tuple(parts[2:]))
+
+class InvalidationListener(Protocol):
+    def invalidate(self, event: InvalidationEvent) -> None: ...
+
+    def flush(self) -> None: ...
+
+class InvalidationBus:
+    def __init__(self):
+        self._caches: List[InvalidationListener] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[psycopg.Connection] = None
+
+    def register(self, cache: InvalidationListener):
+        self._caches.append(cache)
+
+    def dispatch(self, event: InvalidationEvent):
+        for cache in self._caches:
+            try:
+                cache.invalidate(event)
+            except Exception as e:
+                logger.error("cache_invalidation_failed", cache=type(cache).__name__, error=str(e))
+
+    def flush_all(self):
+        for cache in self._caches:
+            try:
+                cache.flush()
+            except Exception as e:
+                logger.error("cache_flush_failed", cache=type(cache).__name__, error=str(e))
+
+    def _on_notify(self, notify: psycopg.Notify):
+        event = parse_payload(notify.payload)
+        if event is None:
+            logger.warning("cache_invalidation_unknown_payload", payload=notify.payload)
+            return
+        self.dispatch(event)
+
+    def _connect(self) -> psycopg.Connection:
+        settings = get_settings()
+        conn = psycopg.connect(settings.DATABASE_URL, autocommit=True)
+        conn.add_notify_handler(self._on_notify)
+        conn.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _listen(self, conn: psycopg.Connection):
+        keepalive = get_settings().CACHE_INVALIDATION_KEEPALIVE_SECONDS
+        last_roundtrip = time.monotonic()
+        while not self._stop.is_set():
+            readable, _, _ = select.select([conn.fileno()], [], [], 1.0)
+            # Any round trip drains pending notifications into _on_notify and
+            # doubles as a liveness check of the connection.
+            if readable or time.monotonic() - last_roundtrip >= keepalive:
+                conn.execute("SELECT 1")
+                last_roundtrip = time.monotonic()
+
+    def run_forever(self):
+        backoff = 1.0
+        max_backoff = get_settings().CACHE_INVALIDATION_RECONNECT_MAX_SECONDS
+        disconnected = False
+        while not self._stop.is_set():
+            try:
+                self._conn = self._connect()
+                if disconnected:
+                    # Events may have been missed while we were away
+                    self.flush_all()
+                    logger.info("cache_invalidation_reconnected")
+                backoff = 1.0
+                disconnected = False
+                self._listen(self._conn)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                disconnected = True
+                logger.warning("cache_invalidation_disconnected", error=str(e), retry_in=backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, max_backoff)
+            finally:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="cache-invalidation", daemon=True)
+            self._thread.start()
+            logger.info("cache_invalidation_started", caches=[type(c).__name__ for c in self._caches])
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+invalidation_bus = InvalidationBus()
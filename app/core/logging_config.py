@@ -1,29 +1,214 @@
-import structlog
+import atexit
 import logging
+import os
+import queue
+import random
+import sys
+import threading
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+import orjson
+import structlog
+from app.core.metrics import metrics
+
+_STOP = object()
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode()
+
+def parse_sample_rules(spec: str) -> Dict[str, List[Tuple[Optional[str], float]]]:
+    """
+    "request_completed@/social/friends/status=0.01,cache_hit=0.1" ->
+    {"request_completed": [("/social/friends/status", 0.01)], "cache_hit": [(None, 0.1)]}
+    """
+    rules: Dict[str, List[Tuple[Optional[str], float]]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, rate = item.rsplit("=", 1)
+        event, _, path_prefix = key.strip().partition("@")
+        rules.setdefault(event, []).append((path_prefix or None, float(rate)))
+    return rules
+
+class EventSampler:
+    """
+    Keeps a fraction of the matching events, first matching rule wins.
+    Warnings, errors and requests that ended in a 4xx/5xx are always kept.
+    """
+
+    def __init__(self, rules: Dict[str, List[Tuple[Optional[str], float]]]):
+        self.rules = rules
+
+    def __call__(self, logger, method_name: str, event_dict: Dict) -> Dict:
+        rules = self.rules.get(event_dict.get("event"))
+        if rules is None or event_dict.get("level") not in ("debug", "info"):
+            return event_dict
+        if (event_dict.get("status_code") or 0) >= 400:
+            return event_dict
+        path = event_dict.get("path", "")
+        for path_prefix, rate in rules:
+            if path_prefix is None or path.startswith(path_prefix):
+                if random.random() >= rate:
+                    metrics.increment("log_events_sampled_out", event=event_dict["event"])
+                    raise structlog.DropEvent
+                return event_dict
+        return event_dict
+
+def _capture_exc_info(logger, method_name: str, event_dict: Dict) -> Dict:
+    # sys.exc_info() is only meaningful on the thread that logged
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+def _to_writer(logger, method_name: str, event_dict: Dict):
+    # Last processor: hand the dict itself to LogWriterLogger.msg instead of **kwargs
+    return (event_dict,), {}
+
+class LogWriter:
+    """
+    Renders event dicts and writes them to the stream. With a queue, submit()
+    is a put_nowait and a daemon thread renders and writes; a full queue drops
+    the event rather than block the request. Without one, it is done inline.
+    """
+
+    def __init__(self, render: Callable[[Dict], str], stream: IO, queue_size: Optional[int]):
+        self.render = render
+        self.stream = stream
+        self.queue: Optional[queue.Queue] = queue.Queue(maxsize=queue_size) if queue_size else None
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        if self.queue is not None:
+            self._start()
+
+    def _start(self):
+        self.thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, event_dict: Dict):
+        if self.queue is None:
+            self._write(event_dict)
+            return
+        try:
+            self.queue.put_nowait(event_dict)
+        except queue.Full:
+            metrics.increment("log_events_dropped")
 
-def setup_logging(environment: str):
-    processors = [
-        structlog.contextvars.merge_contextvars,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.add_logger_name,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-    ]
+    def _write(self, event_dict: Dict, flush: bool = True):
+        try:
+            line = self.render(event_dict)
+            with self.lock:
+                self.stream.write(line + "\n")
+                if flush:
+                    self.stream.flush()
+        except Exception:
+            # Logging must never take the caller down
+            pass
+
+    def _drain(self):
+        while True:
+            event_dict = self.queue.get()
+            if event_dict is _STOP:
+                try:
+                    self.stream.flush()
+                except Exception:
+                    pass
+                return
+            # Flush once per burst rather than per line
+            self._write(event_dict, flush=self.queue.empty())
+
+    def stop(self):
+        """Writes out what is queued, then stops the thread"""
+        if self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join()
+            self.thread = None
+
+    def after_fork(self):
+        # Threads do not survive fork: a pre-forked worker gets its own queue and thread
+        if self.queue is not None:
+            self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self.lock = threading.Lock()
+            self._start()
+
+class LogWriterLogger:
+    """
+    structlog logger for the current LogWriter; every level method submits the
+    event dict. Looked up per call so cached loggers follow a reconfiguration.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+
+    def msg(self, event_dict: Dict):
+        _writer.submit(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+_writer: Optional[LogWriter] = None
+_stdlib_handler: Optional[logging.Handler] = None
+
+def _stop_writer():
+    if _writer is not None:
+        _writer.stop()
+
+def _restart_writer_after_fork():
+    if _writer is not None:
+        _writer.after_fork()
+
+# Flush whatever is still queued when the process exits
+atexit.register(_stop_writer)
+os.register_at_fork(after_in_child=_restart_writer_after_fork)
+
+def setup_logging(environment: str, use_queue: bool = True, queue_size: int = 10000, sample_rules: str = "",
+                  stream: Optional[IO] = None):
+    """
+    Structlog events skip the stdlib logging machinery: the caller filters,
+    samples and stamps the event, and LogWriter renders it (JSON via orjson in
+    production) on a background thread, so a request pays for a put_nowait.
+    Plain stdlib records (uvicorn, psycopg) are rendered the same way, inline.
+    """
+    global _writer, _stdlib_handler
+    stream = stream or sys.stderr
+    timestamper = structlog.processors.TimeStamper(fmt="iso")
 
     if environment == "production":
-        processors.append(structlog.processors.JSONRenderer())
+        renderers = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer(serializer=_orjson_dumps)]
     else:
-        processors.append(structlog.dev.ConsoleRenderer())
+        renderers = [structlog.dev.ConsoleRenderer()]
+
+    def render(event_dict: Dict[str, Any]) -> str:
+        for processor in renderers:
+            event_dict = processor(None, "", event_dict)
+        return event_dict
+
+    _stop_writer()
+    _writer = LogWriter(render, stream, queue_size if use_queue else None)
 
     structlog.configure(
-        processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            EventSampler(parse_sample_rules(sample_rules)),
+            structlog.stdlib.add_logger_name,
+            timestamper,
+            structlog.processors.StackInfoRenderer(),
+            _capture_exc_info,
+            _to_writer,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        logger_factory=LogWriterLogger,
         cache_logger_on_first_use=True,
     )
 
-    logging.basicConfig(format="%(message)s", level=logging.INFO)
+    stdlib_handler = logging.StreamHandler(stream)
+    stdlib_handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, *renderers],
+        foreign_pre_chain=[structlog.stdlib.add_log_level, structlog.stdlib.add_logger_name, timestamper],
+    ))
+    root = logging.getLogger()
+    if _stdlib_handler is not None:
+        root.removeHandler(_stdlib_handler)
+    _stdlib_handler = stdlib_handler
+    root.addHandler(stdlib_handler)
+    root.setLevel(logging.INFO)
 
 def get_logger(name: str):
     return structlog.get_logger(name)
@@ -0,0 +1,40 @@
+"""
+In-process counters exposed on GET /metrics.
+
+Counters are per worker and reset on restart; they are meant for spotting
+trends (coalescing rate, cache hit rate) rather than as a billing-grade source.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+class Metrics:
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> str:
+        if not labels:
+            return name
+        rendered = ",".join(f'{label}="{value}"' for label, value in sorted(labels.items()))
+        return f"{name}{{{rendered}}}"
+
+    def increment(self, name: str, value: int = 1, **labels: str):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def get(self, name: str, **labels: str) -> int:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"counters": dict(sorted(self._counters.items()))}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
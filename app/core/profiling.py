@@ -0,0 +1,12 @@
+"""
+Stored procedure timings of the request being profiled.
+
+The profiling middleware sets a list in `current_sp_timings` for the requests
+it profiles; the repository appends (sp_name, ms) to it. For every other
+request the variable is None and the hook is a single ContextVar.get().
+The list is shared with the threadpool: run_in_threadpool copies the context.
+"""
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+current_sp_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("current_sp_timings", default=None)
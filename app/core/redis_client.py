@@ -0,0 +1,30 @@
+from typing import Optional
+import redis
+from redis.asyncio import Redis
+from app.config import get_settings
+
+_redis: Optional[Redis] = None
+_sync_redis: Optional[redis.Redis] = None
+
+def get_redis() -> Redis:
+    """Shared async Redis client, created on first use in each worker"""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(get_settings().REDIS_URL, decode_responses=True)
+    return _redis
+
+def get_sync_redis() -> redis.Redis:
+    """Shared blocking Redis client for code running in the threadpool (services)"""
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = redis.Redis.from_url(get_settings().REDIS_URL, decode_responses=True)
+    return _sync_redis
+
+async def close_redis():
+    global _redis, _sync_redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if _sync_redis is not None:
+        _sync_redis.close()
+        _sync_redis = None
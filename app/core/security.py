@@ -2,7 +2,8 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.config import settings
-from app.utils.database import get_db_connection
+from app.core.tracing import span
+from app.repositories.base import get_repository
 from typing import Dict
 
 security = HTTPBearer()
@@ -10,9 +11,13 @@ security = HTTPBearer()
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict:
-    token = credentials.credentials
+    with span("auth.get_current_user"):
+        return _authenticate(credentials.credentials)
+
+def _authenticate(token: str) -> Dict:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        with span("auth.jwt_decode"):
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         user_id = payload.get("sub")
 
         if not user_id:
@@ -28,22 +33,17 @@ async def get_current_user(
 
         # If email not in token, fetch user details from database
         if not email:
-            with get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(
-                        "SELECT email, subscription_level FROM activity.users WHERE user_id = %s",
-                        (user_id,)
-                    )
-                    row = cursor.fetchone()
-                    if not row:
-                        raise HTTPException(
-                            status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="User not found"
-                        )
-                    email, subscription_level = row
-                    # ghost_mode not in database, default to False
-                    if ghost_mode is None:
-                        ghost_mode = False
+            with span("auth.user_lookup"):
+                row = get_repository().get_user(user_id)
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            email, subscription_level = row
+            # ghost_mode not in database, default to False
+            if ghost_mode is None:
+                ghost_mode = False
 
         return {
             "user_id": user_id,
@@ -0,0 +1,191 @@
+"""
+Request tracing: spans for the request, auth, pool checkout and SP calls.
+
+A trace starts in TracingMiddleware, continuing the caller's W3C
+`traceparent` when there is one (and honouring its sampled flag), otherwise
+sampled at TRACING_SAMPLE_RATE. The active span lives in a ContextVar, so it
+follows the request into the threadpool. Outside a sampled trace `span()`
+returns a shared no-op context manager: one ContextVar lookup per call site.
+
+Finished spans go to an exporter that works offline: "file" appends JSON
+lines to TRACING_FILE_PATH, "memory" keeps the last spans in process (tests,
+benchmarks). Spans carry W3C ids, so a file export can be loaded into any
+tracing backend later.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional
+import orjson
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current_span.reset(self._token)
+        if _tracer is not None:
+            _tracer.exporter.export(self)
+        return False
+
+class _NoopSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class InMemoryExporter:
+    def __init__(self, max_spans: int = 10000):
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self.spans.append(span.to_dict())
+
+    def clear(self):
+        self.spans.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class FileExporter:
+    """
+    JSON lines appended to `path`, flushed once per finished trace. Opened on
+    first use in each process, so pre-forked workers never share a buffer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = orjson.dumps(span.to_dict(), default=str) + b"\n"
+        with self._lock:
+            if self._pid != os.getpid():
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, "ab")
+                self._pid = os.getpid()
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.close()
+            self._file = None
+            self._pid = None
+
+class Tracer:
+    def __init__(self, exporter, sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, **attributes: Any) -> Optional[Span]:
+        """Root span of a request, or None when the request is not sampled"""
+        match = TRACEPARENT_RE.match(traceparent) if traceparent else None
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+            return Span(name, trace_id, parent_id, attributes)
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        return Span(name, os.urandom(16).hex(), None, attributes)
+
+    def shutdown(self):
+        self.exporter.close()
+
+_tracer: Optional[Tracer] = None
+
+def create_exporter(kind: str, file_path: str, max_spans: int):
+    if kind == "file":
+        return FileExporter(file_path)
+    if kind == "memory":
+        return InMemoryExporter(max_spans)
+    raise ValueError(f"Unknown tracing exporter: {kind}")
+
+def configure_tracing(exporter, sample_rate: float) -> Tracer:
+    global _tracer
+    if _tracer is not None:
+        _tracer.shutdown()
+    _tracer = Tracer(exporter, sample_rate)
+    return _tracer
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+def shutdown_tracing():
+    global _tracer
+    if _tracer is not None:
+        _tracer.shutdown()
+        _tracer = None
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_traceparent() -> Optional[str]:
+    """Header value for outgoing calls made inside a sampled trace"""
+    parent = _current_span.get()
+    return parent.traceparent if parent is not None else None
+
+def span(name: str, **attributes: Any):
+    """Child of the current span; a no-op outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP
+    return Span(name, parent.trace_id, parent.span_id, attributes)
@@ -0,0 +1,167 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+from uuid import UUID
+from app.config import get_settings
+from app.core.logging_config import get_logger
+from app.graph.snapshot import FriendshipRecord, SocialGraphSnapshot
+from app.utils.database import get_db_connection
+
+logger = get_logger(__name__)
+
+FRIENDSHIP_COPY_SQL = """
+    COPY (
+        SELECT user_id_1, user_id_2, status, initiated_by, created_at, accepted_at
+        FROM activity.friendships
+    ) TO STDOUT
+"""
+BLOCK_COPY_SQL = """
+    COPY (SELECT blocker_user_id, blocked_user_id FROM activity.user_blocks) TO STDOUT
+"""
+
+def _normalize(user_id: str) -> str:
+    return str(UUID(str(user_id)))
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+class SocialGraphManager:
+    """
+    Owns the worker's current SocialGraphSnapshot.
+
+    Services read from it when `ready` and feed it their committed writes.
+    Writes made by other workers arrive through the invalidation bus; a
+    periodic reload bounds drift if notifications are ever missed.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[SocialGraphSnapshot] = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._replay: List[Callable[[SocialGraphSnapshot], None]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.snapshot is not None
+
+    def load(self) -> dict:
+        """Bulk-load a fresh snapshot with COPY and swap it in"""
+        started = time.perf_counter()
+        with self._lock:
+            self._loading = True
+            self._replay = []
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    with cursor.copy(FRIENDSHIP_COPY_SQL) as copy:
+                        copy.set_types(["uuid", "uuid", "text", "uuid", "timestamptz", "timestamptz"])
+                        friendship_rows = list(copy.rows())
+                    with cursor.copy(BLOCK_COPY_SQL) as copy:
+                        copy.set_types(["uuid", "uuid"])
+                        block_rows = list(copy.rows())
+                conn.rollback()
+            snapshot = SocialGraphSnapshot.build(friendship_rows, block_rows)
+        finally:
+            with self._lock:
+                replay, self._replay, self._loading = self._replay, [], False
+
+        with self._lock:
+            # Changes that arrived while the snapshot was being read
+            for change in replay:
+                change(snapshot)
+            self.snapshot = snapshot
+
+        usage = snapshot.memory_usage()
+        logger.info(
+            "social_graph_loaded",
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            **usage
+        )
+        return usage
+
+    def clear(self):
+        with self._lock:
+            self.snapshot = None
+
+    def _apply(self, change: Callable[[SocialGraphSnapshot], None]):
+        with self._lock:
+            if self._loading:
+                self._replay.append(change)
+            if self.snapshot is None:
+                return
+            change(self.snapshot)
+            if self.snapshot.overlay_size > get_settings().SOCIAL_GRAPH_COMPACT_THRESHOLD:
+                self.snapshot = self.snapshot.compact()
+
+    # Change feed -------------------------------------------------------
+
+    def friendship_changed(self, user_id_1: str, user_id_2: str, record: Optional[FriendshipRecord]):
+        user_id_1, user_id_2 = _normalize(user_id_1), _normalize(user_id_2)
+        self._apply(lambda snapshot: snapshot.set_friendship(user_id_1, user_id_2, record))
+
+    def friendship_requested(self, requester_id: str, target_id: str, created_at=None):
+        self.friendship_changed(requester_id, target_id, FriendshipRecord(
+            "pending", _normalize(requester_id), _parse_timestamp(created_at), None
+        ))
+
+    def friendship_accepted(self, user_id_1: str, user_id_2: str, result: dict):
+        self.friendship_changed(user_id_1, user_id_2, FriendshipRecord(
+            "accepted",
+            _normalize(result["initiated_by"]),
+            _parse_timestamp(result.get("created_at")),
+            _parse_timestamp(result.get("accepted_at"))
+        ))
+
+    def block_changed(self, blocker_id: str, blocked_id: str, exists: bool):
+        blocker_id, blocked_id = _normalize(blocker_id), _normalize(blocked_id)
+        self._apply(lambda snapshot: snapshot.set_block(blocker_id, blocked_id, exists))
+
+    def refresh_friendship(self, user_id_1: str, user_id_2: str):
+        """Re-read one pair from the database (used for changes made elsewhere)"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT status, initiated_by::text, created_at, accepted_at
+                    FROM activity.friendships
+                    WHERE user_id_1 = LEAST(%s::uuid, %s::uuid)
+                    AND user_id_2 = GREATEST(%s::uuid, %s::uuid)
+                    """,
+                    (user_id_1, user_id_2, user_id_1, user_id_2)
+                )
+                row = cursor.fetchone()
+            conn.rollback()
+        self.friendship_changed(user_id_1, user_id_2, FriendshipRecord(*row) if row else None)
+
+    # Invalidation bus --------------------------------------------------
+
+    def invalidate(self, event):
+        if not self.ready:
+            return
+        if event.kind == "friendship":
+            self.refresh_friendship(*event.user_ids)
+        elif event.kind == "block":
+            self.block_changed(*event.user_ids, exists=event.op != "D")
+
+    def flush(self):
+        if self.ready:
+            self.load()
+
+    # Queries -----------------------------------------------------------
+
+    def friendship_status(self, user_id_1: str, user_id_2: str) -> dict:
+        return self.snapshot.friendship_status(_normalize(user_id_1), _normalize(user_id_2))
+
+    def block_status(self, user_id_1: str, user_id_2: str) -> dict:
+        return self.snapshot.block_status(_normalize(user_id_1), _normalize(user_id_2))
+
+    def can_interact(self, user_id_1: str, user_id_2: str, activity_type: str = "standard") -> dict:
+        return self.snapshot.can_interact(_normalize(user_id_1), _normalize(user_id_2), activity_type)
+
+    def mutual_friend_counts(self, user_id: str, target_ids: List[str]) -> dict:
+        return self.snapshot.mutual_friend_counts(_normalize(user_id), [_normalize(t) for t in target_ids])
+
+social_graph = SocialGraphManager()
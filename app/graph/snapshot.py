@@ -0,0 +1,333 @@
+"""
+Compact in-memory snapshot of the social graph.
+
+UUIDs are mapped to dense integer ids and adjacency is stored CSR-style:
+`offsets[u]..offsets[u + 1]` indexes a sorted slice of `targets`. Accepted
+friendships are stored in both directions with per-edge timestamps; pending
+requests are few and kept in a dict. Blocks are stored blocker -> blocked.
+
+The CSR arrays are immutable. Changes from the change feed go into small
+per-user overlays that are merged on read; `compact()` folds them into a new
+snapshot.
+
+Reads take no lock while the manager applies changes from other threads, so
+the friend overlay is copy-on-write: a change builds new dicts and publishes
+them with one reference swap, and readers never see a dict being mutated or
+only one side of a pair.
+"""
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Overlay marker for an edge removed since the last compaction
+REMOVED = None
+
+class FriendshipRecord(NamedTuple):
+    """Current activity.friendships row for one pair"""
+    status: str
+    initiated_by: str
+    created_at: Optional[datetime]
+    accepted_at: Optional[datetime]
+
+def _to_epoch(value: Optional[datetime]) -> float:
+    return value.timestamp() if value is not None else math.nan
+
+def _from_epoch(value: float) -> Optional[datetime]:
+    return None if math.isnan(value) else datetime.fromtimestamp(value, tz=timezone.utc)
+
+class SocialGraphSnapshot:
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._uuids: List[str] = []
+        self._base_size = 0
+
+        # Accepted friendships (both directions)
+        self._friend_offsets = array("i", [0])
+        self._friend_targets = array("i")
+        self._friend_initiated = array("b")  # 1 when the row owner sent the request
+        self._friend_created_at = array("d")
+        self._friend_accepted_at = array("d")
+
+        # Non-accepted rows keyed by (min dense id, max dense id):
+        # (status, initiated_by dense id, created_at, accepted_at)
+        self._pending: Dict[Tuple[int, int], Tuple[str, int, float, float]] = {}
+
+        # Blocks (blocker -> blocked)
+        self._block_offsets = array("i", [0])
+        self._block_targets = array("i")
+
+        # Overlays: user -> {other user -> FriendshipRecord | REMOVED}
+        self._friend_overlay: Dict[int, Dict[int, Optional[FriendshipRecord]]] = {}
+        # (blocker, blocked) -> exists
+        self._block_overlay: Dict[Tuple[int, int], bool] = {}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, friendship_rows: Iterable[tuple], block_rows: Iterable[tuple]) -> "SocialGraphSnapshot":
+        """
+        Build a snapshot from activity.friendships rows
+        (user_id_1, user_id_2, status, initiated_by, created_at, accepted_at)
+        and activity.user_blocks rows (blocker_user_id, blocked_user_id).
+        """
+        graph = cls()
+        friend_edges: List[Tuple[int, int, int, float, float]] = []
+        for user_id_1, user_id_2, status, initiated_by, created_at, accepted_at in friendship_rows:
+            u = graph._intern(str(user_id_1))
+            v = graph._intern(str(user_id_2))
+            initiated_by = str(initiated_by)
+            if status == "accepted":
+                created, accepted = _to_epoch(created_at), _to_epoch(accepted_at)
+                friend_edges.append((u, v, int(initiated_by == str(user_id_1)), created, accepted))
+                friend_edges.append((v, u, int(initiated_by == str(user_id_2)), created, accepted))
+            else:
+                graph._pending[(min(u, v), max(u, v))] = (
+                    status, graph._intern(initiated_by), _to_epoch(created_at), _to_epoch(accepted_at)
+                )
+
+        block_edges: List[Tuple[int, int]] = []
+        for blocker, blocked in block_rows:
+            block_edges.append((graph._intern(str(blocker)), graph._intern(str(blocked))))
+
+        graph._load_friend_edges(friend_edges)
+        graph._load_block_edges(block_edges)
+        return graph
+
+    def _intern(self, user_id: str) -> int:
+        dense = self._ids.get(user_id)
+        if dense is None:
+            dense = len(self._uuids)
+            self._ids[user_id] = dense
+            self._uuids.append(user_id)
+        return dense
+
+    def _load_friend_edges(self, edges: List[Tuple[int, int, int, float, float]]):
+        edges.sort()
+        size = len(self._uuids)
+        offsets = array("i", [0]) * (size + 1)
+        for source, *_ in edges:
+            offsets[source + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        self._friend_offsets = offsets
+        self._friend_targets = array("i", (edge[1] for edge in edges))
+        self._friend_initiated = array("b", (edge[2] for edge in edges))
+        self._friend_created_at = array("d", (edge[3] for edge in edges))
+        self._friend_accepted_at = array("d", (edge[4] for edge in edges))
+        self._base_size = size
+
+    def _load_block_edges(self, edges: List[Tuple[int, int]]):
+        edges = sorted(set(edges))
+        size = len(self._uuids)
+        offsets = array("i", [0]) * (size + 1)
+        for source, _ in edges:
+            offsets[source + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        self._block_offsets = offsets
+        self._block_targets = array("i", (edge[1] for edge in edges))
+
+    # ------------------------------------------------------------------
+    # Base (CSR) lookups
+    # ------------------------------------------------------------------
+
+    def _friend_slice(self, u: int) -> Tuple[int, int]:
+        if u >= len(self._friend_offsets) - 1:
+            return 0, 0
+        return self._friend_offsets[u], self._friend_offsets[u + 1]
+
+    def _base_friend_index(self, u: int, v: int) -> int:
+        start, end = self._friend_slice(u)
+        i = bisect_left(self._friend_targets, v, start, end)
+        if i < end and self._friend_targets[i] == v:
+            return i
+        return -1
+
+    def _base_blocked(self, blocker: int, blocked: int) -> bool:
+        if blocker >= len(self._block_offsets) - 1:
+            return False
+        start, end = self._block_offsets[blocker], self._block_offsets[blocker + 1]
+        i = bisect_left(self._block_targets, blocked, start, end)
+        return i < end and self._block_targets[i] == blocked
+
+    def _base_record(self, u: int, v: int) -> Optional[FriendshipRecord]:
+        i = self._base_friend_index(u, v)
+        if i >= 0:
+            initiated_by = self._uuids[u] if self._friend_initiated[i] else self._uuids[v]
+            return FriendshipRecord(
+                "accepted",
+                initiated_by,
+                _from_epoch(self._friend_created_at[i]),
+                _from_epoch(self._friend_accepted_at[i])
+            )
+        pending = self._pending.get((min(u, v), max(u, v)))
+        if pending is not None:
+            status, initiator, created_at, accepted_at = pending
+            return FriendshipRecord(status, self._uuids[initiator], _from_epoch(created_at), _from_epoch(accepted_at))
+        return None
+
+    # ------------------------------------------------------------------
+    # Merged lookups
+    # ------------------------------------------------------------------
+
+    def _record(self, u: int, v: int) -> Optional[FriendshipRecord]:
+        overlay = self._friend_overlay.get(u)
+        if overlay is not None and v in overlay:
+            return overlay[v]
+        return self._base_record(u, v)
+
+    def _friends(self, u: int) -> Set[int]:
+        start, end = self._friend_slice(u)
+        friends = set(self._friend_targets[start:end])
+        overlay = self._friend_overlay.get(u)
+        if overlay:
+            for v, record in overlay.items():
+                if record is not REMOVED and record.status == "accepted":
+                    friends.add(v)
+                else:
+                    friends.discard(v)
+        return friends
+
+    def _blocked(self, blocker: int, blocked: int) -> bool:
+        exists = self._block_overlay.get((blocker, blocked))
+        if exists is not None:
+            return exists
+        return self._base_blocked(blocker, blocked)
+
+    # ------------------------------------------------------------------
+    # Queries (response shapes match the corresponding SPs)
+    # ------------------------------------------------------------------
+
+    def friendship_status(self, user_id_1: str, user_id_2: str) -> Dict:
+        u, v = self._ids.get(user_id_1), self._ids.get(user_id_2)
+        record = self._record(u, v) if u is not None and v is not None else None
+        if record is None:
+            return {"status": "none"}
+        return {
+            "status": record.status,
+            "initiated_by": record.initiated_by,
+            "created_at": record.created_at,
+            "accepted_at": record.accepted_at
+        }
+
+    def block_status(self, user_id_1: str, user_id_2: str) -> Dict:
+        u, v = self._ids.get(user_id_1), self._ids.get(user_id_2)
+        u_blocked_v = u is not None and v is not None and self._blocked(u, v)
+        v_blocked_u = u is not None and v is not None and self._blocked(v, u)
+        return {
+            "user_1_blocked_user_2": u_blocked_v,
+            "user_2_blocked_user_1": v_blocked_u,
+            "any_block_exists": u_blocked_v or v_blocked_u
+        }
+
+    def can_interact(self, user_id_1: str, user_id_2: str, activity_type: str = "standard") -> Dict:
+        if activity_type == "xxl":
+            return {"can_interact": True, "reason": "xxl_exception", "activity_type": activity_type}
+        blocked = self.block_status(user_id_1, user_id_2)["any_block_exists"]
+        return {
+            "can_interact": not blocked,
+            "reason": "blocked" if blocked else "no_blocks",
+            "activity_type": activity_type
+        }
+
+    def friend_count(self, user_id: str) -> int:
+        u = self._ids.get(user_id)
+        return len(self._friends(u)) if u is not None else 0
+
+    def mutual_friend_count(self, user_id_1: str, user_id_2: str) -> int:
+        u, v = self._ids.get(user_id_1), self._ids.get(user_id_2)
+        if u is None or v is None:
+            return 0
+        return len(self._friends(u) & self._friends(v))
+
+    def mutual_friend_counts(self, user_id: str, target_ids: Iterable[str]) -> Dict:
+        u = self._ids.get(user_id)
+        mine = self._friends(u) if u is not None else set()
+        counts = {}
+        for target_id in dict.fromkeys(target_ids):
+            if target_id == user_id:
+                continue
+            v = self._ids.get(target_id)
+            counts[target_id] = len(mine & self._friends(v)) if v is not None else 0
+        return {"counts": counts}
+
+    # ------------------------------------------------------------------
+    # Change feed
+    # ------------------------------------------------------------------
+
+    def set_friendship(self, user_id_1: str, user_id_2: str, record: Optional[FriendshipRecord]):
+        """Record the current row for a pair (None when the row was deleted); callers serialize writes"""
+        u, v = self._intern(user_id_1), self._intern(user_id_2)
+        overlay = dict(self._friend_overlay)
+        overlay[u] = {**overlay.get(u, {}), v: record}
+        overlay[v] = {**overlay.get(v, {}), u: record}
+        self._friend_overlay = overlay
+
+    def set_block(self, blocker_id: str, blocked_id: str, exists: bool):
+        # Readers only look up single keys, which a concurrent insert cannot break
+        self._block_overlay[(self._intern(blocker_id), self._intern(blocked_id))] = exists
+
+    @property
+    def overlay_size(self) -> int:
+        return sum(len(entries) for entries in self._friend_overlay.values()) + len(self._block_overlay)
+
+    def compact(self) -> "SocialGraphSnapshot":
+        """Return a new snapshot with the overlays folded into fresh CSR arrays"""
+        pairs = set(self._pending)
+        for u in range(self._base_size):
+            start, end = self._friend_slice(u)
+            pairs.update((u, v) for v in self._friend_targets[start:end] if u < v)
+        for u, entries in self._friend_overlay.items():
+            pairs.update((min(u, v), max(u, v)) for v in entries)
+
+        friend_rows = []
+        for u, v in pairs:
+            record = self._record(u, v)
+            if record is not None:
+                friend_rows.append((self._uuids[u], self._uuids[v], record.status,
+                                    record.initiated_by, record.created_at, record.accepted_at))
+        block_rows = []
+        for blocker in range(len(self._uuids)):
+            if blocker < len(self._block_offsets) - 1:
+                for i in range(self._block_offsets[blocker], self._block_offsets[blocker + 1]):
+                    blocked = self._block_targets[i]
+                    if self._block_overlay.get((blocker, blocked), True):
+                        block_rows.append((self._uuids[blocker], self._uuids[blocked]))
+        for (blocker, blocked), exists in self._block_overlay.items():
+            if exists and not self._base_blocked(blocker, blocked):
+                block_rows.append((self._uuids[blocker], self._uuids[blocked]))
+
+        return SocialGraphSnapshot.build(friend_rows, block_rows)
+
+    # ------------------------------------------------------------------
+    # Accounting
+    # ------------------------------------------------------------------
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by the snapshot, by component"""
+        def array_bytes(*arrays):
+            return sum(a.itemsize * len(a) for a in arrays)
+
+        id_map = sys.getsizeof(self._ids) + sys.getsizeof(self._uuids) + sum(sys.getsizeof(u) for u in self._uuids)
+        friends = array_bytes(self._friend_offsets, self._friend_targets, self._friend_initiated,
+                              self._friend_created_at, self._friend_accepted_at)
+        blocks = array_bytes(self._block_offsets, self._block_targets)
+        pending = sys.getsizeof(self._pending) + len(self._pending) * 120
+        overlay = sys.getsizeof(self._friend_overlay) + sys.getsizeof(self._block_overlay) + self.overlay_size * 100
+        return {
+            "users": len(self._uuids),
+            "friend_edges": len(self._friend_targets),
+            "pending_requests": len(self._pending),
+            "block_edges": len(self._block_targets),
+            "id_map_bytes": id_map,
+            "friend_bytes": friends,
+            "block_bytes": blocks,
+            "pending_bytes": pending,
+            "overlay_bytes": overlay,
+            "total_bytes": id_map + friends + blocks + pending + overlay
+        }
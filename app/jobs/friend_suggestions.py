@@ -0,0 +1,55 @@
+"""
+Friend suggestion refresher.
+
+Drains activity.friend_suggestion_refresh_queue (filled by triggers on
+friendships and blocks) and recomputes the top-K suggestions per user.
+
+    python -m app.jobs.friend_suggestions            # run continuously
+    python -m app.jobs.friend_suggestions --once     # drain one batch
+    python -m app.jobs.friend_suggestions --full     # enqueue every user first
+"""
+import argparse
+from app.config import get_settings
+from app.core.logging_config import setup_logging, get_logger
+from app.jobs.runner import PeriodicJob
+from app.services.friend_suggestion_service import FriendSuggestionService
+from app.utils.database import close_pool
+
+logger = get_logger(__name__)
+
+def refresh_queued_suggestions() -> dict:
+    settings = get_settings()
+    return FriendSuggestionService().refresh_queued_suggestions(
+        batch_size=settings.FRIEND_SUGGESTIONS_BATCH_SIZE,
+        top_k=settings.FRIEND_SUGGESTIONS_TOP_K
+    )
+
+def create_job() -> PeriodicJob:
+    return PeriodicJob(
+        "friend_suggestions",
+        refresh_queued_suggestions,
+        get_settings().FRIEND_SUGGESTIONS_INTERVAL_SECONDS
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh precomputed friend suggestions")
+    parser.add_argument("--once", action="store_true", help="Drain a single batch and exit")
+    parser.add_argument("--full", action="store_true", help="Enqueue all users with friends before draining")
+    args = parser.parse_args()
+
+    setup_logging(get_settings().ENVIRONMENT)
+    try:
+        if args.full:
+            logger.info("friend_suggestions_enqueued", **FriendSuggestionService().enqueue_all_users())
+        job = create_job()
+        if args.once:
+            logger.info("friend_suggestions_refreshed", result=job.run_once())
+            return
+        job.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Notification dispatcher.
+
+Drains activity.social_event_outbox (filled by the write SPs in the same
+transaction as the write) in batches and hands the events to a sink. Events are
+claimed, delivered and deleted in one transaction, so a failing sink leaves them
+in the outbox for the next run. When a batch fails, its events are delivered one
+by one and those that fail on their own are dropped (logged), so one bad event
+cannot hold back the queue; if every event fails, the sink is assumed down and
+the batch stays.
+
+    python -m app.jobs.notification_dispatcher           # run continuously
+    python -m app.jobs.notification_dispatcher --once    # drain once and exit
+
+NOTIFICATION_SINK selects the sink: "database" (activity.notifications), "log",
+or "package.module:ClassName" for a custom NotificationSink. Events carry the
+actor as written; the database sink hides who viewed or favorited a recipient
+without Premium/Club, and a custom sink that shows actors must do the same.
+"""
+import argparse
+import importlib
+import json
+from typing import Dict, List, Protocol
+from app.config import get_settings
+from app.core.logging_config import setup_logging, get_logger
+from app.core.metrics import metrics
+from app.jobs.runner import PeriodicJob
+from app.utils.database import close_pool, get_db_connection
+
+logger = get_logger(__name__)
+
+class NotificationSink(Protocol):
+    def deliver(self, conn, events: List[Dict]) -> int:
+        """Deliver events (ordered by event_id); runs inside the claiming transaction"""
+        ...
+
+class DatabaseNotificationSink:
+    def deliver(self, conn, events: List[Dict]) -> int:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT activity.sp_social_insert_notifications(%s::jsonb)",
+                (json.dumps(events),)
+            )
+            return cursor.fetchone()[0]
+
+class LogNotificationSink:
+    def deliver(self, conn, events: List[Dict]) -> int:
+        for event in events:
+            logger.info("notification_event", **event)
+        return len(events)
+
+SINKS = {
+    "database": DatabaseNotificationSink,
+    "log": LogNotificationSink,
+}
+
+def get_sink(name: str) -> NotificationSink:
+    if ":" in name:
+        module_name, class_name = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)()
+    return SINKS[name]()
+
+def dedupe_events(events: List[Dict]) -> List[Dict]:
+    """
+    Collapse events with the same recipient and dedup key, keeping the latest
+    occurrence, and return them in event_id order (per-recipient order holds).
+    """
+    latest = {}
+    for event in events:
+        latest[(event["recipient_user_id"], event["dedup_key"])] = event
+    return sorted(latest.values(), key=lambda event: event["event_id"])
+
+def deliver_isolated(conn, sink: NotificationSink, events: List[Dict]) -> int:
+    """Deliver the batch; on failure, retry each event in its own savepoint"""
+    try:
+        with conn.transaction():
+            return sink.deliver(conn, events)
+    except Exception as e:
+        logger.warning("notification_batch_failed", events=len(events), error=str(e))
+
+    delivered = 0
+    failures = []
+    for event in events:
+        try:
+            with conn.transaction():
+                delivered += sink.deliver(conn, [event])
+        except Exception as e:
+            failures.append((event, e))
+    if len(failures) == len(events):
+        raise failures[0][1]
+    for event, error in failures:
+        metrics.increment("notification_events_dropped")
+        logger.error("notification_event_dropped", event_id=event["event_id"], error=str(error))
+    return delivered
+
+def dispatch_batch(sink: NotificationSink, batch_size: int) -> Dict:
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT activity.sp_social_claim_outbox_events(%s)", (batch_size,))
+            events = cursor.fetchone()[0]
+        if not events:
+            conn.rollback()
+            return {"claimed": 0, "delivered": 0}
+        delivered = deliver_isolated(conn, sink, dedupe_events(events))
+        conn.commit()
+        return {"claimed": len(events), "delivered": delivered}
+
+def drain_outbox(sink: NotificationSink, batch_size: int) -> Dict:
+    """Dispatch batches until the outbox has no full batch left"""
+    totals = {"claimed": 0, "delivered": 0}
+    while True:
+        result = dispatch_batch(sink, batch_size)
+        totals["claimed"] += result["claimed"]
+        totals["delivered"] += result["delivered"]
+        if result["claimed"] < batch_size:
+            return totals
+
+def create_job() -> PeriodicJob:
+    settings = get_settings()
+    sink = get_sink(settings.NOTIFICATION_SINK)
+    return PeriodicJob(
+        "notification_dispatcher",
+        lambda: drain_outbox(sink, settings.NOTIFICATION_DISPATCH_BATCH_SIZE),
+        settings.NOTIFICATION_DISPATCH_INTERVAL_SECONDS
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch social events from the outbox")
+    parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit")
+    args = parser.parse_args()
+
+    setup_logging(get_settings().ENVIRONMENT)
+    try:
+        job = create_job()
+        if args.once:
+            logger.info("notification_outbox_drained", result=job.run_once())
+            return
+        job.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+if __name__ == "__main__":
+    main()
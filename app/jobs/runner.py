@@ -0,0 +1,48 @@
+import threading
+from typing import Callable, Optional
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class PeriodicJob:
+    """
+    Runs `func` every `interval` seconds on a daemon thread.
+    Errors are logged and the job keeps running on the next tick.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Optional[dict]], interval: float, run_immediately: bool = True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_immediately = run_immediately
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[dict]:
+        try:
+            result = self.func()
+            logger.debug("job_completed", job=self.name, result=result)
+            return result
+        except Exception as e:
+            logger.error("job_failed", job=self.name, error=str(e))
+            return None
+
+    def run_forever(self):
+        if not self.run_immediately:
+            self._stop.wait(self.interval)
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name=f"job-{self.name}", daemon=True)
+            self._thread.start()
+            logger.info("job_started", job=self.name, interval=self.interval)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+            logger.info("job_stopped", job=self.name)
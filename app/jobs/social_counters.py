@@ -0,0 +1,75 @@
+"""
+Social counter reconciliation.
+
+Walks all users in user_id order, a batch per tick, and rewrites any row of
+activity.user_social_counters that drifted from the source tables. After the
+last batch it starts over from the beginning.
+
+    python -m app.jobs.social_counters            # run continuously
+    python -m app.jobs.social_counters --once     # check one batch
+    python -m app.jobs.social_counters --full     # one complete pass, then exit
+"""
+import argparse
+from typing import Optional
+from app.config import get_settings
+from app.core.logging_config import setup_logging, get_logger
+from app.jobs.runner import PeriodicJob
+from app.services.social_summary_service import SocialSummaryService
+from app.utils.database import close_pool
+
+logger = get_logger(__name__)
+
+class CounterReconciler:
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.after_user_id: Optional[str] = None
+
+    def run_batch(self) -> dict:
+        result = SocialSummaryService().reconcile_counters(self.after_user_id, self.batch_size)
+        self.after_user_id = result["next_after_user_id"]
+        if result["repaired_count"]:
+            logger.warning(
+                "social_counters_repaired",
+                repaired_count=result["repaired_count"],
+                user_ids=result["repaired_user_ids"][:20]
+            )
+        return result
+
+def create_job() -> PeriodicJob:
+    settings = get_settings()
+    reconciler = CounterReconciler(settings.SOCIAL_COUNTERS_RECONCILE_BATCH_SIZE)
+    return PeriodicJob(
+        "social_counters_reconcile",
+        reconciler.run_batch,
+        settings.SOCIAL_COUNTERS_RECONCILE_INTERVAL_SECONDS,
+        run_immediately=False
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Repair drift in the per-user social counters")
+    parser.add_argument("--once", action="store_true", help="Check a single batch and exit")
+    parser.add_argument("--full", action="store_true", help="Check every user once and exit")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    setup_logging(settings.ENVIRONMENT)
+    try:
+        if args.once or args.full:
+            reconciler = CounterReconciler(settings.SOCIAL_COUNTERS_RECONCILE_BATCH_SIZE)
+            checked = repaired = 0
+            while True:
+                result = reconciler.run_batch()
+                checked += result["checked_count"]
+                repaired += result["repaired_count"]
+                if args.once or reconciler.after_user_id is None:
+                    break
+            logger.info("social_counters_reconciled", checked_count=checked, repaired_count=repaired)
+            return
+        create_job().run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+if __name__ == "__main__":
+    main()
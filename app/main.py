@@ -1,15 +1,107 @@
+import time
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.core.logging_config import setup_logging, get_logger
 from app.middleware.correlation import CorrelationMiddleware
-from app.utils.database import close_pool
-from app.routes import health, friendships, blocks, favorites, profile_views, user_search
+from app.utils.database import init_pool, warmup_pool, close_pool
+from app.core.redis_client import close_redis
+from app.routes import health, friendships, blocks, favorites, profile_views, user_search, exports, summary, batch
 
 # Setup logging
-setup_logging(settings.ENVIRONMENT)
+setup_logging(
+    settings.ENVIRONMENT,
+    use_queue=settings.LOG_QUEUE_ENABLED,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rules=settings.LOG_SAMPLE_RULES
+)
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker, after any pre-fork, so each worker owns its pool
+    logger.info("social_api_starting", environment=settings.ENVIRONMENT, storage_backend=settings.STORAGE_BACKEND)
+    # The in-memory backend has no database: no pool, graph snapshot, LISTEN or DB-backed jobs
+    uses_database = settings.STORAGE_BACKEND == "postgres"
+    if uses_database:
+        init_pool()
+    if uses_database and settings.DATABASE_POOL_WARMUP_CONNECTIONS > 0:
+        warmup_started = time.perf_counter()
+        try:
+            warmed = warmup_pool(
+                settings.DATABASE_POOL_WARMUP_CONNECTIONS,
+                settings.DATABASE_POOL_WARMUP_TIMEOUT
+            )
+            logger.info(
+                "database_pool_warmed",
+                connections=warmed,
+                duration_ms=round((time.perf_counter() - warmup_started) * 1000, 1)
+            )
+        except Exception as e:
+            logger.warning("database_pool_warmup_failed", error=str(e))
+
+    startup_ms = round((time.perf_counter() - _import_started) * 1000, 1)
+    if startup_ms > settings.STARTUP_TIME_BUDGET_MS:
+        logger.warning("social_api_startup_over_budget", startup_ms=startup_ms, budget_ms=settings.STARTUP_TIME_BUDGET_MS)
+    else:
+        logger.info("social_api_started", startup_ms=startup_ms)
+
+    jobs = []
+    if uses_database and settings.SOCIAL_GRAPH_ENABLED:
+        from app.graph.manager import social_graph
+        from app.jobs.runner import PeriodicJob
+        if not settings.CACHE_INVALIDATION_ENABLED:
+            # Writes made by other workers would only show up at the next reload
+            logger.warning("social_graph_without_invalidation", reload_seconds=settings.SOCIAL_GRAPH_RELOAD_SECONDS)
+        try:
+            social_graph.load()
+        except Exception as e:
+            # Services fall back to the stored procedures until a reload succeeds
+            logger.warning("social_graph_load_failed", error=str(e))
+        jobs.append(PeriodicJob(
+            "social_graph_reload",
+            social_graph.load,
+            settings.SOCIAL_GRAPH_RELOAD_SECONDS,
+            run_immediately=False
+        ))
+    if uses_database and settings.CACHE_INVALIDATION_ENABLED:
+        from app.core.invalidation import invalidation_bus
+        if settings.SOCIAL_GRAPH_ENABLED:
+            invalidation_bus.register(social_graph)
+        if settings.SINGLEFLIGHT_ENABLED and settings.SINGLEFLIGHT_TTL_MS > 0:
+            from app.utils.singleflight import get_singleflight
+            invalidation_bus.register(get_singleflight())
+        if settings.RESPONSE_CACHE_ENABLED:
+            from app.utils.response_cache import get_response_cache
+            invalidation_bus.register(get_response_cache())
+        jobs.append(invalidation_bus)
+    if uses_database and settings.FRIEND_SUGGESTIONS_JOB_ENABLED:
+        from app.jobs import friend_suggestions
+        jobs.append(friend_suggestions.create_job())
+    if uses_database and settings.NOTIFICATION_DISPATCHER_ENABLED:
+        from app.jobs import notification_dispatcher
+        jobs.append(notification_dispatcher.create_job())
+    if uses_database and settings.SOCIAL_COUNTERS_RECONCILE_ENABLED:
+        from app.jobs import social_counters
+        jobs.append(social_counters.create_job())
+    for job in jobs:
+        job.start()
+
+    yield
+
+    logger.info("social_api_shutting_down")
+    for job in jobs:
+        job.stop()
+    close_pool()
+    await close_redis()
+    if settings.TRACING_ENABLED:
+        from app.core.tracing import shutdown_tracing
+        shutdown_tracing()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -34,7 +126,8 @@ Features premium tier restrictions, activity size limits, and comprehensive soci
     redoc_url="/redoc" if settings.ENABLE_DOCS else None,
     openapi_url="/openapi.json" if settings.ENABLE_DOCS else None,
     contact={"name": "Activity Platform Team", "email": "dev@activityapp.com"},
-    license_info={"name": "Proprietary"}
+    license_info={"name": "Proprietary"},
+    lifespan=lifespan
 )
 
 
@@ -63,15 +156,49 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+# Deadline Middleware (innermost, so its 504s still get CORS headers)
+if settings.REQUEST_DEADLINES_ENABLED:
+    from app.middleware.deadline import DeadlineMiddleware
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout_ms=settings.REQUEST_DEFAULT_TIMEOUT_MS,
+        watch_after_ms=settings.REQUEST_DISCONNECT_WATCH_AFTER_MS
+    )
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE"],
-    allow_headers=["Authorization", "Content-Type"]
+    allow_headers=[
+        "Authorization", "Content-Type", "Idempotency-Key", "traceparent",
+        "X-Request-Timeout", "X-Request-Deadline"
+    ],
+    expose_headers=["Idempotent-Replayed", "traceparent"]
 )
 
+# Profiling Middleware (inside Correlation so profiles carry the correlation id)
+if settings.PROFILING_ENABLED:
+    from app.middleware.profiling import ProfilingMiddleware
+    app.add_middleware(
+        ProfilingMiddleware,
+        admin_token=settings.PROFILING_ADMIN_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        output_dir=settings.PROFILING_OUTPUT_DIR,
+        max_files=settings.PROFILING_MAX_FILES
+    )
+
+# Tracing Middleware (inside Correlation so logs below it carry the trace id)
+if settings.TRACING_ENABLED:
+    from app.core.tracing import configure_tracing, create_exporter
+    from app.middleware.tracing import TracingMiddleware
+    configure_tracing(
+        create_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE_PATH, settings.TRACING_MEMORY_MAX_SPANS),
+        settings.TRACING_SAMPLE_RATE
+    )
+    app.add_middleware(TracingMiddleware)
+
 # Correlation Middleware
 app.add_middleware(CorrelationMiddleware)
 
@@ -82,15 +209,9 @@ app.include_router(blocks.router)
 app.include_router(favorites.router)
 app.include_router(profile_views.router)
 app.include_router(user_search.router)
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("social_api_starting", environment=settings.ENVIRONMENT)
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("social_api_shutting_down")
-    close_pool()
+app.include_router(exports.router)
+app.include_router(summary.router)
+app.include_router(batch.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,8 +1,12 @@
+import time
 import uuid
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 import structlog
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 class CorrelationMiddleware(BaseHTTPMiddleware):
     """
@@ -11,6 +15,7 @@ class CorrelationMiddleware(BaseHTTPMiddleware):
     """
 
     async def dispatch(self, request: Request, call_next):
+        started = time.perf_counter()
         # Get or generate correlation ID
         correlation_id = request.headers.get("X-Correlation-ID")
         if not correlation_id:
@@ -25,7 +30,18 @@ class CorrelationMiddleware(BaseHTTPMiddleware):
         )
 
         # Process request
-        response: Response = await call_next(request)
+        try:
+            response: Response = await call_next(request)
+        except Exception:
+            logger.exception("request_failed", duration_ms=round((time.perf_counter() - started) * 1000, 2))
+            raise
+
+        # One line per request; LOG_SAMPLE_RULES can thin out the noisy successful ones
+        logger.info(
+            "request_completed",
+            status_code=response.status_code,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
 
         # Add correlation ID to response headers
         response.headers["X-Correlation-ID"] = correlation_id
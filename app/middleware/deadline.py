@@ -0,0 +1,103 @@
+import asyncio
+from app.core.deadline import RequestDeadline, current_deadline, parse_deadline
+from app.core.metrics import metrics
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+class DeadlineMiddleware:
+    """
+    Sets the request's deadline and watches for the client going away.
+
+    Requests still running after `watch_after_ms` get a reader task that owns
+    `receive` from then on and hands messages to the app through a queue, so
+    it sees `http.disconnect` as soon as the server does, even while the
+    handler is blocked in the threadpool. Faster requests never pay for it.
+    A disconnect before the response is complete cancels the deadline, which
+    cancels the request's running queries.
+    """
+
+    def __init__(self, app, default_timeout_ms: int = 0, watch_after_ms: int = 100):
+        self.app = app
+        self.default_timeout_ms = default_timeout_ms
+        self.watch_after = watch_after_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        timeout_header = headers.get(b"x-request-timeout")
+        deadline_header = headers.get(b"x-request-deadline")
+        deadline = RequestDeadline(parse_deadline(
+            timeout_header.decode("latin-1") if timeout_header else None,
+            deadline_header.decode("latin-1") if deadline_header else None,
+            self.default_timeout_ms
+        ))
+        remaining = deadline.remaining_ms()
+        if remaining is not None and remaining <= 0:
+            metrics.increment("requests_deadline_exceeded", stage="arrival")
+            await send({"type": "http.response.start", "status": 504, "headers": JSON_HEADERS})
+            await send({"type": "http.response.body", "body": b'{"detail":"Request deadline already passed"}'})
+            return
+
+        loop = asyncio.get_running_loop()
+        messages: asyncio.Queue = asyncio.Queue()
+        reader = None
+        app_receiving = False
+        response_complete = False
+        disconnected = False
+
+        def client_disconnected():
+            nonlocal disconnected
+            disconnected = True
+            if not response_complete:
+                metrics.increment("requests_client_disconnected")
+                deadline.cancel()
+
+        async def read_messages():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    client_disconnected()
+                    return
+
+        def start_watching():
+            nonlocal reader, watch_handle
+            if response_complete:
+                return
+            if app_receiving:
+                # Never two receive() calls at once: try again once the app has its message
+                watch_handle = loop.call_later(self.watch_after, start_watching)
+                return
+            reader = asyncio.create_task(read_messages())
+
+        async def receive_message():
+            nonlocal app_receiving
+            if reader is None:
+                app_receiving = True
+                try:
+                    message = await receive()
+                finally:
+                    app_receiving = False
+                if message["type"] == "http.disconnect":
+                    client_disconnected()
+                return message
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_message(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        token = current_deadline.set(deadline)
+        watch_handle = loop.call_later(self.watch_after, start_watching)
+        try:
+            await self.app(scope, receive_message, send_message)
+        finally:
+            watch_handle.cancel()
+            if reader is not None:
+                reader.cancel()
+            current_deadline.reset(token)
@@ -0,0 +1,147 @@
+"""
+On-demand request profiling.
+
+Only installed when PROFILING_ENABLED is set, so a disabled worker pays
+nothing. A request is profiled when it carries `X-Profile-Token` equal to
+PROFILING_ADMIN_TOKEN, or at random with PROFILING_SAMPLE_RATE. One request
+per worker is profiled at a time; others arriving meanwhile run unprofiled.
+
+pyinstrument (sampling, follows the request across awaits) is used when
+installed and writes an HTML flame view; otherwise cProfile writes a .pstats
+file (event loop thread only, so SP time spent in the threadpool shows up in
+the sidecar, not the profile). Every profile gets a .json sidecar with the
+correlation id, status, duration and per-SP timings. Files are named
+`<timestamp>-<correlation id>` in PROFILING_OUTPUT_DIR, which keeps the
+newest PROFILING_MAX_FILES profiles. Admin-requested profiles return the file
+name in `X-Profile-File`.
+"""
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from starlette.concurrency import run_in_threadpool
+from app.core.logging_config import get_logger
+from app.core.metrics import metrics
+from app.core.profiling import current_sp_timings
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+except ImportError:
+    _PyinstrumentProfiler = None
+
+logger = get_logger(__name__)
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+PROFILE_FILE_HEADER = b"x-profile-file"
+
+def _start_profiler() -> Tuple[str, Any]:
+    if _PyinstrumentProfiler is not None:
+        profiler = _PyinstrumentProfiler(async_mode="enabled")
+        profiler.start()
+        return "pyinstrument", profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return "cprofile", profiler
+
+def _stop_profiler(kind: str, profiler: Any):
+    if kind == "pyinstrument":
+        profiler.stop()
+    else:
+        profiler.disable()
+
+class ProfilingMiddleware:
+    def __init__(self, app, admin_token: str = "", sample_rate: float = 0.0,
+                 output_dir: str = "/tmp/social-api-profiles", max_files: int = 200):
+        self.app = app
+        self.admin_token = admin_token.encode()
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.max_files = max_files
+        self._busy = False
+
+    def _admin_requested(self, scope) -> bool:
+        if not self.admin_token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return hmac.compare_digest(value, self.admin_token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = self._admin_requested(scope)
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return await self.app(scope, receive, send)
+        if self._busy:
+            metrics.increment("profiling_skipped_busy")
+            return await self.app(scope, receive, send)
+
+        correlation_id = structlog.contextvars.get_contextvars().get("correlation_id") or str(uuid.uuid4())
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{re.sub(r'[^A-Za-z0-9_.-]', '_', correlation_id)[:64]}"
+        response_status = []
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response_status.append(message["status"])
+                if requested:
+                    message.setdefault("headers", []).append((PROFILE_FILE_HEADER, name.encode()))
+            await send(message)
+
+        timings: List[Tuple[str, float]] = []
+        token = current_sp_timings.set(timings)
+        self._busy = True
+        kind, profiler = _start_profiler()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stop_profiler(kind, profiler)
+            duration_ms = (time.perf_counter() - started) * 1000
+            self._busy = False
+            current_sp_timings.reset(token)
+            metrics.increment("profiling_requests", trigger="admin" if requested else "sample")
+            meta = {
+                "correlation_id": correlation_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": response_status[0] if response_status else None,
+                "duration_ms": round(duration_ms, 3),
+                "trigger": "admin" if requested else "sample",
+                "profiler": kind,
+                "sp_timings": [{"sp": sp, "ms": round(ms, 3)} for sp, ms in timings],
+                "sp_total_ms": round(sum(ms for _, ms in timings), 3),
+            }
+            try:
+                await run_in_threadpool(self._write, name, kind, profiler, meta)
+            except Exception as e:
+                logger.warning("profile_write_failed", error=str(e))
+
+    def _write(self, name: str, kind: str, profiler: Any, meta: Dict):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, name)
+        if kind == "pyinstrument":
+            with open(f"{base}.html", "w") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.dump_stats(f"{base}.pstats")
+        with open(f"{base}.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        logger.info("request_profiled", file=name, duration_ms=meta["duration_ms"], profiler=kind)
+        self._prune()
+
+    def _prune(self):
+        sidecars = sorted(f for f in os.listdir(self.output_dir) if f.endswith(".json"))
+        for sidecar in sidecars[:max(0, len(sidecars) - self.max_files)]:
+            stem = sidecar[:-len(".json")]
+            for suffix in (".json", ".html", ".pstats"):
+                try:
+                    os.remove(os.path.join(self.output_dir, stem + suffix))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,44 @@
+import structlog
+from app.core.tracing import get_tracer
+
+class TracingMiddleware:
+    """
+    Root span per HTTP request. Sits inside CorrelationMiddleware so the
+    trace id can be bound to the structlog context of everything below it.
+    Sampled requests answer with their own `traceparent` header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        tracer = get_tracer()
+        if scope["type"] != "http" or tracer is None:
+            return await self.app(scope, receive, send)
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = tracer.start_trace(
+            "http.request", traceparent,
+            **{"http.method": scope["method"], "http.path": scope["path"]}
+        )
+        if root is None:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                message.setdefault("headers", []).append((b"traceparent", root.traceparent.encode()))
+            await send(message)
+
+        structlog.contextvars.bind_contextvars(trace_id=root.trace_id)
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+                route = scope.get("route")
+                if route is not None:
+                    root.set_attribute("http.route", route.path)
+        finally:
+            tracer.exporter.flush()
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
-from typing import Optional
+from typing import List, Literal, Optional
 
 # Friendships
 class SendFriendRequestRequest(BaseModel):
@@ -12,11 +12,28 @@ class AcceptFriendRequestRequest(BaseModel):
 class DeclineFriendRequestRequest(BaseModel):
     requester_user_id: UUID
 
+class MutualFriendCountsRequest(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+
+class BulkFriendRequestsRequest(BaseModel):
+    requester_user_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=1000)
+    all_pending: bool = False
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.all_pending == (self.requester_user_ids is not None):
+            raise ValueError("Provide either requester_user_ids or all_pending=true")
+        return self
+
 # Blocking
 class BlockUserRequest(BaseModel):
     blocked_user_id: UUID
     reason: Optional[str] = Field(None, max_length=500)
 
+class BulkBlockUsersRequest(BaseModel):
+    blocked_user_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+    reason: Optional[str] = Field(None, max_length=500)
+
 # Favorites
 class FavoriteUserRequest(BaseModel):
     favorited_user_id: UUID
@@ -24,3 +41,29 @@ class FavoriteUserRequest(BaseModel):
 # Profile Views
 class RecordProfileViewRequest(BaseModel):
     viewed_user_id: UUID
+
+# Batch
+BATCH_OPERATIONS_WITH_TARGET = {"friendship_status", "mutual_friends", "block_status", "can_interact", "favorite_status"}
+
+BatchOperationName = Literal[
+    "friendship_status", "friends", "friend_requests_received", "friend_requests_sent", "mutual_friends",
+    "block_status", "can_interact", "blocked_users",
+    "favorite_status", "favorites", "favorited_by",
+    "profile_view_count", "summary",
+]
+
+class BatchOperation(BaseModel):
+    op: BatchOperationName
+    target_user_id: Optional[UUID] = None
+    activity_type: str = Field("standard", max_length=50)
+    limit: Optional[int] = Field(None, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.op in BATCH_OPERATIONS_WITH_TARGET and self.target_user_id is None:
+            raise ValueError(f"{self.op} requires target_user_id")
+        return self
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=20)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # Health Check
 class HealthCheckResponse(BaseModel):
@@ -40,6 +40,39 @@ class FriendshipStatusResponse(BaseModel):
     created_at: Optional[datetime] = None
     accepted_at: Optional[datetime] = None
 
+class MutualFriendProfile(BaseModel):
+    user_id: UUID
+    username: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    main_photo_url: Optional[str]
+    is_verified: bool
+
+class MutualFriendsResponse(BaseModel):
+    target_user_id: UUID
+    mutual_friends: List[MutualFriendProfile]
+    total_count: int
+    limit: int
+    offset: int
+
+class MutualFriendCountsResponse(BaseModel):
+    counts: Dict[UUID, int]
+
+class FriendSuggestion(BaseModel):
+    user_id: UUID
+    username: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    main_photo_url: Optional[str]
+    is_verified: bool
+    mutual_count: int
+    shared_activity_count: int
+    score: float
+
+class FriendSuggestionsResponse(BaseModel):
+    suggestions: List[FriendSuggestion]
+    limit: int
+
 # Blocking
 class BlockUserResponse(BaseModel):
     blocker_user_id: UUID
@@ -62,6 +95,19 @@ class BlockedUsersListResponse(BaseModel):
     limit: int
     offset: int
 
+class BulkBlockResult(BaseModel):
+    blocked_user_id: UUID
+    outcome: str
+    friendship_removed: bool
+
+class BulkBlockUsersResponse(BaseModel):
+    blocker_user_id: UUID
+    results: List[BulkBlockResult]
+    total_count: int
+    blocked_count: int
+    friendships_removed_count: int
+    blocked_at: datetime
+
 class BlockStatusResponse(BaseModel):
     user_1_blocked_user_2: bool
     user_2_blocked_user_1: bool
@@ -0,0 +1,53 @@
+"""
+Storage backend seen by the service layer.
+
+Services call stored procedures by name through a Repository instead of
+writing SQL. `postgres` (the default) executes the real SPs; `memory` is an
+in-process mirror of their semantics and error codes for benchmarks that need
+to isolate framework overhead and for database-free test runs.
+"""
+import threading
+from typing import Any, AsyncIterator, Callable, List, Optional, Protocol, Tuple
+from app.config import get_settings
+
+class Repository(Protocol):
+    def call(self, sp_name: str, *args: Any, write: bool = False) -> Any:
+        """Run activity.<sp_name>(*args) and return its JSONB result (commit when write)"""
+
+    def call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]]) -> List[Any]:
+        """Read-only SP calls in one round trip; results in order, a failed call yields its exception"""
+
+    def bulk_block_users(self, blocker_id: str, blocked_ids: List[str], reason: Optional[str]) -> Any:
+        """sp_social_bulk_block_users with its targets staged by the backend"""
+
+    async def stream(self, sp_name: str, *args: Any, batch_size: int = 500,
+                     is_disconnected: Optional[Callable] = None) -> AsyncIterator[bytes]:
+        """NDJSON lines of a set-returning SP and a trailer; setup errors raise here, not mid-body"""
+
+    def get_user(self, user_id: str) -> Optional[Tuple[str, str]]:
+        """(email, subscription_level) of a user, None when unknown"""
+
+_repository: Optional[Repository] = None
+_lock = threading.Lock()
+
+def create_repository(backend: str) -> Repository:
+    if backend == "postgres":
+        from app.repositories.postgres import PostgresRepository
+        return PostgresRepository()
+    if backend == "memory":
+        from app.repositories.memory import InMemoryRepository
+        return InMemoryRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+def get_repository() -> Repository:
+    global _repository
+    if _repository is None:
+        with _lock:
+            if _repository is None:
+                _repository = create_repository(get_settings().STORAGE_BACKEND)
+    return _repository
+
+def set_repository(repository: Optional[Repository]):
+    """Swap the process-wide repository (benchmarks and tests)"""
+    global _repository
+    _repository = repository
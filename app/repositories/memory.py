@@ -0,0 +1,843 @@
+"""
+In-memory mirror of the social stored procedures.
+
+Each `sp_social_*` method follows its SQL counterpart: same arguments, same
+JSON shape, same ordering and the same `'ERROR_CODE: message'` exceptions, so
+routes, error mapping and serialization behave as they do against Postgres.
+Timestamps and UUIDs are returned as ISO / canonical strings like JSONB does.
+
+Not mirrored: the notification outbox, friend suggestions and the user data
+export (their services stay on Postgres), and NOTIFY-based invalidation.
+Social counters are computed from the indexes on read, so they never drift.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from app.core.deadline import check_deadline
+from app.core.tracing import span
+from app.utils.streaming import ndjson_trailer, open_stream
+
+class StoredProcedureError(Exception):
+    """Raised with the same 'ERROR_CODE: message' text as the SP's RAISE EXCEPTION"""
+
+def _uuid(value: Any) -> str:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        raise StoredProcedureError(f'invalid input syntax for type uuid: "{value}"')
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def _pair(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a < b else (b, a)
+
+def _page(rows: list, limit: int, offset: int) -> list:
+    return rows[offset:offset + limit] if limit is not None else rows[offset:]
+
+class InMemoryRepository:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.users: Dict[str, Dict] = {}
+        # (user_id_1, user_id_2) with user_id_1 < user_id_2
+        self.friendships: Dict[Tuple[str, str], Dict] = {}
+        # user -> keys of their friendships (both directions, like activity.friendship_edges)
+        self._friendship_index: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+        # (blocker, blocked)
+        self.blocks: Dict[Tuple[str, str], Dict] = {}
+        self._blocks_by_blocker: Dict[str, Set[str]] = defaultdict(set)
+        self._blocks_by_blocked: Dict[str, Set[str]] = defaultdict(set)
+        # (favoriting, favorited) -> created_at
+        self.favorites: Dict[Tuple[str, str], datetime] = {}
+        self._favorites_by_favoriting: Dict[str, Set[str]] = defaultdict(set)
+        self._favorites_by_favorited: Dict[str, Set[str]] = defaultdict(set)
+        # (viewer, viewed) -> aggregate row
+        self.view_aggregates: Dict[Tuple[str, str], Dict] = {}
+        self._viewers_by_viewed: Dict[str, Set[str]] = defaultdict(set)
+        self.activities: Dict[str, Dict] = {}
+
+    # Seeding -------------------------------------------------------------
+
+    def add_user(self, user_id: str, username: str, first_name: Optional[str] = None,
+                 last_name: Optional[str] = None, email: Optional[str] = None,
+                 subscription_level: str = "free", is_verified: bool = False,
+                 main_photo_url: Optional[str] = None) -> str:
+        user_id = _uuid(user_id)
+        with self._lock:
+            self.users[user_id] = {
+                "user_id": user_id,
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email or f"{username}@example.com",
+                "subscription_level": subscription_level,
+                "is_verified": is_verified,
+                "main_photo_url": main_photo_url,
+                "activities_created_count": 0,
+                "activities_attended_count": 0,
+            }
+        return user_id
+
+    def add_friendship(self, user_a: str, user_b: str, status: str = "accepted",
+                       initiated_by: Optional[str] = None, created_at: Optional[datetime] = None):
+        user_a, user_b = _uuid(user_a), _uuid(user_b)
+        created_at = created_at or datetime.now(timezone.utc)
+        with self._lock:
+            self._set_friendship(_pair(user_a, user_b), {
+                "status": status,
+                "initiated_by": _uuid(initiated_by) if initiated_by else user_a,
+                "created_at": created_at,
+                "accepted_at": created_at if status == "accepted" else None,
+            })
+
+    def add_block(self, blocker_id: str, blocked_id: str, reason: Optional[str] = None):
+        with self._lock:
+            self._insert_block(_uuid(blocker_id), _uuid(blocked_id), datetime.now(timezone.utc), reason)
+
+    def add_favorite(self, favoriting_id: str, favorited_id: str):
+        with self._lock:
+            self._insert_favorite(_uuid(favoriting_id), _uuid(favorited_id), datetime.now(timezone.utc))
+
+    def add_activity(self, activity_id: str, organizer_user_id: str, activity_type: str = "standard",
+                     participants: Optional[Dict[str, str]] = None, roles: Optional[Dict[str, str]] = None):
+        """participants: user_id -> participation_status; roles: user_id -> participant role (default member)"""
+        with self._lock:
+            self.activities[_uuid(activity_id)] = {
+                "organizer_user_id": _uuid(organizer_user_id),
+                "activity_type": activity_type,
+                "participants": {_uuid(k): v for k, v in (participants or {}).items()},
+                "roles": {_uuid(k): v for k, v in (roles or {}).items()},
+            }
+
+    # Repository protocol -------------------------------------------------
+
+    def call(self, sp_name: str, *args: Any, write: bool = False) -> Any:
+        procedure = getattr(self, sp_name, None) if sp_name.startswith("sp_social_") else None
+        if procedure is None:
+            raise NotImplementedError(f"{sp_name} is not available in the in-memory backend")
+        check_deadline(sp_name)
+        with span(sp_name, **{"db.write": write}), self._lock:
+            return procedure(*args)
+
+    def call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]]) -> List[Any]:
+        results = []
+        for sp_name, args in calls:
+            try:
+                results.append(self.call(sp_name, *args))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def bulk_block_users(self, blocker_id: str, blocked_ids: List[str], reason: Optional[str]) -> Any:
+        with self._lock:
+            return self._bulk_block_users(blocker_id, blocked_ids, reason)
+
+    async def _stream_rows(self, rows: List[Dict], is_disconnected: Optional[Callable]) -> AsyncIterator[bytes]:
+        for row in rows:
+            if is_disconnected is not None and await is_disconnected():
+                return
+            yield (json.dumps(row) + "\n").encode()
+            await asyncio.sleep(0)
+        yield ndjson_trailer(len(rows))
+
+    async def stream(self, sp_name: str, *args: Any, batch_size: int = 500,
+                     is_disconnected: Optional[Callable] = None) -> AsyncIterator[bytes]:
+        return await open_stream(self._stream_rows(self.call(sp_name, *args), is_disconnected))
+
+    def get_user(self, user_id: str) -> Optional[Tuple[str, str]]:
+        user = self.users.get(_uuid(user_id))
+        return (user["email"], user["subscription_level"]) if user else None
+
+    # Internal helpers ------------------------------------------------------
+
+    def _require_user(self, user_id: str, message: str = "User does not exist"):
+        if user_id not in self.users:
+            raise StoredProcedureError(f"USER_NOT_FOUND: {message}")
+
+    def _set_friendship(self, key: Tuple[str, str], row: Optional[Dict]):
+        if row is None:
+            if self.friendships.pop(key, None) is not None:
+                self._friendship_index[key[0]].discard(key)
+                self._friendship_index[key[1]].discard(key)
+            return
+        self.friendships[key] = row
+        self._friendship_index[key[0]].add(key)
+        self._friendship_index[key[1]].add(key)
+
+    def _friendship_rows(self, user_id: str):
+        for key in self._friendship_index.get(user_id, ()):
+            yield key, self.friendships[key]
+
+    def _friend_ids(self, user_id: str) -> Set[str]:
+        return {
+            key[1] if key[0] == user_id else key[0]
+            for key, row in self._friendship_rows(user_id)
+            if row["status"] == "accepted"
+        }
+
+    def _any_block(self, user_a: str, user_b: str) -> bool:
+        return (user_a, user_b) in self.blocks or (user_b, user_a) in self.blocks
+
+    def _insert_block(self, blocker_id: str, blocked_id: str, created_at: datetime, reason: Optional[str]):
+        self.blocks[(blocker_id, blocked_id)] = {"created_at": created_at, "reason": reason}
+        self._blocks_by_blocker[blocker_id].add(blocked_id)
+        self._blocks_by_blocked[blocked_id].add(blocker_id)
+
+    def _insert_favorite(self, favoriting_id: str, favorited_id: str, created_at: datetime):
+        self.favorites[(favoriting_id, favorited_id)] = created_at
+        self._favorites_by_favoriting[favoriting_id].add(favorited_id)
+        self._favorites_by_favorited[favorited_id].add(favoriting_id)
+
+    def _user_card(self, user_id: str, id_field: str = "user_id", verified: bool = True) -> Dict:
+        user = self.users[user_id]
+        card = {
+            id_field: user_id,
+            "username": user["username"],
+            "first_name": user["first_name"],
+            "last_name": user["last_name"],
+            "main_photo_url": user["main_photo_url"],
+        }
+        if verified:
+            card["is_verified"] = user["is_verified"]
+        return card
+
+    @staticmethod
+    def _premium_check(subscription_level: str):
+        if subscription_level not in ("premium", "club"):
+            raise StoredProcedureError("PREMIUM_REQUIRED: This feature requires Premium or Club subscription")
+
+    # Friendships -------------------------------------------------------------
+
+    def sp_social_send_friend_request(self, requester_id, target_id):
+        requester_id, target_id = _uuid(requester_id), _uuid(target_id)
+        if requester_id == target_id:
+            raise StoredProcedureError("SELF_FRIEND_ERROR: Cannot send friend request to yourself")
+        self._require_user(target_id, "Target user does not exist")
+        key = _pair(requester_id, target_id)
+        existing = self.friendships.get(key)
+        if existing is not None:
+            raise StoredProcedureError(f"FRIENDSHIP_EXISTS: Friendship already exists with status: {existing['status']}")
+        if (target_id, requester_id) in self.blocks:
+            raise StoredProcedureError("BLOCKED_BY_USER: You cannot send friend request to this user")
+        if (requester_id, target_id) in self.blocks:
+            raise StoredProcedureError("USER_BLOCKED: Cannot send friend request to blocked user")
+        now = datetime.now(timezone.utc)
+        self._set_friendship(key, {"status": "pending", "initiated_by": requester_id, "created_at": now, "accepted_at": None})
+        return {
+            "friendship_id": f"{key[0]}:{key[1]}",
+            "requester_user_id": requester_id,
+            "target_user_id": target_id,
+            "status": "pending",
+            "initiated_by": requester_id,
+            "created_at": _iso(now),
+        }
+
+    def sp_social_accept_friend_request(self, accepting_id, requester_id):
+        accepting_id, requester_id = _uuid(accepting_id), _uuid(requester_id)
+        key = _pair(accepting_id, requester_id)
+        row = self.friendships.get(key)
+        if row is None or row["status"] != "pending" or row["initiated_by"] != requester_id:
+            raise StoredProcedureError("FRIENDSHIP_NOT_FOUND: No pending friend request found")
+        if accepting_id == requester_id:
+            raise StoredProcedureError("INVALID_ACCEPTOR: You cannot accept your own friend request")
+        now = datetime.now(timezone.utc)
+        row.update(status="accepted", accepted_at=now)
+        return {
+            "friendship_id": f"{key[0]}:{key[1]}",
+            "user_id_1": key[0],
+            "user_id_2": key[1],
+            "status": "accepted",
+            "initiated_by": row["initiated_by"],
+            "accepted_at": _iso(now),
+            "created_at": _iso(row["created_at"]),
+        }
+
+    def sp_social_decline_friend_request(self, declining_id, requester_id):
+        declining_id, requester_id = _uuid(declining_id), _uuid(requester_id)
+        if declining_id == requester_id:
+            raise StoredProcedureError("INVALID_DECLINER: You cannot decline your own friend request")
+        key = _pair(declining_id, requester_id)
+        row = self.friendships.get(key)
+        if row is None or row["status"] != "pending" or row["initiated_by"] != requester_id:
+            raise StoredProcedureError("FRIENDSHIP_NOT_FOUND: No pending friend request found")
+        self._set_friendship(key, None)
+        return {
+            "message": "Friend request declined",
+            "requester_user_id": requester_id,
+            "declined_at": _iso(datetime.now(timezone.utc)),
+        }
+
+    def _requested(self, user_id: str, requester_ids: Optional[List[str]]) -> List[Tuple[str, int]]:
+        """(requester, occurrence) in request order, or every pending received request oldest first"""
+        if requester_ids is None:
+            pending = sorted(
+                (row["created_at"], row["initiated_by"])
+                for _, row in self._friendship_rows(user_id)
+                if row["status"] == "pending" and row["initiated_by"] != user_id
+            )
+            return [(requester, 1) for _, requester in pending]
+        seen: Dict[str, int] = defaultdict(int)
+        requested = []
+        for requester in map(_uuid, requester_ids):
+            seen[requester] += 1
+            requested.append((requester, seen[requester]))
+        return requested
+
+    def _pending_from(self, user_id: str, requester: str) -> Optional[Dict]:
+        row = self.friendships.get(_pair(user_id, requester))
+        if row is not None and row["status"] == "pending" and row["initiated_by"] == requester:
+            return row
+        return None
+
+    def sp_social_bulk_accept_friend_requests(self, accepting_id, requester_ids=None):
+        accepting_id = _uuid(accepting_id)
+        now = datetime.now(timezone.utc)
+        classified = [
+            (requester, occurrence, self._pending_from(accepting_id, requester) if requester != accepting_id else None)
+            for requester, occurrence in self._requested(accepting_id, requester_ids)
+        ]
+        results = []
+        accepted = 0
+        for requester, occurrence, row in classified:
+            if requester == accepting_id:
+                outcome = "self"
+            elif occurrence > 1:
+                outcome = "duplicate"
+            elif row is None:
+                outcome = "not_found"
+            elif self._any_block(accepting_id, requester):
+                outcome = "blocked"
+            else:
+                outcome = "accepted"
+            results.append({
+                "requester_user_id": requester,
+                "outcome": outcome,
+                "created_at": _iso(row["created_at"]) if row else None,
+            })
+            if outcome == "accepted":
+                row.update(status="accepted", accepted_at=now)
+                accepted += 1
+        return {
+            "results": results,
+            "total_count": len(results),
+            "accepted_count": accepted,
+            "accepted_at": _iso(now),
+        }
+
+    def sp_social_bulk_decline_friend_requests(self, declining_id, requester_ids=None):
+        declining_id = _uuid(declining_id)
+        now = datetime.now(timezone.utc)
+        results = []
+        declined = 0
+        for requester, occurrence in self._requested(declining_id, requester_ids):
+            if requester == declining_id:
+                outcome = "self"
+            elif occurrence > 1:
+                outcome = "duplicate"
+            elif self._pending_from(declining_id, requester) is None:
+                outcome = "not_found"
+            else:
+                self._set_friendship(_pair(declining_id, requester), None)
+                outcome = "declined"
+                declined += 1
+            results.append({"requester_user_id": requester, "outcome": outcome})
+        return {
+            "results": results,
+            "total_count": len(results),
+            "declined_count": declined,
+            "declined_at": _iso(now),
+        }
+
+    def sp_social_remove_friend(self, user_id, friend_id):
+        user_id, friend_id = _uuid(user_id), _uuid(friend_id)
+        key = _pair(user_id, friend_id)
+        if key not in self.friendships:
+            raise StoredProcedureError("FRIENDSHIP_NOT_FOUND: No friendship found with this user")
+        self._set_friendship(key, None)
+        return {
+            "message": "Friendship removed",
+            "removed_user_id": friend_id,
+            "removed_at": _iso(datetime.now(timezone.utc)),
+        }
+
+    def _accepted_friends(self, user_id: str) -> List[Tuple[str, Dict]]:
+        rows = [
+            (key[1] if key[0] == user_id else key[0], row)
+            for key, row in self._friendship_rows(user_id)
+            if row["status"] == "accepted"
+        ]
+        rows.sort(key=lambda item: item[1]["accepted_at"], reverse=True)
+        return rows
+
+    def sp_social_get_friends_list(self, user_id, limit=100, offset=0):
+        user_id = _uuid(user_id)
+        rows = self._accepted_friends(user_id)
+        friends = [
+            {**self._user_card(friend_id), "friendship_since": _iso(row["accepted_at"])}
+            for friend_id, row in _page(rows, limit, offset)
+            if friend_id in self.users
+        ]
+        return {"friends": friends, "total_count": len(rows), "limit": limit, "offset": offset}
+
+    def sp_social_get_friend_ids(self, user_id, limit=100, offset=0):
+        user_id = _uuid(user_id)
+        rows = self._accepted_friends(user_id)
+        return {
+            "user_ids": [friend_id for friend_id, _ in _page(rows, limit, offset)],
+            "total_count": len(rows),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_get_pending_friend_requests(self, user_id, limit=50, offset=0):
+        user_id = _uuid(user_id)
+        rows = [
+            row for _, row in self._friendship_rows(user_id)
+            if row["status"] == "pending" and row["initiated_by"] != user_id
+        ]
+        rows.sort(key=lambda row: row["created_at"], reverse=True)
+        requests = [
+            {**self._user_card(row["initiated_by"], "requester_user_id"), "requested_at": _iso(row["created_at"])}
+            for row in _page(rows, limit, offset)
+        ]
+        return {"requests": requests, "total_count": len(rows), "limit": limit, "offset": offset}
+
+    def sp_social_get_sent_friend_requests(self, user_id, limit=50, offset=0):
+        user_id = _uuid(user_id)
+        rows = [
+            (key[1] if key[0] == user_id else key[0], row)
+            for key, row in self._friendship_rows(user_id)
+            if row["status"] == "pending" and row["initiated_by"] == user_id
+        ]
+        rows.sort(key=lambda item: item[1]["created_at"], reverse=True)
+        requests = [
+            {**self._user_card(target_id, "target_user_id"), "requested_at": _iso(row["created_at"])}
+            for target_id, row in _page(rows, limit, offset)
+        ]
+        return {"requests": requests, "total_count": len(rows), "limit": limit, "offset": offset}
+
+    def sp_social_check_friendship_status(self, user_id_1, user_id_2):
+        row = self.friendships.get(_pair(_uuid(user_id_1), _uuid(user_id_2)))
+        if row is None:
+            return {"status": "none"}
+        return {
+            "status": row["status"],
+            "initiated_by": row["initiated_by"],
+            "created_at": _iso(row["created_at"]),
+            "accepted_at": _iso(row["accepted_at"]),
+        }
+
+    def sp_social_get_mutual_friends(self, user_id, target_id, limit=100, offset=0):
+        user_id, target_id = _uuid(user_id), _uuid(target_id)
+        if user_id == target_id:
+            raise StoredProcedureError("SELF_FRIEND_ERROR: Cannot get mutual friends with yourself")
+        mutual = self._friend_ids(user_id) & self._friend_ids(target_id)
+        cards = sorted((self._user_card(friend_id) for friend_id in mutual if friend_id in self.users),
+                       key=lambda card: card["username"])
+        return {
+            "target_user_id": target_id,
+            "mutual_friends": _page(cards, limit, offset),
+            "total_count": len(mutual),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_get_mutual_friend_counts(self, user_id, target_ids):
+        user_id = _uuid(user_id)
+        mine = self._friend_ids(user_id)
+        counts = {}
+        for target_id in map(_uuid, target_ids):
+            if target_id != user_id:
+                counts[target_id] = len(mine & self._friend_ids(target_id))
+        return {"counts": counts}
+
+    # Blocks ------------------------------------------------------------------
+
+    def sp_social_block_user(self, blocker_id, blocked_id, reason=None):
+        blocker_id, blocked_id = _uuid(blocker_id), _uuid(blocked_id)
+        if blocker_id == blocked_id:
+            raise StoredProcedureError("SELF_BLOCK_ERROR: Cannot block yourself")
+        self._require_user(blocked_id)
+        if (blocker_id, blocked_id) in self.blocks:
+            raise StoredProcedureError("ALREADY_BLOCKED: User is already blocked")
+        now = datetime.now(timezone.utc)
+        self._insert_block(blocker_id, blocked_id, now, reason)
+        key = _pair(blocker_id, blocked_id)
+        friendship_removed = key in self.friendships
+        self._set_friendship(key, None)
+        return {
+            "blocker_user_id": blocker_id,
+            "blocked_user_id": blocked_id,
+            "blocked_at": _iso(now),
+            "friendship_removed": friendship_removed,
+        }
+
+    def sp_social_unblock_user(self, blocker_id, blocked_id):
+        blocker_id, blocked_id = _uuid(blocker_id), _uuid(blocked_id)
+        if self.blocks.pop((blocker_id, blocked_id), None) is None:
+            raise StoredProcedureError("BLOCK_NOT_FOUND: No block found for this user")
+        self._blocks_by_blocker[blocker_id].discard(blocked_id)
+        self._blocks_by_blocked[blocked_id].discard(blocker_id)
+        return {
+            "blocker_user_id": blocker_id,
+            "unblocked_user_id": blocked_id,
+            "unblocked_at": _iso(datetime.now(timezone.utc)),
+        }
+
+    def _bulk_block_users(self, blocker_id, blocked_ids, reason):
+        blocker_id = _uuid(blocker_id)
+        now = datetime.now(timezone.utc)
+        seen: Set[str] = set()
+        results = []
+        for blocked_id in map(_uuid, blocked_ids):
+            friendship_removed = False
+            if blocked_id in seen:
+                outcome = "duplicate"
+            elif blocked_id == blocker_id:
+                outcome = "self"
+            elif blocked_id not in self.users:
+                outcome = "user_not_found"
+            elif (blocker_id, blocked_id) in self.blocks:
+                outcome = "already_blocked"
+            else:
+                outcome = "blocked"
+                self._insert_block(blocker_id, blocked_id, now, reason)
+                key = _pair(blocker_id, blocked_id)
+                friendship_removed = key in self.friendships
+                self._set_friendship(key, None)
+            seen.add(blocked_id)
+            results.append({"blocked_user_id": blocked_id, "outcome": outcome, "friendship_removed": friendship_removed})
+        return {
+            "blocker_user_id": blocker_id,
+            "results": results,
+            "total_count": len(results),
+            "blocked_count": sum(1 for item in results if item["outcome"] == "blocked"),
+            "friendships_removed_count": sum(1 for item in results if item["friendship_removed"]),
+            "blocked_at": _iso(now),
+        }
+
+    def _blocked_rows(self, blocker_id: str) -> List[Tuple[str, Dict]]:
+        rows = [(blocked_id, self.blocks[(blocker_id, blocked_id)]) for blocked_id in self._blocks_by_blocker.get(blocker_id, ())]
+        rows.sort(key=lambda item: item[1]["created_at"], reverse=True)
+        return rows
+
+    def _blocked_card(self, blocked_id: str, row: Dict) -> Dict:
+        return {
+            **self._user_card(blocked_id, "blocked_user_id", verified=False),
+            "blocked_at": _iso(row["created_at"]),
+            "reason": row["reason"],
+        }
+
+    def sp_social_get_blocked_users(self, blocker_id, limit=100, offset=0):
+        rows = self._blocked_rows(_uuid(blocker_id))
+        return {
+            "blocked_users": [self._blocked_card(blocked_id, row) for blocked_id, row in _page(rows, limit, offset)],
+            "total_count": len(rows),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_get_blocked_user_ids(self, blocker_id, limit=100, offset=0):
+        rows = self._blocked_rows(_uuid(blocker_id))
+        return {
+            "user_ids": [blocked_id for blocked_id, _ in _page(rows, limit, offset)],
+            "total_count": len(rows),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_export_blocked_users(self, blocker_id):
+        return [self._blocked_card(blocked_id, row) for blocked_id, row in self._blocked_rows(_uuid(blocker_id))]
+
+    def sp_social_get_block_set(self, user_id):
+        user_id = _uuid(user_id)
+        return {
+            "blocked": sorted(self._blocks_by_blocker.get(user_id, ()), key=lambda value: uuid.UUID(value).bytes),
+            "blocked_by": sorted(self._blocks_by_blocked.get(user_id, ()), key=lambda value: uuid.UUID(value).bytes),
+        }
+
+    def sp_social_check_block_status(self, user_id_1, user_id_2):
+        user_id_1, user_id_2 = _uuid(user_id_1), _uuid(user_id_2)
+        one_blocked_two = (user_id_1, user_id_2) in self.blocks
+        two_blocked_one = (user_id_2, user_id_1) in self.blocks
+        return {
+            "user_1_blocked_user_2": one_blocked_two,
+            "user_2_blocked_user_1": two_blocked_one,
+            "any_block_exists": one_blocked_two or two_blocked_one,
+        }
+
+    def sp_social_check_can_interact(self, user_id_1, user_id_2, activity_type="standard"):
+        if activity_type == "xxl":
+            return {"can_interact": True, "reason": "xxl_exception", "activity_type": activity_type}
+        blocked = self._any_block(_uuid(user_id_1), _uuid(user_id_2))
+        return {
+            "can_interact": not blocked,
+            "reason": "blocked" if blocked else "no_blocks",
+            "activity_type": activity_type,
+        }
+
+    def sp_social_get_activity_block_conflicts(self, user_id, activity_id):
+        user_id, activity_id = _uuid(user_id), _uuid(activity_id)
+        activity = self.activities.get(activity_id)
+        if activity is None:
+            raise StoredProcedureError("ACTIVITY_NOT_FOUND: Activity does not exist")
+        registered = {uid for uid, status in activity["participants"].items() if status == "registered"}
+        if user_id != activity["organizer_user_id"] and user_id not in registered:
+            raise StoredProcedureError(
+                "NOT_ACTIVITY_PARTICIPANT: Only the organizer and registered participants can view block conflicts"
+            )
+        full_matrix = (
+            user_id == activity["organizer_user_id"]
+            or activity["roles"].get(user_id) in ("organizer", "co_organizer")
+        )
+        result = {
+            "activity_id": activity_id,
+            "activity_type": activity["activity_type"],
+            "participant_count": len(registered),
+            "xxl_exception": activity["activity_type"] == "xxl",
+            "scope": "full" if full_matrix else "own",
+            "users": [],
+            "pairs": [],
+            "pair_count": 0,
+        }
+        if result["xxl_exception"]:
+            return result
+        conflicts = [
+            (blocker, blocked)
+            for blocker in registered
+            for blocked in self._blocks_by_blocker.get(blocker, ())
+            if blocked in registered and (full_matrix or user_id in (blocker, blocked))
+        ]
+        users = sorted({uid for pair in conflicts for uid in pair})
+        index = {uid: i for i, uid in enumerate(users)}
+        result["users"] = users
+        result["pairs"] = sorted([index[blocker], index[blocked]] for blocker, blocked in conflicts)
+        result["pair_count"] = len(conflicts)
+        return result
+
+    # Favorites ---------------------------------------------------------------
+
+    def sp_social_favorite_user(self, favoriting_id, favorited_id):
+        favoriting_id, favorited_id = _uuid(favoriting_id), _uuid(favorited_id)
+        if favoriting_id == favorited_id:
+            raise StoredProcedureError("SELF_FAVORITE_ERROR: Cannot favorite yourself")
+        self._require_user(favorited_id)
+        if (favoriting_id, favorited_id) in self.favorites:
+            raise StoredProcedureError("ALREADY_FAVORITED: User is already favorited")
+        if self._any_block(favoriting_id, favorited_id):
+            raise StoredProcedureError("BLOCKED_USER: Cannot favorite blocked user")
+        now = datetime.now(timezone.utc)
+        self._insert_favorite(favoriting_id, favorited_id, now)
+        return {"favoriting_user_id": favoriting_id, "favorited_user_id": favorited_id, "favorited_at": _iso(now)}
+
+    def sp_social_unfavorite_user(self, favoriting_id, favorited_id):
+        favoriting_id, favorited_id = _uuid(favoriting_id), _uuid(favorited_id)
+        if self.favorites.pop((favoriting_id, favorited_id), None) is None:
+            raise StoredProcedureError("FAVORITE_NOT_FOUND: Favorite not found")
+        self._favorites_by_favoriting[favoriting_id].discard(favorited_id)
+        self._favorites_by_favorited[favorited_id].discard(favoriting_id)
+        return {
+            "favoriting_user_id": favoriting_id,
+            "unfavorited_user_id": favorited_id,
+            "unfavorited_at": _iso(datetime.now(timezone.utc)),
+        }
+
+    def _favorite_rows(self, user_id: str, given: bool) -> List[Tuple[str, datetime]]:
+        if given:
+            rows = [(other, self.favorites[(user_id, other)]) for other in self._favorites_by_favoriting.get(user_id, ())]
+        else:
+            rows = [(other, self.favorites[(other, user_id)]) for other in self._favorites_by_favorited.get(user_id, ())]
+        rows.sort(key=lambda item: item[1], reverse=True)
+        return rows
+
+    def _favorite_list(self, rows, list_key: str, limit: int, offset: int) -> Dict:
+        return {
+            list_key: [
+                {**self._user_card(other), "favorited_at": _iso(created_at)}
+                for other, created_at in _page(rows, limit, offset)
+            ],
+            "total_count": len(rows),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_get_my_favorites(self, user_id, limit=100, offset=0):
+        return self._favorite_list(self._favorite_rows(_uuid(user_id), True), "favorites", limit, offset)
+
+    def sp_social_get_who_favorited_me(self, user_id, subscription_level, limit=100, offset=0):
+        self._premium_check(subscription_level)
+        return self._favorite_list(self._favorite_rows(_uuid(user_id), False), "favorited_by", limit, offset)
+
+    def sp_social_get_my_favorite_ids(self, user_id, limit=100, offset=0):
+        rows = self._favorite_rows(_uuid(user_id), True)
+        return {"user_ids": [other for other, _ in _page(rows, limit, offset)], "total_count": len(rows),
+                "limit": limit, "offset": offset}
+
+    def sp_social_get_who_favorited_me_ids(self, user_id, subscription_level, limit=100, offset=0):
+        self._premium_check(subscription_level)
+        rows = self._favorite_rows(_uuid(user_id), False)
+        return {"user_ids": [other for other, _ in _page(rows, limit, offset)], "total_count": len(rows),
+                "limit": limit, "offset": offset}
+
+    def sp_social_check_favorite_status(self, favoriting_id, favorited_id):
+        created_at = self.favorites.get((_uuid(favoriting_id), _uuid(favorited_id)))
+        if created_at is None:
+            return {"is_favorited": False}
+        return {"is_favorited": True, "favorited_at": _iso(created_at)}
+
+    # Profile views -----------------------------------------------------------
+
+    def sp_social_record_profile_view(self, viewer_id, viewed_id, ghost_mode, dedup_window_seconds=3600):
+        viewer_id, viewed_id = _uuid(viewer_id), _uuid(viewed_id)
+        if viewer_id == viewed_id:
+            raise StoredProcedureError("SELF_VIEW_ERROR: Cannot record self-profile view")
+        self._require_user(viewed_id)
+        if self._any_block(viewer_id, viewed_id):
+            raise StoredProcedureError("BLOCKED_USER: Cannot view blocked user profile")
+        if ghost_mode:
+            return {"view_recorded": False, "ghost_mode": True, "viewed_user_id": viewed_id}
+
+        now = datetime.now(timezone.utc)
+        row = self.view_aggregates.get((viewer_id, viewed_id))
+        if row is None:
+            row = self.view_aggregates[(viewer_id, viewed_id)] = {
+                "view_count": 1, "first_viewed_at": now, "last_viewed_at": now, "last_counted_at": now
+            }
+            self._viewers_by_viewed[viewed_id].add(viewer_id)
+            counted = True
+        else:
+            counted = row["last_counted_at"] <= now - timedelta(seconds=dedup_window_seconds)
+            if counted:
+                row["view_count"] += 1
+                row["last_counted_at"] = now
+            row["last_viewed_at"] = now
+        return {
+            "view_recorded": True,
+            "view_counted": counted,
+            "view_id": str(uuid.uuid4()) if counted else None,
+            "viewer_user_id": viewer_id,
+            "viewed_user_id": viewed_id,
+            "view_count": row["view_count"],
+            "viewed_at": _iso(now),
+        }
+
+    def _viewer_rows(self, user_id: str) -> List[Tuple[str, Dict]]:
+        rows = [(viewer, self.view_aggregates[(viewer, user_id)]) for viewer in self._viewers_by_viewed.get(user_id, ())]
+        rows.sort(key=lambda item: item[1]["last_viewed_at"], reverse=True)
+        return rows
+
+    def sp_social_get_who_viewed_my_profile(self, user_id, subscription_level, limit=100, offset=0):
+        self._premium_check(subscription_level)
+        rows = self._viewer_rows(_uuid(user_id))
+        viewers = [
+            {
+                **self._user_card(viewer, "viewer_user_id"),
+                "last_viewed_at": _iso(row["last_viewed_at"]),
+                "view_count": row["view_count"],
+            }
+            for viewer, row in _page(rows, limit, offset)
+        ]
+        return {
+            "viewers": viewers,
+            "total_viewers": len(rows),
+            "total_views": sum(row["view_count"] for _, row in rows),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def sp_social_get_who_viewed_my_profile_ids(self, user_id, subscription_level, limit=100, offset=0):
+        self._premium_check(subscription_level)
+        rows = self._viewer_rows(_uuid(user_id))
+        return {"user_ids": [viewer for viewer, _ in _page(rows, limit, offset)], "total_viewers": len(rows),
+                "limit": limit, "offset": offset}
+
+    def sp_social_get_profile_view_count(self, user_id):
+        user_id = _uuid(user_id)
+        rows = self._viewer_rows(user_id)
+        return {
+            "user_id": user_id,
+            "total_views": sum(row["view_count"] for _, row in rows),
+            "unique_viewers": len(rows),
+        }
+
+    # User search -------------------------------------------------------------
+
+    def _search(self, searcher_id: str, query: str) -> List[Dict]:
+        if len(query.strip()) < 2:
+            raise StoredProcedureError("INVALID_QUERY: Search query must be at least 2 characters")
+        term = query.strip().lower()
+
+        def matches(user):
+            first, last = (user["first_name"] or "").lower(), (user["last_name"] or "").lower()
+            return (term in user["username"].lower() or term in first or term in last
+                    or term in f"{first} {last}")
+
+        def rank(user):
+            if user["username"].lower() == term:
+                return 1
+            if (user["first_name"] or "").lower() == term:
+                return 2
+            if (user["last_name"] or "").lower() == term:
+                return 3
+            return 4
+
+        found = [
+            user for user_id, user in self.users.items()
+            if user_id != searcher_id and matches(user) and not self._any_block(searcher_id, user_id)
+        ]
+        found.sort(key=lambda user: (not user["is_verified"], rank(user), user["username"]))
+        return found
+
+    def sp_social_search_users(self, searcher_id, query, limit=20, offset=0):
+        found = self._search(_uuid(searcher_id), query)
+        users = [
+            {
+                **self._user_card(user["user_id"]),
+                "activities_created_count": user["activities_created_count"],
+                "activities_attended_count": user["activities_attended_count"],
+            }
+            for user in _page(found, limit, offset)
+        ]
+        return {"users": users, "total_count": len(found), "search_query": query, "limit": limit, "offset": offset}
+
+    def sp_social_search_user_ids(self, searcher_id, query, limit=20, offset=0):
+        found = self._search(_uuid(searcher_id), query)
+        return {
+            "user_ids": [user["user_id"] for user in _page(found, limit, offset)],
+            "total_count": len(found),
+            "search_query": query,
+            "limit": limit,
+            "offset": offset,
+        }
+
+    # Social counters ---------------------------------------------------------
+
+    def sp_social_get_social_summary(self, user_id):
+        user_id = _uuid(user_id)
+        pending = [row for _, row in self._friendship_rows(user_id) if row["status"] == "pending"]
+        viewers = self._viewer_rows(user_id)
+        return {
+            "user_id": user_id,
+            "friend_count": len(self._friend_ids(user_id)),
+            "pending_received_count": sum(1 for row in pending if row["initiated_by"] != user_id),
+            "pending_sent_count": sum(1 for row in pending if row["initiated_by"] == user_id),
+            "favorites_given_count": len(self._favorites_by_favoriting.get(user_id, ())),
+            "favorites_received_count": len(self._favorites_by_favorited.get(user_id, ())),
+            "blocked_count": len(self._blocks_by_blocker.get(user_id, ())),
+            "profile_view_count": sum(row["view_count"] for _, row in viewers),
+            "unique_viewer_count": len(viewers),
+            "updated_at": _iso(datetime.now(timezone.utc)),
+        }
+
+    def sp_social_reconcile_social_counters(self, after_user_id=None, batch_size=1000):
+        user_ids = sorted(uid for uid in self.users if after_user_id is None or uid > _uuid(after_user_id))[:batch_size]
+        return {
+            "checked_count": len(user_ids),
+            "repaired_count": 0,
+            "repaired_user_ids": [],
+            "next_after_user_id": user_ids[-1] if len(user_ids) == batch_size else None,
+        }
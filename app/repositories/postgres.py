@@ -0,0 +1,157 @@
+import time
+import uuid
+from contextlib import contextmanager
+import psycopg
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+from app.core.deadline import DeadlineExceeded, RequestCancelled, current_deadline, statement_timeout_ms
+from app.core.metrics import metrics
+from app.core.profiling import current_sp_timings
+from app.core.tracing import span
+from app.utils.database import get_db_connection
+from app.utils.streaming import stream_ndjson
+
+def _placeholder(arg: Any) -> str:
+    # The only array parameters our SPs take are UUID[]
+    return "%s::uuid[]" if isinstance(arg, (list, tuple)) else "%s"
+
+def _sp_query(sp_name: str, args: Tuple[Any, ...]) -> str:
+    placeholders = ", ".join(_placeholder(arg) for arg in args)
+    return f"SELECT activity.{sp_name}({placeholders})"
+
+# SET LOCAL cannot take a bind parameter; set_config(..., is_local => true) can
+SET_STATEMENT_TIMEOUT = "SELECT set_config('statement_timeout', %s, true)"
+
+@contextmanager
+def _deadline_guard(conn, label: str):
+    """Lets a client disconnect cancel the query, and maps a cancelled query to 504 / 499"""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.attach(conn)
+    try:
+        yield
+    except psycopg.errors.QueryCanceled as e:
+        if deadline is not None and deadline.cancelled:
+            metrics.increment("sp_cancelled_on_disconnect", sp=label)
+            raise RequestCancelled(f"Client disconnected during {label}") from e
+        metrics.increment("sp_timeouts", sp=label)
+        raise DeadlineExceeded(f"{label} exceeded its time budget") from e
+    finally:
+        if deadline is not None:
+            deadline.detach(conn)
+
+class PostgresRepository:
+    def call(self, sp_name: str, *args: Any, write: bool = False) -> Any:
+        timings = current_sp_timings.get()
+        if timings is None:
+            return self._call(sp_name, args, write)
+        started = time.perf_counter()
+        try:
+            return self._call(sp_name, args, write)
+        finally:
+            timings.append((sp_name, (time.perf_counter() - started) * 1000))
+
+    def _call(self, sp_name: str, args: Tuple[Any, ...], write: bool) -> Any:
+        timeout_ms = statement_timeout_ms((sp_name,))
+        with span(sp_name, **{"db.write": write}):
+            with get_db_connection() as conn, _deadline_guard(conn, sp_name):
+                with conn.cursor() as cursor:
+                    if timeout_ms is None:
+                        cursor.execute(_sp_query(sp_name, args), args)
+                    else:
+                        # Same round trip as the call itself
+                        with conn.pipeline():
+                            conn.execute(SET_STATEMENT_TIMEOUT, (str(timeout_ms),))
+                            cursor.execute(_sp_query(sp_name, args), args)
+                    result = cursor.fetchone()[0]
+                    if write:
+                        conn.commit()
+                    return result
+
+    def call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]]) -> List[Any]:
+        """
+        Read-only SPs on one connection in pipeline mode: every query is sent
+        before the first result is awaited. A failure aborts the pipeline, so
+        the calls are then repeated one by one to pin each error to its call.
+        """
+        timings = current_sp_timings.get()
+        if timings is None:
+            return self._call_many(calls)
+        started = time.perf_counter()
+        try:
+            return self._call_many(calls)
+        finally:
+            timings.append(("pipeline:" + ",".join(sp_name for sp_name, _ in calls), (time.perf_counter() - started) * 1000))
+
+    def _call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]]) -> List[Any]:
+        timeout_ms = statement_timeout_ms(sp_name for sp_name, _ in calls)
+        with span("db.pipeline", **{"db.procedures": [sp_name for sp_name, _ in calls]}):
+            with get_db_connection() as conn, _deadline_guard(conn, "pipeline"):
+                try:
+                    cursors = []
+                    with conn.pipeline():
+                        if timeout_ms is not None:
+                            conn.execute(SET_STATEMENT_TIMEOUT, (str(timeout_ms),))
+                        for sp_name, args in calls:
+                            cursor = conn.cursor()
+                            cursor.execute(_sp_query(sp_name, args), args)
+                            cursors.append(cursor)
+                    results = [cursor.fetchone()[0] for cursor in cursors]
+                    for cursor in cursors:
+                        cursor.close()
+                except psycopg.errors.QueryCanceled:
+                    # Timed out or cancelled: the whole batch answers 504 / 499
+                    raise
+                except psycopg.Error:
+                    conn.rollback()
+                    results = []
+                    for sp_name, args in calls:
+                        try:
+                            with conn.cursor() as cursor:
+                                if timeout_ms is not None:
+                                    conn.execute(SET_STATEMENT_TIMEOUT, (str(timeout_ms),))
+                                cursor.execute(_sp_query(sp_name, args), args)
+                                results.append(cursor.fetchone()[0])
+                        except psycopg.errors.QueryCanceled:
+                            raise
+                        except psycopg.Error as e:
+                            conn.rollback()
+                            results.append(e)
+                conn.rollback()
+                return results
+
+    def bulk_block_users(self, blocker_id: str, blocked_ids: List[str], reason: Optional[str]) -> Any:
+        batch_id = uuid.uuid4()
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                with cursor.copy(
+                    "COPY activity.bulk_block_staging (batch_id, position, blocked_user_id) FROM STDIN"
+                ) as copy:
+                    for position, blocked_id in enumerate(blocked_ids):
+                        copy.write_row((batch_id, position, blocked_id))
+                cursor.execute(
+                    "SELECT activity.sp_social_bulk_block_users(%s, %s, %s)",
+                    (blocker_id, batch_id, reason)
+                )
+                result = cursor.fetchone()[0]
+                conn.commit()
+                return result
+
+    async def stream(self, sp_name: str, *args: Any, batch_size: int = 500,
+                     is_disconnected: Optional[Callable] = None) -> AsyncIterator[bytes]:
+        placeholders = ", ".join(_placeholder(arg) for arg in args)
+        return await stream_ndjson(
+            f"SELECT data::text FROM activity.{sp_name}({placeholders}) AS data",
+            args,
+            batch_size=batch_size,
+            is_disconnected=is_disconnected
+        )
+
+    def get_user(self, user_id: str) -> Optional[Tuple[str, str]]:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT email, subscription_level FROM activity.users WHERE user_id = %s",
+                    (user_id,)
+                )
+                row = cursor.fetchone()
+                return tuple(row) if row else None
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.core.security import get_current_user
+from app.models.requests import BatchRequest
+from app.services.batch_service import BatchService
+from app.utils.errors import create_error_response
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from typing import Dict
+
+router = APIRouter(prefix="/social/batch", tags=["batch"])
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
+
+@router.post("", status_code=200)
+@limiter.limit("60/minute")
+async def run_batch(
+    request_obj: BatchRequest,
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Run up to 20 read operations in one request; results in order with per-item status"""
+    try:
+        service = BatchService()
+        result = await run_in_threadpool(
+            service.run,
+            current_user=current_user,
+            operations=request_obj.operations
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
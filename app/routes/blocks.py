@@ -1,33 +1,106 @@
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.core.security import get_current_user
+from app.core.idempotency import idempotent
 from app.services.block_service import BlockService
-from app.models.requests import BlockUserRequest
+from app.models.requests import BlockUserRequest, BulkBlockUsersRequest
+from app.utils.block_set import MEDIA_TYPES
 from app.utils.errors import create_error_response
+from app.utils.projection import is_ids_only, project_list
+from app.utils.streaming import NDJSON_MEDIA_TYPE
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/social/blocks", tags=["blocking"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 @router.post("", status_code=201)
 @limiter.limit("10/minute")
 async def block_user(
     request_obj: BlockUserRequest,
     request: Request,
+    response: Response,
     current_user: Dict = Depends(get_current_user)
 ):
     """Block user"""
+    def run():
+        try:
+            service = BlockService()
+            result = service.block_user(
+                blocker_id=current_user["user_id"],
+                blocked_id=str(request_obj.blocked_user_id),
+                reason=request_obj.reason
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
+
+@router.post("/bulk", status_code=200)
+@limiter.limit("2/minute")
+async def bulk_block_users(
+    request_obj: BulkBlockUsersRequest,
+    request: Request,
+    response: Response,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Block up to 5000 users at once (per-target outcomes)"""
+    def run():
+        try:
+            service = BlockService()
+            result = service.bulk_block_users(
+                blocker_id=current_user["user_id"],
+                blocked_ids=[str(user_id) for user_id in request_obj.blocked_user_ids],
+                reason=request_obj.reason
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
+
+@router.get("/export")
+@limiter.limit("5/minute")
+async def export_blocked_users(
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Stream the complete blocked users list as NDJSON, ending with {"type": "end", "rows": N}"""
     try:
         service = BlockService()
-        result = service.block_user(
+        chunks = await service.export_blocked_users(
             blocker_id=current_user["user_id"],
-            blocked_id=str(request_obj.blocked_user_id),
-            reason=request_obj.reason
+            is_disconnected=request.is_disconnected
+        )
+    except Exception as e:
+        return create_error_response(e, 400)
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/set")
+@limiter.limit("60/minute")
+async def get_block_set(
+    request: Request,
+    format: str = Query(default="auto", pattern="^(auto|binary|bloom|json)$"),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Users I blocked or who blocked me, as sorted binary UUIDs, a Bloom filter or JSON (ETag versioned)"""
+    try:
+        service = BlockService()
+        encoded = await run_in_threadpool(
+            service.export_block_set,
+            user_id=current_user["user_id"],
+            requested_format=format
         )
-        return result
     except Exception as e:
         return create_error_response(e, 400)
+    headers = {**encoded.headers, "ETag": encoded.etag, "Cache-Control": "private, no-cache"}
+    if encoded.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(encoded.body, media_type=MEDIA_TYPES[encoded.format], headers=headers)
 
 @router.delete("/{blocked_user_id}", status_code=200)
 @limiter.limit("20/minute")
@@ -53,17 +126,24 @@ async def get_blocked_users(
     request: Request,
     limit: int = Query(default=100, le=100),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Get blocked users list"""
     try:
         service = BlockService()
+        if is_ids_only(fields):
+            return service.get_blocked_user_ids(
+                blocker_id=current_user["user_id"],
+                limit=limit,
+                offset=offset
+            )
         result = service.get_blocked_users(
             blocker_id=current_user["user_id"],
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "blocked_users", fields)
     except Exception as e:
         return create_error_response(e, 400)
 
@@ -77,7 +157,8 @@ async def check_block_status(
     """Check block status"""
     try:
         service = BlockService()
-        result = service.check_block_status(
+        result = await run_in_threadpool(
+            service.check_block_status,
             user_id_1=current_user["user_id"],
             user_id_2=target_user_id
         )
@@ -96,7 +177,8 @@ async def check_can_interact(
     """Check if users can interact (respects XXL exception)"""
     try:
         service = BlockService()
-        result = service.check_can_interact(
+        result = await run_in_threadpool(
+            service.check_can_interact,
             user_id_1=current_user["user_id"],
             user_id_2=target_user_id,
             activity_type=activity_type
@@ -104,3 +186,21 @@ async def check_can_interact(
         return result
     except Exception as e:
         return create_error_response(e, 400)
+
+@router.get("/activity/{activity_id}/conflicts")
+@limiter.limit("30/minute")
+async def get_activity_block_conflicts(
+    activity_id: str,
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get all blocking pairs among an activity's registered participants"""
+    try:
+        service = BlockService()
+        result = service.get_activity_block_conflicts(
+            user_id=current_user["user_id"],
+            activity_id=activity_id
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.core.security import get_current_user
+from app.services.export_service import ExportService
+from app.utils.errors import create_error_response
+from app.utils.streaming import NDJSON_MEDIA_TYPE
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from typing import Dict
+
+router = APIRouter(prefix="/social/export", tags=["export"])
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
+
+@router.get("")
+@limiter.limit("2/minute")
+async def export_user_data(
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Stream all friendships, favorites, blocks and profile views as NDJSON, ending with {"type": "end", "rows": N}"""
+    try:
+        service = ExportService()
+        chunks = await service.export_user_data(
+            user_id=current_user["user_id"],
+            subscription_level=current_user["subscription_level"],
+            is_disconnected=request.is_disconnected
+        )
+    except Exception as e:
+        return create_error_response(e, 400)
+    return StreamingResponse(
+        chunks,
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": "attachment; filename=social-export.ndjson"}
+    )
@@ -1,32 +1,40 @@
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.core.security import get_current_user
+from app.core.idempotency import idempotent
 from app.services.favorite_service import FavoriteService
 from app.models.requests import FavoriteUserRequest
 from app.utils.errors import create_error_response
+from app.utils.projection import is_ids_only, project_list
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/social/favorites", tags=["favorites"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 @router.post("", status_code=201)
 @limiter.limit("30/minute")
 async def favorite_user(
     request_obj: FavoriteUserRequest,
     request: Request,
+    response: Response,
     current_user: Dict = Depends(get_current_user)
 ):
     """Favorite user"""
-    try:
-        service = FavoriteService()
-        result = service.favorite_user(
-            favoriting_id=current_user["user_id"],
-            favorited_id=str(request_obj.favorited_user_id)
-        )
-        return result
-    except Exception as e:
-        return create_error_response(e, 400)
+    def run():
+        try:
+            service = FavoriteService()
+            result = service.favorite_user(
+                favoriting_id=current_user["user_id"],
+                favorited_id=str(request_obj.favorited_user_id)
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
 
 @router.delete("/{favorited_user_id}", status_code=200)
 @limiter.limit("30/minute")
@@ -52,17 +60,24 @@ async def get_my_favorites(
     request: Request,
     limit: int = Query(default=100, le=100),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Get my favorites"""
     try:
         service = FavoriteService()
+        if is_ids_only(fields):
+            return service.get_my_favorite_ids(
+                user_id=current_user["user_id"],
+                limit=limit,
+                offset=offset
+            )
         result = service.get_my_favorites(
             user_id=current_user["user_id"],
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "favorites", fields)
     except Exception as e:
         return create_error_response(e, 400)
 
@@ -72,18 +87,26 @@ async def get_who_favorited_me(
     request: Request,
     limit: int = Query(default=100, le=100),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Get who favorited me (Premium feature)"""
     try:
         service = FavoriteService()
+        if is_ids_only(fields):
+            return service.get_who_favorited_me_ids(
+                user_id=current_user["user_id"],
+                subscription_level=current_user["subscription_level"],
+                limit=limit,
+                offset=offset
+            )
         result = service.get_who_favorited_me(
             user_id=current_user["user_id"],
             subscription_level=current_user["subscription_level"],
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "favorited_by", fields)
     except Exception as e:
         if "PREMIUM_REQUIRED" in str(e):
             return create_error_response(e, 403)
@@ -99,7 +122,8 @@ async def check_favorite_status(
     """Check favorite status"""
     try:
         service = FavoriteService()
-        result = service.check_favorite_status(
+        result = await run_in_threadpool(
+            service.check_favorite_status,
             favoriting_id=current_user["user_id"],
             favorited_id=target_user_id
         )
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.core.security import get_current_user
+from app.core.idempotency import idempotent
 from app.services.friendship_service import FriendshipService
+from app.services.friend_suggestion_service import FriendSuggestionService
 from app.models.requests import (
     SendFriendRequestRequest,
     AcceptFriendRequestRequest,
-    DeclineFriendRequestRequest
+    DeclineFriendRequestRequest,
+    BulkFriendRequestsRequest,
+    MutualFriendCountsRequest
 )
 from app.models.responses import (
     FriendshipResponse,
@@ -12,66 +18,123 @@ from app.models.responses import (
     FriendshipStatusResponse
 )
 from app.utils.errors import create_error_response
+from app.utils.projection import is_ids_only, project_list
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/social/friends", tags=["friendships"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 @router.post("/request", status_code=201)
 @limiter.limit("20/minute")
 async def send_friend_request(
     request_obj: SendFriendRequestRequest,
     request: Request,
+    response: Response,
     current_user: Dict = Depends(get_current_user)
 ):
     """Send friend request"""
-    try:
-        service = FriendshipService()
-        result = service.send_friend_request(
-            requester_id=current_user["user_id"],
-            target_id=str(request_obj.target_user_id)
-        )
-        return result
-    except Exception as e:
-        return create_error_response(e, 400)
+    def run():
+        try:
+            service = FriendshipService()
+            result = service.send_friend_request(
+                requester_id=current_user["user_id"],
+                target_id=str(request_obj.target_user_id)
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
 
 @router.post("/accept", status_code=200)
 @limiter.limit("30/minute")
 async def accept_friend_request(
     request_obj: AcceptFriendRequestRequest,
     request: Request,
+    response: Response,
     current_user: Dict = Depends(get_current_user)
 ):
     """Accept friend request"""
-    try:
-        service = FriendshipService()
-        result = service.accept_friend_request(
-            accepting_id=current_user["user_id"],
-            requester_id=str(request_obj.requester_user_id)
-        )
-        return result
-    except Exception as e:
-        return create_error_response(e, 400)
+    def run():
+        try:
+            service = FriendshipService()
+            result = service.accept_friend_request(
+                accepting_id=current_user["user_id"],
+                requester_id=str(request_obj.requester_user_id)
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
 
 @router.post("/decline", status_code=200)
 @limiter.limit("30/minute")
 async def decline_friend_request(
     request_obj: DeclineFriendRequestRequest,
     request: Request,
+    response: Response,
     current_user: Dict = Depends(get_current_user)
 ):
     """Decline friend request"""
-    try:
-        service = FriendshipService()
-        result = service.decline_friend_request(
-            declining_id=current_user["user_id"],
-            requester_id=str(request_obj.requester_user_id)
-        )
-        return result
-    except Exception as e:
-        return create_error_response(e, 400)
+    def run():
+        try:
+            service = FriendshipService()
+            result = service.decline_friend_request(
+                declining_id=current_user["user_id"],
+                requester_id=str(request_obj.requester_user_id)
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
+
+@router.post("/accept/bulk", status_code=200)
+@limiter.limit("5/minute")
+async def bulk_accept_friend_requests(
+    request_obj: BulkFriendRequestsRequest,
+    request: Request,
+    response: Response,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Accept many (or all) pending friend requests (per-requester outcomes)"""
+    def run():
+        try:
+            service = FriendshipService()
+            result = service.bulk_accept_friend_requests(
+                accepting_id=current_user["user_id"],
+                requester_ids=None if request_obj.all_pending else [str(user_id) for user_id in request_obj.requester_user_ids]
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
+
+@router.post("/decline/bulk", status_code=200)
+@limiter.limit("5/minute")
+async def bulk_decline_friend_requests(
+    request_obj: BulkFriendRequestsRequest,
+    request: Request,
+    response: Response,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Decline many (or all) pending friend requests (per-requester outcomes)"""
+    def run():
+        try:
+            service = FriendshipService()
+            result = service.bulk_decline_friend_requests(
+                declining_id=current_user["user_id"],
+                requester_ids=None if request_obj.all_pending else [str(user_id) for user_id in request_obj.requester_user_ids]
+            )
+            return result
+        except Exception as e:
+            return create_error_response(e, 400)
+
+    return await idempotent(request, response, current_user["user_id"], run)
 
 @router.delete("/{friend_user_id}", status_code=200)
 @limiter.limit("20/minute")
@@ -97,17 +160,24 @@ async def get_friends_list(
     request: Request,
     limit: int = Query(default=100, le=100),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Get friends list"""
     try:
         service = FriendshipService()
+        if is_ids_only(fields):
+            return service.get_friend_ids(
+                user_id=current_user["user_id"],
+                limit=limit,
+                offset=offset
+            )
         result = service.get_friends_list(
             user_id=current_user["user_id"],
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "friends", fields)
     except Exception as e:
         return create_error_response(e, 400)
 
@@ -161,10 +231,69 @@ async def check_friendship_status(
     """Check friendship status"""
     try:
         service = FriendshipService()
-        result = service.check_friendship_status(
+        result = await run_in_threadpool(
+            service.check_friendship_status,
             user_id_1=current_user["user_id"],
             user_id_2=target_user_id
         )
         return result
     except Exception as e:
         return create_error_response(e, 400)
+
+@router.get("/mutual/{target_user_id}")
+@limiter.limit("60/minute")
+async def get_mutual_friends(
+    target_user_id: str,
+    request: Request,
+    limit: int = Query(default=100, le=100),
+    offset: int = Query(default=0, ge=0),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get mutual friends with another user"""
+    try:
+        service = FriendshipService()
+        result = service.get_mutual_friends(
+            user_id=current_user["user_id"],
+            target_id=target_user_id,
+            limit=limit,
+            offset=offset
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
+
+@router.post("/mutual/counts", status_code=200)
+@limiter.limit("60/minute")
+async def get_mutual_friend_counts(
+    request_obj: MutualFriendCountsRequest,
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get mutual friend counts for up to 100 users"""
+    try:
+        service = FriendshipService()
+        result = service.get_mutual_friend_counts(
+            user_id=current_user["user_id"],
+            target_ids=[str(user_id) for user_id in request_obj.user_ids]
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
+
+@router.get("/suggestions")
+@limiter.limit("60/minute")
+async def get_friend_suggestions(
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=50),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get precomputed "people you may know" suggestions"""
+    try:
+        service = FriendSuggestionService()
+        result = service.get_friend_suggestions(
+            user_id=current_user["user_id"],
+            limit=limit
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.models.responses import HealthCheckResponse
+from app.core.metrics import metrics
 from datetime import datetime
 
 router = APIRouter(tags=["health"])
@@ -12,3 +13,7 @@ async def health_check():
         "version": "1.0.0",
         "timestamp": datetime.utcnow()
     }
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
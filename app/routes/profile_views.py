@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, Query, Request
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.core.security import get_current_user
 from app.services.profile_view_service import ProfileViewService
 from app.models.requests import RecordProfileViewRequest
 from app.utils.errors import create_error_response
+from app.utils.projection import is_ids_only, project_list
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/social/profile-views", tags=["profile_views"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 @router.post("", status_code=200)
 @limiter.limit("100/minute")
@@ -35,18 +38,26 @@ async def get_who_viewed_me(
     request: Request,
     limit: int = Query(default=100, le=100),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Get who viewed my profile (Premium feature)"""
     try:
         service = ProfileViewService()
+        if is_ids_only(fields):
+            return service.get_who_viewed_my_profile_ids(
+                user_id=current_user["user_id"],
+                subscription_level=current_user["subscription_level"],
+                limit=limit,
+                offset=offset
+            )
         result = service.get_who_viewed_my_profile(
             user_id=current_user["user_id"],
             subscription_level=current_user["subscription_level"],
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "viewers", fields)
     except Exception as e:
         if "PREMIUM_REQUIRED" in str(e):
             return create_error_response(e, 403)
@@ -61,7 +72,8 @@ async def get_profile_view_count(
     """Get my profile view count"""
     try:
         service = ProfileViewService()
-        result = service.get_profile_view_count(
+        result = await run_in_threadpool(
+            service.get_profile_view_count,
             user_id=current_user["user_id"]
         )
         return result
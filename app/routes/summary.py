@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.core.security import get_current_user
+from app.services.social_summary_service import SocialSummaryService
+from app.utils.errors import create_error_response
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from typing import Dict
+
+router = APIRouter(prefix="/social/summary", tags=["summary"])
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
+
+@router.get("")
+@limiter.limit("60/minute")
+async def get_social_summary(
+    request: Request,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get friend, request, favorite, block and profile view counts in one call"""
+    try:
+        service = SocialSummaryService()
+        result = await run_in_threadpool(
+            service.get_summary,
+            user_id=current_user["user_id"]
+        )
+        return result
+    except Exception as e:
+        return create_error_response(e, 400)
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from app.config import settings
 from app.core.security import get_current_user
 from app.services.user_search_service import UserSearchService
 from app.utils.errors import create_error_response
+from app.utils.projection import is_ids_only, project_list
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/social/users", tags=["user_search"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 @router.get("/search")
 @limiter.limit("60/minute")
@@ -16,6 +18,7 @@ async def search_users(
     q: str = Query(..., min_length=2, max_length=100),
     limit: int = Query(default=20, le=50),
     offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, max_length=200),
     current_user: Dict = Depends(get_current_user)
 ):
     """Search users by name or username"""
@@ -24,12 +27,19 @@ async def search_users(
 
     try:
         service = UserSearchService()
+        if is_ids_only(fields):
+            return service.search_user_ids(
+                searcher_id=current_user["user_id"],
+                query=q,
+                limit=limit,
+                offset=offset
+            )
         result = service.search_users(
             searcher_id=current_user["user_id"],
             query=q,
             limit=limit,
             offset=offset
         )
-        return result
+        return project_list(result, "users", fields)
     except Exception as e:
         return create_error_response(e, 400)
@@ -0,0 +1,151 @@
+"""
+POST /social/batch: several read operations for one user in one request.
+
+Every operation runs its normal service method, so response caches, the
+graph fast path and single-flight coalescing apply as usual. The methods run
+on short-lived threads against a PipelinedRepository: a stored procedure call
+parks its thread, and once every operation is parked or finished the parked
+calls go to the database together through Repository.call_many (one
+pipelined round trip on one pooled connection for Postgres). Operations that
+need a second SP simply park again for the next round.
+
+A thread blocked anywhere but in a parked call would stall the rounds, so
+batch operations skip single-flight (a follower waits without parking), and
+identical operations run once and share their result.
+"""
+import contextvars
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.models.requests import BatchOperation
+from app.repositories.base import Repository, get_repository
+from app.services.block_service import BlockService
+from app.services.favorite_service import FavoriteService
+from app.services.friendship_service import FriendshipService
+from app.services.profile_view_service import ProfileViewService
+from app.services.social_summary_service import SocialSummaryService
+from app.utils.errors import map_error
+from app.utils.singleflight import uncoalesced
+
+def _page(op: BatchOperation) -> Dict[str, int]:
+    # Omitted limits fall back to the service (and route) defaults
+    return {"offset": op.offset} if op.limit is None else {"limit": op.limit, "offset": op.offset}
+
+OPERATIONS: Dict[str, Callable[[Repository, Dict, BatchOperation], Dict]] = {
+    "friendship_status": lambda repo, user, op: FriendshipService(repo).check_friendship_status(
+        user["user_id"], str(op.target_user_id)),
+    "friends": lambda repo, user, op: FriendshipService(repo).get_friends_list(user["user_id"], **_page(op)),
+    "friend_requests_received": lambda repo, user, op: FriendshipService(repo).get_pending_friend_requests(
+        user["user_id"], **_page(op)),
+    "friend_requests_sent": lambda repo, user, op: FriendshipService(repo).get_sent_friend_requests(
+        user["user_id"], **_page(op)),
+    "mutual_friends": lambda repo, user, op: FriendshipService(repo).get_mutual_friends(
+        user["user_id"], str(op.target_user_id), **_page(op)),
+    "block_status": lambda repo, user, op: BlockService(repo).check_block_status(
+        user["user_id"], str(op.target_user_id)),
+    "can_interact": lambda repo, user, op: BlockService(repo).check_can_interact(
+        user["user_id"], str(op.target_user_id), op.activity_type),
+    "blocked_users": lambda repo, user, op: BlockService(repo).get_blocked_users(user["user_id"], **_page(op)),
+    "favorite_status": lambda repo, user, op: FavoriteService(repo).check_favorite_status(
+        user["user_id"], str(op.target_user_id)),
+    "favorites": lambda repo, user, op: FavoriteService(repo).get_my_favorites(user["user_id"], **_page(op)),
+    "favorited_by": lambda repo, user, op: FavoriteService(repo).get_who_favorited_me(
+        user["user_id"], user["subscription_level"], **_page(op)),
+    "profile_view_count": lambda repo, user, op: ProfileViewService(repo).get_profile_view_count(user["user_id"]),
+    "summary": lambda repo, user, op: SocialSummaryService(repo).get_summary(user["user_id"]),
+}
+
+class _ParkedCall:
+    __slots__ = ("sp_name", "args", "result", "done")
+
+    def __init__(self, sp_name: str, args: Tuple[Any, ...]):
+        self.sp_name = sp_name
+        self.args = args
+        self.result: Any = None
+        self.done = False
+
+class PipelinedRepository:
+    """Repository for the operations of one batch; see the module docstring"""
+
+    def __init__(self, repository: Repository, operations: int):
+        self.repository = repository
+        self.running = operations
+        self.parked: List[_ParkedCall] = []
+        self.condition = threading.Condition()
+
+    def call(self, sp_name: str, *args: Any, write: bool = False) -> Any:
+        if write:
+            # Batch operations are reads; never hold a write back for a round
+            return self.repository.call(sp_name, *args, write=True)
+        parked = _ParkedCall(sp_name, args)
+        with self.condition:
+            self.parked.append(parked)
+            self.running -= 1
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: parked.done)
+        if isinstance(parked.result, Exception):
+            raise parked.result
+        return parked.result
+
+    def __getattr__(self, name: str):
+        return getattr(self.repository, name)
+
+    def operation_finished(self):
+        with self.condition:
+            self.running -= 1
+            self.condition.notify_all()
+
+    def run_rounds(self):
+        """Send the parked calls each time no operation is running, until all have finished"""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.running == 0)
+                parked, self.parked = self.parked, []
+            if not parked:
+                return
+            try:
+                results = self.repository.call_many([(call.sp_name, call.args) for call in parked])
+            except Exception as e:
+                results = [e] * len(parked)
+            with self.condition:
+                for call, result in zip(parked, results):
+                    call.result = result
+                    call.done = True
+                self.running += len(parked)
+                self.condition.notify_all()
+
+class BatchService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
+    def run(self, current_user: Dict, operations: List[BatchOperation]) -> Dict:
+        # Index of the first occurrence of each distinct operation
+        first: Dict[str, int] = {}
+        sources = [first.setdefault(op.model_dump_json(), index) for index, op in enumerate(operations)]
+        unique = sorted(first.values())
+
+        pipeline = PipelinedRepository(self.repository, len(unique))
+        results: List[Optional[Dict]] = [None] * len(operations)
+
+        def run_operation(index: int, op: BatchOperation):
+            try:
+                with uncoalesced():
+                    results[index] = {"op": op.op, "status": 200, "result": OPERATIONS[op.op](pipeline, current_user, op)}
+            except Exception as e:
+                status_code, message = map_error(e, 400)
+                results[index] = {"op": op.op, "status": status_code, "error": message}
+            finally:
+                pipeline.operation_finished()
+
+        threads = [
+            # Each thread gets its own copy of the request context (trace span, profiling timings)
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(run_operation, index, operations[index]), daemon=True
+            )
+            for index in unique
+        ]
+        for thread in threads:
+            thread.start()
+        pipeline.run_rounds()
+        for thread in threads:
+            thread.join()
+        return {"results": [results[source] for source in sources]}
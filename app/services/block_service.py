@@ -1,55 +1,76 @@
-from app.utils.database import get_db_connection
-from typing import Dict, Optional
+from app.config import settings
+from app.repositories.base import Repository, get_repository
+from app.utils.block_set import EncodedBlockSet, encode_block_set
+from app.utils.response_cache import bump_versions, cached_response
+from app.utils.singleflight import coalesced
+from app.graph.manager import social_graph
+from typing import AsyncIterator, Dict, List, Optional
 
 class BlockService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
     def block_user(self, blocker_id: str, blocked_id: str, reason: Optional[str] = None) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_block_user(%s, %s, %s)",
-                    (blocker_id, blocked_id, reason)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_block_user", blocker_id, blocked_id, reason, write=True)
+        social_graph.block_changed(blocker_id, blocked_id, True)
+        social_graph.friendship_changed(blocker_id, blocked_id, None)
+        bump_versions(blocker_id, blocked_id)
+        return result
 
     def unblock_user(self, blocker_id: str, blocked_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_unblock_user(%s, %s)",
-                    (blocker_id, blocked_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_unblock_user", blocker_id, blocked_id, write=True)
+        social_graph.block_changed(blocker_id, blocked_id, False)
+        bump_versions(blocker_id, blocked_id)
+        return result
+
+    def bulk_block_users(self, blocker_id: str, blocked_ids: List[str], reason: Optional[str] = None) -> Dict:
+        result = self.repository.bulk_block_users(blocker_id, blocked_ids, reason)
+        for item in result["results"]:
+            if item["outcome"] == "blocked":
+                social_graph.block_changed(blocker_id, item["blocked_user_id"], True)
+                social_graph.friendship_changed(blocker_id, item["blocked_user_id"], None)
+        bump_versions(blocker_id, *(item["blocked_user_id"] for item in result["results"] if item["outcome"] == "blocked"))
+        return result
 
+    async def export_blocked_users(self, blocker_id: str, is_disconnected=None) -> AsyncIterator[bytes]:
+        return await self.repository.stream(
+            "sp_social_export_blocked_users",
+            blocker_id,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            is_disconnected=is_disconnected
+        )
+
+    @cached_response("blocked")
     def get_blocked_users(self, blocker_id: str, limit: int = 100, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_blocked_users(%s, %s, %s)",
-                    (blocker_id, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_blocked_users", blocker_id, limit, offset)
+
+    @cached_response("blocked_ids")
+    def get_blocked_user_ids(self, blocker_id: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_get_blocked_user_ids", blocker_id, limit, offset)
 
+    @cached_response("block_set")
+    def get_block_set(self, user_id: str) -> Dict:
+        return self.repository.call("sp_social_get_block_set", user_id)
+
+    def export_block_set(self, user_id: str, requested_format: str = "auto") -> EncodedBlockSet:
+        return encode_block_set(
+            self.get_block_set(user_id),
+            requested_format,
+            settings.BLOCK_SET_BLOOM_THRESHOLD,
+            settings.BLOCK_SET_BLOOM_FP_RATE
+        )
+
+    @coalesced("sp_social_check_block_status")
     def check_block_status(self, user_id_1: str, user_id_2: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_check_block_status(%s, %s)",
-                    (user_id_1, user_id_2)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        if social_graph.ready:
+            return social_graph.block_status(user_id_1, user_id_2)
+        return self.repository.call("sp_social_check_block_status", user_id_1, user_id_2)
+
+    def get_activity_block_conflicts(self, user_id: str, activity_id: str) -> Dict:
+        return self.repository.call("sp_social_get_activity_block_conflicts", user_id, activity_id)
 
+    @coalesced("sp_social_check_can_interact")
     def check_can_interact(self, user_id_1: str, user_id_2: str, activity_type: str = "standard") -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_check_can_interact(%s, %s, %s)",
-                    (user_id_1, user_id_2, activity_type)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        if social_graph.ready:
+            return social_graph.can_interact(user_id_1, user_id_2, activity_type)
+        return self.repository.call("sp_social_check_can_interact", user_id_1, user_id_2, activity_type)
@@ -0,0 +1,12 @@
+from app.config import settings
+from app.utils.streaming import stream_ndjson
+from typing import AsyncIterator
+
+class ExportService:
+    async def export_user_data(self, user_id: str, subscription_level: str, is_disconnected=None) -> AsyncIterator[bytes]:
+        return await stream_ndjson(
+            "SELECT data::text FROM activity.sp_social_export_user_data(%s, %s) AS data",
+            (user_id, subscription_level),
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            is_disconnected=is_disconnected
+        )
@@ -1,55 +1,38 @@
-from app.utils.database import get_db_connection
-from typing import Dict
+from app.repositories.base import Repository, get_repository
+from app.utils.response_cache import bump_versions, cached_response
+from app.utils.singleflight import coalesced
+from typing import Dict, Optional
 
 class FavoriteService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
     def favorite_user(self, favoriting_id: str, favorited_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_favorite_user(%s, %s)",
-                    (favoriting_id, favorited_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_favorite_user", favoriting_id, favorited_id, write=True)
+        bump_versions(favoriting_id, favorited_id)
+        return result
 
     def unfavorite_user(self, favoriting_id: str, favorited_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_unfavorite_user(%s, %s)",
-                    (favoriting_id, favorited_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_unfavorite_user", favoriting_id, favorited_id, write=True)
+        bump_versions(favoriting_id, favorited_id)
+        return result
 
+    @cached_response("favorites")
     def get_my_favorites(self, user_id: str, limit: int = 100, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_my_favorites(%s, %s, %s)",
-                    (user_id, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_my_favorites", user_id, limit, offset)
+
+    @cached_response("favorite_ids")
+    def get_my_favorite_ids(self, user_id: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_get_my_favorite_ids", user_id, limit, offset)
 
+    @cached_response("favorited_by")
     def get_who_favorited_me(self, user_id: str, subscription_level: str, limit: int = 100, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_who_favorited_me(%s, %s, %s, %s)",
-                    (user_id, subscription_level, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_who_favorited_me", user_id, subscription_level, limit, offset)
+
+    @cached_response("favorited_by_ids")
+    def get_who_favorited_me_ids(self, user_id: str, subscription_level: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_get_who_favorited_me_ids", user_id, subscription_level, limit, offset)
 
+    @coalesced("sp_social_check_favorite_status")
     def check_favorite_status(self, favoriting_id: str, favorited_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_check_favorite_status(%s, %s)",
-                    (favoriting_id, favorited_id)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_check_favorite_status", favoriting_id, favorited_id)
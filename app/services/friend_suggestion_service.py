@@ -0,0 +1,32 @@
+from app.utils.database import get_db_connection
+from typing import Dict
+
+class FriendSuggestionService:
+    def get_friend_suggestions(self, user_id: str, limit: int = 20) -> Dict:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT activity.sp_social_get_friend_suggestions(%s, %s)",
+                    (user_id, limit)
+                )
+                result = cursor.fetchone()[0]
+                return result
+
+    def refresh_queued_suggestions(self, batch_size: int = 100, top_k: int = 50) -> Dict:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT activity.sp_social_refresh_queued_friend_suggestions(%s, %s)",
+                    (batch_size, top_k)
+                )
+                result = cursor.fetchone()[0]
+                conn.commit()
+                return result
+
+    def enqueue_all_users(self) -> Dict:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT activity.sp_social_enqueue_all_friend_suggestions()")
+                result = cursor.fetchone()[0]
+                conn.commit()
+                return result
@@ -1,87 +1,87 @@
-from app.utils.database import get_db_connection
-from typing import Dict
+from app.repositories.base import Repository, get_repository
+from app.utils.response_cache import bump_versions, cached_response
+from app.utils.singleflight import coalesced
+from app.graph.manager import social_graph
+from typing import Dict, List, Optional
 
 class FriendshipService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
     def send_friend_request(self, requester_id: str, target_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_send_friend_request(%s, %s)",
-                    (requester_id, target_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_send_friend_request", requester_id, target_id, write=True)
+        social_graph.friendship_requested(requester_id, target_id, result.get("created_at"))
+        bump_versions(requester_id, target_id)
+        return result
 
     def accept_friend_request(self, accepting_id: str, requester_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_accept_friend_request(%s, %s)",
-                    (accepting_id, requester_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_accept_friend_request", accepting_id, requester_id, write=True)
+        social_graph.friendship_accepted(accepting_id, requester_id, result)
+        bump_versions(accepting_id, requester_id)
+        return result
 
     def decline_friend_request(self, declining_id: str, requester_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_decline_friend_request(%s, %s)",
-                    (declining_id, requester_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_decline_friend_request", declining_id, requester_id, write=True)
+        social_graph.friendship_changed(declining_id, requester_id, None)
+        bump_versions(declining_id, requester_id)
+        return result
+
+    def bulk_accept_friend_requests(self, accepting_id: str, requester_ids: Optional[List[str]] = None) -> Dict:
+        result = self.repository.call(
+            "sp_social_bulk_accept_friend_requests", accepting_id, requester_ids, write=True
+        )
+        for item in result["results"]:
+            if item["outcome"] == "accepted":
+                social_graph.friendship_accepted(accepting_id, item["requester_user_id"], {
+                    "initiated_by": item["requester_user_id"],
+                    "created_at": item["created_at"],
+                    "accepted_at": result["accepted_at"]
+                })
+        bump_versions(accepting_id, *(item["requester_user_id"] for item in result["results"] if item["outcome"] == "accepted"))
+        return result
+
+    def bulk_decline_friend_requests(self, declining_id: str, requester_ids: Optional[List[str]] = None) -> Dict:
+        result = self.repository.call(
+            "sp_social_bulk_decline_friend_requests", declining_id, requester_ids, write=True
+        )
+        for item in result["results"]:
+            if item["outcome"] == "declined":
+                social_graph.friendship_changed(declining_id, item["requester_user_id"], None)
+        bump_versions(declining_id, *(item["requester_user_id"] for item in result["results"] if item["outcome"] == "declined"))
+        return result
 
     def remove_friend(self, user_id: str, friend_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_remove_friend(%s, %s)",
-                    (user_id, friend_id)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        result = self.repository.call("sp_social_remove_friend", user_id, friend_id, write=True)
+        social_graph.friendship_changed(user_id, friend_id, None)
+        bump_versions(user_id, friend_id)
+        return result
 
+    @cached_response("friends")
     def get_friends_list(self, user_id: str, limit: int = 100, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_friends_list(%s, %s, %s)",
-                    (user_id, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_friends_list", user_id, limit, offset)
 
+    @cached_response("friend_ids")
+    def get_friend_ids(self, user_id: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_get_friend_ids", user_id, limit, offset)
+
+    @cached_response("requests_received")
     def get_pending_friend_requests(self, user_id: str, limit: int = 50, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_pending_friend_requests(%s, %s, %s)",
-                    (user_id, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_pending_friend_requests", user_id, limit, offset)
 
+    @cached_response("requests_sent")
     def get_sent_friend_requests(self, user_id: str, limit: int = 50, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_sent_friend_requests(%s, %s, %s)",
-                    (user_id, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_sent_friend_requests", user_id, limit, offset)
 
+    @coalesced("sp_social_check_friendship_status")
     def check_friendship_status(self, user_id_1: str, user_id_2: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_check_friendship_status(%s, %s)",
-                    (user_id_1, user_id_2)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        if social_graph.ready:
+            return social_graph.friendship_status(user_id_1, user_id_2)
+        return self.repository.call("sp_social_check_friendship_status", user_id_1, user_id_2)
+
+    def get_mutual_friends(self, user_id: str, target_id: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_get_mutual_friends", user_id, target_id, limit, offset)
+
+    def get_mutual_friend_counts(self, user_id: str, target_ids: List[str]) -> Dict:
+        if social_graph.ready:
+            return social_graph.mutual_friend_counts(user_id, target_ids)
+        return self.repository.call("sp_social_get_mutual_friend_counts", user_id, target_ids)
@@ -1,34 +1,27 @@
-from app.utils.database import get_db_connection
-from typing import Dict
+from app.config import settings
+from app.repositories.base import Repository, get_repository
+from app.utils.singleflight import coalesced
+from typing import Dict, Optional
 
 class ProfileViewService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
     def record_profile_view(self, viewer_id: str, viewed_id: str, ghost_mode: bool) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_record_profile_view(%s, %s, %s)",
-                    (viewer_id, viewed_id, ghost_mode)
-                )
-                result = cursor.fetchone()[0]
-                conn.commit()
-                return result
+        return self.repository.call(
+            "sp_social_record_profile_view",
+            viewer_id, viewed_id, ghost_mode, settings.PROFILE_VIEW_DEDUP_WINDOW_SECONDS,
+            write=True
+        )
 
     def get_who_viewed_my_profile(self, user_id: str, subscription_level: str, limit: int = 100, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_who_viewed_my_profile(%s, %s, %s, %s)",
-                    (user_id, subscription_level, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_who_viewed_my_profile", user_id, subscription_level, limit, offset)
+
+    def get_who_viewed_my_profile_ids(self, user_id: str, subscription_level: str, limit: int = 100, offset: int = 0) -> Dict:
+        return self.repository.call(
+            "sp_social_get_who_viewed_my_profile_ids", user_id, subscription_level, limit, offset
+        )
 
+    @coalesced("sp_social_get_profile_view_count")
     def get_profile_view_count(self, user_id: str) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_get_profile_view_count(%s)",
-                    (user_id,)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_get_profile_view_count", user_id)
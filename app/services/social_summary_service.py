@@ -0,0 +1,12 @@
+from app.repositories.base import Repository, get_repository
+from typing import Dict, Optional
+
+class SocialSummaryService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
+    def get_summary(self, user_id: str) -> Dict:
+        return self.repository.call("sp_social_get_social_summary", user_id)
+
+    def reconcile_counters(self, after_user_id: Optional[str] = None, batch_size: int = 1000) -> Dict:
+        return self.repository.call("sp_social_reconcile_social_counters", after_user_id, batch_size, write=True)
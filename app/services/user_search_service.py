@@ -1,13 +1,12 @@
-from app.utils.database import get_db_connection
-from typing import Dict
+from app.repositories.base import Repository, get_repository
+from typing import Dict, Optional
 
 class UserSearchService:
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository or get_repository()
+
     def search_users(self, searcher_id: str, query: str, limit: int = 20, offset: int = 0) -> Dict:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT activity.sp_social_search_users(%s, %s, %s, %s)",
-                    (searcher_id, query, limit, offset)
-                )
-                result = cursor.fetchone()[0]
-                return result
+        return self.repository.call("sp_social_search_users", searcher_id, query, limit, offset)
+
+    def search_user_ids(self, searcher_id: str, query: str, limit: int = 20, offset: int = 0) -> Dict:
+        return self.repository.call("sp_social_search_user_ids", searcher_id, query, limit, offset)
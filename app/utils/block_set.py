@@ -0,0 +1,122 @@
+"""
+Compact encodings of a user's bidirectional block set for downstream services.
+
+The set is every user the caller blocked or was blocked by, as 16-byte UUIDs
+in ascending byte order (the order Postgres sorts uuid in). Its version is a
+blake2b digest of that byte string, so equal sets always share a version and
+consumers can revalidate a cached copy with If-None-Match.
+
+Encodings:
+- `binary`: the sorted UUIDs back to back (16 bytes each); look up with bisect.
+- `bloom`: a Bloom filter of `bits` bits and `hashes` probes. Probe i of a user
+  is bit (h1 + i * h2) mod bits, where h1 / h2 are the first / last 8 bytes of
+  blake2b(uuid bytes, digest_size=16) read little-endian (h2 forced odd). Bit n
+  lives in byte n // 8 at position n % 8. A hit may be a false positive (rate
+  set by BLOCK_SET_BLOOM_FP_RATE) and must be confirmed with can-interact.
+- `json`: both directions as UUID strings, for debugging and small clients.
+"""
+import json
+import math
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Dict, Iterable, List, NamedTuple
+from uuid import UUID
+
+MEDIA_TYPES = {
+    "binary": "application/octet-stream",
+    "bloom": "application/octet-stream",
+    "json": "application/json",
+}
+
+class EncodedBlockSet(NamedTuple):
+    format: str
+    version: str
+    count: int
+    body: bytes
+    headers: Dict[str, str]
+
+    @property
+    def etag(self) -> str:
+        # One version, several representations: each gets its own strong ETag
+        return f'"{self.version}-{self.format}"'
+
+def sorted_uuid_bytes(user_ids: Iterable[str]) -> List[bytes]:
+    return sorted({UUID(str(user_id)).bytes for user_id in user_ids})
+
+def encode_binary(uuid_bytes: List[bytes]) -> bytes:
+    return b"".join(uuid_bytes)
+
+def set_version(binary: bytes) -> str:
+    return blake2b(binary, digest_size=16).hexdigest()
+
+def binary_contains(binary: bytes, user_id: str) -> bool:
+    """Reference lookup in a `binary` body (consumers do the same in their language)"""
+    target = UUID(str(user_id)).bytes
+    count = len(binary) // 16
+    i = bisect_left(range(count), target, key=lambda n: binary[n * 16:n * 16 + 16])
+    return i < count and binary[i * 16:i * 16 + 16] == target
+
+def _probes(uuid_bytes: bytes, bits: int, hashes: int):
+    digest = blake2b(uuid_bytes, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return ((h1 + i * h2) % bits for i in range(hashes))
+
+class BloomFilter:
+    def __init__(self, bits: int, hashes: int, data: bytes = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray(data) if data is not None else bytearray(bits // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        bits = max(64, (bits + 7) // 8 * 8)
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return cls(bits, hashes)
+
+    def add(self, uuid_bytes: bytes):
+        for bit in _probes(uuid_bytes, self.bits, self.hashes):
+            self.data[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, user_id: str) -> bool:
+        return all(
+            self.data[bit >> 3] & (1 << (bit & 7))
+            for bit in _probes(UUID(str(user_id)).bytes, self.bits, self.hashes)
+        )
+
+def encode_bloom(uuid_bytes: List[bytes], fp_rate: float) -> BloomFilter:
+    bloom = BloomFilter.for_capacity(len(uuid_bytes), fp_rate)
+    for value in uuid_bytes:
+        bloom.add(value)
+    return bloom
+
+def choose_format(requested: str, count: int, bloom_threshold: int) -> str:
+    if requested != "auto":
+        return requested
+    return "bloom" if count > bloom_threshold else "binary"
+
+def encode_block_set(block_set: Dict, requested_format: str, bloom_threshold: int, fp_rate: float) -> EncodedBlockSet:
+    """Encode a sp_social_get_block_set result ({"blocked": [...], "blocked_by": [...]})"""
+    uuid_bytes = sorted_uuid_bytes([*block_set["blocked"], *block_set["blocked_by"]])
+    binary = encode_binary(uuid_bytes)
+    version = set_version(binary)
+    fmt = choose_format(requested_format, len(uuid_bytes), bloom_threshold)
+    headers = {"X-Block-Set-Version": version, "X-Block-Set-Count": str(len(uuid_bytes))}
+    if fmt == "binary":
+        body = binary
+    elif fmt == "bloom":
+        bloom = encode_bloom(uuid_bytes, fp_rate)
+        body = bytes(bloom.data)
+        headers["X-Bloom-Bits"] = str(bloom.bits)
+        headers["X-Bloom-Hashes"] = str(bloom.hashes)
+    else:
+        body = json.dumps({
+            "version": version,
+            "count": len(uuid_bytes),
+            "blocked": [str(user_id) for user_id in block_set["blocked"]],
+            "blocked_by": [str(user_id) for user_id in block_set["blocked_by"]],
+        }).encode()
+    headers["X-Block-Set-Format"] = fmt
+    return EncodedBlockSet(fmt, version, len(uuid_bytes), body, headers)
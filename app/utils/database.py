@@ -1,19 +1,97 @@
-from psycopg_pool import ConnectionPool
-from app.config import settings
+import threading
+from typing import Optional
+from psycopg_pool import ConnectionPool, PoolTimeout
+from app.config import get_settings
+from app.core.deadline import DeadlineExceeded, current_deadline
+from app.core.logging_config import get_logger
+from app.core.tracing import span
 from contextlib import contextmanager
 
-pool = ConnectionPool(
-    conninfo=settings.DATABASE_URL,
-    min_size=settings.DATABASE_POOL_MIN_SIZE,
-    max_size=settings.DATABASE_POOL_MAX_SIZE,
-    timeout=30
-)
+logger = get_logger(__name__)
+
+# The pool is created per worker process (from the application lifespan, or on
+# first use in scripts). Nothing here may open connections at import time: a
+# pre-fork master would otherwise hand the same sockets to every worker.
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Read-only SPs executed once per new connection when DATABASE_PREWARM_STATEMENTS
+# is enabled, so PL/pgSQL compilation and plan caching happen before real traffic.
+PREWARM_STATEMENTS = [
+    "SELECT activity.sp_social_check_friendship_status(%(nil)s, %(nil)s)",
+    "SELECT activity.sp_social_get_friends_list(%(nil)s, 1, 0)",
+    "SELECT activity.sp_social_check_block_status(%(nil)s, %(nil)s)",
+    "SELECT activity.sp_social_check_can_interact(%(nil)s, %(nil)s, 'standard')",
+    "SELECT activity.sp_social_check_favorite_status(%(nil)s, %(nil)s)",
+    "SELECT activity.sp_social_get_profile_view_count(%(nil)s)",
+]
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+def _prewarm_connection(conn):
+    with conn.cursor() as cursor:
+        for statement in PREWARM_STATEMENTS:
+            cursor.execute(statement, {"nil": NIL_UUID})
+    conn.rollback()
+
+def init_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            _pool = ConnectionPool(
+                conninfo=settings.DATABASE_URL,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                timeout=settings.DATABASE_POOL_TIMEOUT,
+                configure=_prewarm_connection if settings.DATABASE_PREWARM_STATEMENTS else None,
+                open=False
+            )
+            _pool.open(wait=False)
+        return _pool
+
+def get_pool() -> ConnectionPool:
+    if _pool is None:
+        return init_pool()
+    return _pool
+
+def warmup_pool(connections: int, timeout: float) -> int:
+    """
+    Check out `connections` connections at once so the pool grows to that size
+    before the worker accepts traffic. Returns the number of connections warmed.
+    """
+    pool = get_pool()
+    checked_out = []
+    try:
+        for _ in range(min(connections, pool.max_size)):
+            conn = pool.getconn(timeout=timeout)
+            checked_out.append(conn)
+            conn.execute("SELECT 1")
+            conn.rollback()
+    finally:
+        for conn in checked_out:
+            pool.putconn(conn)
+    return len(checked_out)
+
+def _checkout(pool: ConnectionPool):
+    # Never wait for a connection longer than the request has left
+    deadline = current_deadline.get()
+    remaining_ms = deadline.remaining_ms() if deadline is not None else None
+    with span("db.pool_checkout"):
+        if remaining_ms is None or remaining_ms / 1000 >= pool.timeout:
+            return pool.getconn()
+        if remaining_ms <= 0:
+            raise DeadlineExceeded("Request deadline passed before a database connection was free")
+        try:
+            return pool.getconn(timeout=remaining_ms / 1000)
+        except PoolTimeout as e:
+            raise DeadlineExceeded("Request deadline passed waiting for a database connection") from e
 
 @contextmanager
 def get_db_connection():
     conn = None
+    pool = get_pool()
     try:
-        conn = pool.getconn()
+        conn = _checkout(pool)
         yield conn
     except Exception as e:
         if conn:
@@ -24,4 +102,8 @@ def get_db_connection():
             pool.putconn(conn)
 
 def close_pool():
-    pool.close()
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,38 +1,44 @@
 from fastapi import HTTPException
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+from app.core.deadline import DeadlineExceeded, RequestCancelled
 
-def create_error_response(exception: Exception, default_status_code: int = 400) -> HTTPException:
+# Map PostgreSQL error codes to HTTP status codes
+ERROR_MAPPINGS = {
+    "SELF_FRIEND_ERROR": 400,
+    "USER_NOT_FOUND": 404,
+    "FRIENDSHIP_EXISTS": 409,
+    "BLOCKED_BY_USER": 403,
+    "USER_BLOCKED": 403,
+    "FRIENDSHIP_NOT_FOUND": 404,
+    "INVALID_ACCEPTOR": 400,
+    "INVALID_DECLINER": 400,
+    "SELF_BLOCK_ERROR": 400,
+    "ALREADY_BLOCKED": 409,
+    "BLOCK_NOT_FOUND": 404,
+    "SELF_FAVORITE_ERROR": 400,
+    "ALREADY_FAVORITED": 409,
+    "BLOCKED_USER": 403,
+    "FAVORITE_NOT_FOUND": 404,
+    "PREMIUM_REQUIRED": 403,
+    "SELF_VIEW_ERROR": 400,
+    "INVALID_QUERY": 400,
+    "INVALID_FIELDS": 400,
+    "ACTIVITY_NOT_FOUND": 404,
+    "NOT_ACTIVITY_PARTICIPANT": 403,
+}
+
+def map_error(exception: Exception, default_status_code: int = 400) -> Tuple[int, str]:
     """
-    Create an HTTP error response from an exception.
-    Parse PostgreSQL errors and return appropriate status codes.
+    (status code, message) for an exception.
+    Parse PostgreSQL errors ("ERROR_CODE: message") into their HTTP status.
     """
+    if isinstance(exception, (DeadlineExceeded, RequestCancelled)):
+        return exception.status_code, str(exception)
     error_message = str(exception)
 
-    # Map PostgreSQL error codes to HTTP status codes
-    error_mappings = {
-        "SELF_FRIEND_ERROR": 400,
-        "USER_NOT_FOUND": 404,
-        "FRIENDSHIP_EXISTS": 409,
-        "BLOCKED_BY_USER": 403,
-        "USER_BLOCKED": 403,
-        "FRIENDSHIP_NOT_FOUND": 404,
-        "INVALID_ACCEPTOR": 400,
-        "INVALID_DECLINER": 400,
-        "SELF_BLOCK_ERROR": 400,
-        "ALREADY_BLOCKED": 409,
-        "BLOCK_NOT_FOUND": 404,
-        "SELF_FAVORITE_ERROR": 400,
-        "ALREADY_FAVORITED": 409,
-        "BLOCKED_USER": 403,
-        "FAVORITE_NOT_FOUND": 404,
-        "PREMIUM_REQUIRED": 403,
-        "SELF_VIEW_ERROR": 400,
-        "INVALID_QUERY": 400,
-    }
-
     # Extract error code from message (format: "ERROR_CODE: message")
     status_code = default_status_code
-    for error_code, code_status in error_mappings.items():
+    for error_code, code_status in ERROR_MAPPINGS.items():
         if error_code in error_message:
             status_code = code_status
             # Clean up the error message
@@ -40,6 +46,14 @@ def create_error_response(exception: Exception, default_status_code: int = 400)
                 error_message = error_message.split(":", 1)[1].strip()
             break
 
+    return status_code, error_message
+
+def create_error_response(exception: Exception, default_status_code: int = 400) -> HTTPException:
+    """
+    Create an HTTP error response from an exception.
+    Parse PostgreSQL errors and return appropriate status codes.
+    """
+    status_code, error_message = map_error(exception, default_status_code)
     raise HTTPException(status_code=status_code, detail=error_message)
 
 def parse_db_error(error: Exception) -> Dict[str, Any]:
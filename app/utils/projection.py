@@ -0,0 +1,56 @@
+"""
+`fields=` projection for list endpoints.
+
+`fields=ids` is answered by the dedicated *_ids stored procedures, which return
+a flat `user_ids` array without joining activity.users. Any other value is a
+comma-separated subset of the row fields; the row's id field is always kept.
+"""
+from typing import Dict, Optional
+
+IDS = "ids"
+
+# list key in the SP result -> (id field, all row fields)
+LIST_FIELDS = {
+    "friends": ("user_id", {
+        "user_id", "username", "first_name", "last_name", "main_photo_url", "is_verified", "friendship_since"
+    }),
+    "blocked_users": ("blocked_user_id", {
+        "blocked_user_id", "username", "first_name", "last_name", "main_photo_url", "blocked_at", "reason"
+    }),
+    "favorites": ("user_id", {
+        "user_id", "username", "first_name", "last_name", "main_photo_url", "is_verified", "favorited_at"
+    }),
+    "favorited_by": ("user_id", {
+        "user_id", "username", "first_name", "last_name", "main_photo_url", "is_verified", "favorited_at"
+    }),
+    "viewers": ("viewer_user_id", {
+        "viewer_user_id", "username", "first_name", "last_name", "main_photo_url", "is_verified",
+        "last_viewed_at", "view_count"
+    }),
+    "users": ("user_id", {
+        "user_id", "username", "first_name", "last_name", "main_photo_url", "is_verified",
+        "activities_created_count", "activities_attended_count"
+    }),
+}
+
+def is_ids_only(fields: Optional[str]) -> bool:
+    return fields is not None and fields.strip() == IDS
+
+def project_list(result: Dict, list_key: str, fields: Optional[str]) -> Dict:
+    """Keep only the requested fields of each row in result[list_key]"""
+    if not fields:
+        return result
+    id_field, allowed = LIST_FIELDS[list_key]
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise ValueError(
+            f"INVALID_FIELDS: Unknown field(s) {', '.join(sorted(unknown))}; "
+            f"use '{IDS}' or any of {', '.join(sorted(allowed))}"
+        )
+    requested.add(id_field)
+    result[list_key] = [
+        {key: value for key, value in row.items() if key in requested}
+        for row in result[list_key]
+    ]
+    return result
@@ -0,0 +1,229 @@
+"""
+Versioned response cache for the paginated list reads.
+
+Entries are keyed by user, list name and page arguments and tagged with the
+user's relationship version at the time the SP ran. Every friendship, block or
+favorite write bumps the version of both users involved (directly from the
+services, and from invalidation bus events for writes made elsewhere), so stale
+entries are never looked up again and simply age out: no key scans or deletes.
+
+The version is read before the SP runs, so a result computed while a write
+commits is stored under the old version and never served.
+
+RESPONSE_CACHE_BACKEND=redis shares entries and versions across workers (one
+MGET per lookup); `memory` is a per-worker LRU stand-in. Entry size, entry count
+(memory) and TTL are bounded; hits and misses are counted per list on
+GET /metrics.
+"""
+import functools
+import inspect
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional, Tuple
+from uuid import UUID
+from app.config import get_settings
+from app.core.logging_config import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+def _key_part(value) -> str:
+    # Canonical UUIDs, so reads and bumps agree however the client spelled the id
+    try:
+        return str(UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+class InMemoryResponseStore:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._counter = itertools.count(1)
+        # Version reported for users whose version was evicted: above every
+        # version handed out before the eviction, so their old entries miss
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, user_id: str, key: str) -> Tuple[int, Optional[str]]:
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(user_id, self._floor)
+            entry = self._entries.get(key)
+            if entry is None:
+                return version, None
+            expires_at, entry_version, payload = entry
+            if expires_at <= now or entry_version != version:
+                del self._entries[key]
+                return version, None
+            self._entries.move_to_end(key)
+            return version, payload
+
+    def save(self, user_id: str, key: str, version: int, payload: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, version, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment("response_cache_evictions")
+
+    def bump(self, user_ids: Iterable[str]):
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[user_id] = next(self._counter)
+                self._versions.move_to_end(user_id)
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+                self._floor = max(self._floor, next(self._counter))
+
+    def flush(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisResponseStore:
+    """
+    Versions come from one shared counter (like the memory store's), so a
+    user's version never repeats even after their version key expired. Saving
+    an entry extends the version key to outlive it, and a user without a
+    version key gets one before anything is cached for them: a missing key
+    therefore always means "no valid entries".
+    """
+
+    CLOCK_KEY = "rc:clock"
+
+    def __init__(self, ttl: float):
+        self.version_ttl_ms = int(ttl * 2000)
+
+    @staticmethod
+    def _version_key(user_id: str) -> str:
+        return f"rc:ver:{user_id}"
+
+    def lookup(self, user_id: str, key: str) -> Tuple[int, Optional[str]]:
+        from app.core.redis_client import get_sync_redis
+        version, entry = get_sync_redis().mget(self._version_key(user_id), key)
+        if version is None:
+            # 0 = unversioned (see save)
+            return 0, None
+        version = int(version)
+        if entry is None:
+            return version, None
+        entry_version, _, payload = entry.partition(":")
+        return version, payload if int(entry_version) == version else None
+
+    def save(self, user_id: str, key: str, version: int, payload: str, ttl: float):
+        from app.core.redis_client import get_sync_redis
+        redis = get_sync_redis()
+        if version == 0:
+            # Claim a version; if a write set one since the lookup, this result may predate it
+            version = redis.incr(self.CLOCK_KEY)
+            if not redis.set(self._version_key(user_id), version, nx=True, px=self.version_ttl_ms):
+                return
+        pipe = redis.pipeline(transaction=False)
+        pipe.set(key, f"{version}:{payload}", px=int(ttl * 1000))
+        pipe.pexpire(self._version_key(user_id), self.version_ttl_ms)
+        pipe.execute()
+
+    def bump(self, user_ids: Iterable[str]):
+        from app.core.redis_client import get_sync_redis
+        redis = get_sync_redis()
+        version = redis.incr(self.CLOCK_KEY)
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.set(self._version_key(user_id), version, px=self.version_ttl_ms)
+        pipe.execute()
+
+    def flush(self):
+        # Shared entries cannot be scanned cheaply; the TTL bounds staleness after
+        # missed invalidation events
+        pass
+
+class ResponseCache:
+    def __init__(self, store, ttl_seconds: float, max_entry_bytes: int):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_entry_bytes = max_entry_bytes
+
+    def get_or_compute(self, name: str, user_id: str, args: Tuple[str, ...], compute: Callable[[], Any]) -> Any:
+        user_id = _key_part(user_id)
+        key = f"rc:{user_id}:{name}:{':'.join(args)}"
+        try:
+            version, payload = self.store.lookup(user_id, key)
+        except Exception as e:
+            # The cache is an optimization; never fail the read because of it
+            metrics.increment("response_cache_errors", route=name)
+            logger.warning("response_cache_unavailable", error=str(e))
+            return compute()
+        if payload is not None:
+            metrics.increment("response_cache_hits", route=name)
+            return json.loads(payload)
+
+        metrics.increment("response_cache_misses", route=name)
+        result = compute()
+        payload = json.dumps(result, default=str)
+        if len(payload) > self.max_entry_bytes:
+            metrics.increment("response_cache_oversized", route=name)
+            return result
+        try:
+            self.store.save(user_id, key, version, payload, self.ttl_seconds)
+        except Exception as e:
+            metrics.increment("response_cache_errors", route=name)
+            logger.warning("response_cache_unavailable", error=str(e))
+        return result
+
+    def bump(self, *user_ids: str):
+        try:
+            self.store.bump([_key_part(user_id) for user_id in user_ids])
+        except Exception as e:
+            # Entries of these users stay servable until their TTL runs out
+            metrics.increment("response_cache_errors", route="bump")
+            logger.warning("response_cache_bump_failed", error=str(e))
+
+    # Invalidation bus protocol
+
+    def invalidate(self, event):
+        self.bump(*event.user_ids)
+
+    def flush(self):
+        self.store.flush()
+
+_cache: Optional[ResponseCache] = None
+_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                settings = get_settings()
+                if settings.RESPONSE_CACHE_BACKEND == "redis":
+                    store = RedisResponseStore(settings.RESPONSE_CACHE_TTL_SECONDS)
+                else:
+                    store = InMemoryResponseStore(settings.RESPONSE_CACHE_MAX_ENTRIES)
+                _cache = ResponseCache(store, settings.RESPONSE_CACHE_TTL_SECONDS, settings.RESPONSE_CACHE_MAX_ENTRY_BYTES)
+    return _cache
+
+def bump_versions(*user_ids: str):
+    """Invalidate the cached lists of these users after a committed write"""
+    if get_settings().RESPONSE_CACHE_ENABLED:
+        get_response_cache().bump(*user_ids)
+
+def cached_response(name: str):
+    """Cache a list read of the user in its first argument, keyed by the remaining arguments"""
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not get_settings().RESPONSE_CACHE_ENABLED:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            user_id, *rest = (_key_part(value) for key, value in bound.arguments.items() if key != "self")
+            return get_response_cache().get_or_compute(
+                name, user_id, tuple(rest), lambda: method(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,133 @@
+"""
+Single-flight coalescing for read-only stored procedure calls.
+
+Concurrent calls with the same SP and arguments share one DB execution: the
+first caller (the leader) runs the query and every caller that arrives while it
+is in flight waits for and returns the same result. With SINGLEFLIGHT_TTL_MS > 0
+the result is also served for that many milliseconds after it completes, which
+absorbs bursts that arrive just after the leader finished. Reads may then be up
+to TTL old; cached entries are dropped on invalidation bus events for the users
+involved.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Tuple
+from uuid import UUID
+from app.config import get_settings
+from app.core.metrics import metrics
+
+class _Call:
+    __slots__ = ("done", "result", "error", "expires_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires_at = 0.0
+
+class SingleFlight:
+    def __init__(self, ttl_seconds: float = 0.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, name: str, args: Hashable, fn: Callable[[], Any]) -> Any:
+        key = (name, args)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set() and call.expires_at <= time.monotonic():
+                del self._calls[key]
+                call = None
+            leader = call is None
+            if leader:
+                if len(self._calls) >= self.max_entries:
+                    self._evict_expired()
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.increment("singleflight_coalesced", sp=name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.increment("singleflight_executions", sp=name)
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.expires_at = time.monotonic() + (self.ttl_seconds if call.error is None else 0)
+            if call.expires_at <= time.monotonic():
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, c in self._calls.items() if c.done.is_set() and c.expires_at <= now]:
+            del self._calls[key]
+
+    # Invalidation bus protocol
+
+    def invalidate(self, event):
+        user_ids = set(event.user_ids)
+        with self._lock:
+            for key in [k for k, c in self._calls.items() if c.done.is_set() and user_ids.intersection(map(str, k[1]))]:
+                del self._calls[key]
+
+    def flush(self):
+        with self._lock:
+            for key in [k for k, c in self._calls.items() if c.done.is_set()]:
+                del self._calls[key]
+
+_singleflight = None
+
+# Set for callers that must never wait on another request's call (batch rounds)
+_bypass: ContextVar[bool] = ContextVar("singleflight_bypass", default=False)
+
+@contextmanager
+def uncoalesced():
+    """Run coalesced methods directly in this context (neither leading nor following)"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+def get_singleflight() -> SingleFlight:
+    global _singleflight
+    if _singleflight is None:
+        _singleflight = SingleFlight(ttl_seconds=get_settings().SINGLEFLIGHT_TTL_MS / 1000)
+    return _singleflight
+
+def _key_part(value) -> str:
+    # Canonical UUIDs, so keys match the lowercase ids in invalidation events
+    try:
+        return str(UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+def coalesced(sp_name: str):
+    """Coalesce concurrent calls of a read-only service method keyed by SP name and arguments"""
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not get_settings().SINGLEFLIGHT_ENABLED or _bypass.get():
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(_key_part(value) for name, value in bound.arguments.items() if name != "self")
+            return get_singleflight().do(sp_name, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,102 @@
+import json
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Optional, Sequence
+import anyio
+from starlette.concurrency import run_in_threadpool
+from app.core.logging_config import get_logger
+from app.utils.database import get_db_connection
+
+logger = get_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _close_stream(connection_ctx, conn, cursor, cancel: bool):
+    # Blocking: cancel() opens a connection to the server, and rollback() waits
+    # for a fetch that may still hold the connection in another worker thread
+    if cancel:
+        conn.cancel()
+    try:
+        cursor.close()
+    except Exception:
+        pass
+    try:
+        conn.rollback()
+    finally:
+        connection_ctx.__exit__(None, None, None)
+
+def ndjson_trailer(rows: int) -> bytes:
+    """Last line of a complete stream; a stream without it was cut short"""
+    return (json.dumps({"type": "end", "rows": rows}) + "\n").encode()
+
+async def _chain(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        async for chunk in rest:
+            yield chunk
+    finally:
+        await rest.aclose()
+
+async def open_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Run a stream up to its first chunk and return the whole stream.
+
+    Errors before the first chunk are raised here, while the route can still
+    answer with an error status instead of a 200 with a truncated body.
+    """
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    return _chain(first, chunks)
+
+async def _ndjson_chunks(
+    query: str,
+    params: Sequence,
+    batch_size: int,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]]
+) -> AsyncIterator[bytes]:
+    connection_ctx = get_db_connection()
+    conn = await run_in_threadpool(connection_ctx.__enter__)
+    cursor = conn.cursor(name=f"ndjson_{uuid.uuid4().hex}")
+    rows_sent = 0
+    completed = False
+    try:
+        await run_in_threadpool(cursor.execute, query, params)
+        while True:
+            rows = await run_in_threadpool(cursor.fetchmany, batch_size)
+            if not rows:
+                completed = True
+                break
+            rows_sent += len(rows)
+            yield "".join(row[0] + "\n" for row in rows).encode()
+            if is_disconnected is not None and await is_disconnected():
+                break
+        if completed:
+            yield ndjson_trailer(rows_sent)
+    finally:
+        if not completed:
+            logger.info("ndjson_stream_aborted", rows_sent=rows_sent)
+        # Off the event loop, and shielded: a disconnected response is cancelled,
+        # which would otherwise abort the cleanup at its first await
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(_close_stream, connection_ctx, conn, cursor, not completed)
+
+async def stream_ndjson(
+    query: str,
+    params: Sequence,
+    batch_size: int = 500,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream a query whose single column is JSON text as NDJSON chunks.
+
+    A server-side (named) cursor keeps memory flat on both ends: Postgres
+    produces and Python holds at most `batch_size` rows at a time. Fetches run
+    in the threadpool; when the client goes away (checked between batches, or
+    the response task is cancelled mid-fetch) the running query is cancelled
+    and the cursor's transaction rolled back, so the DB stops working too.
+
+    Pool checkout, the query and its first batch run before this returns, so
+    their errors reach the route; a complete stream ends with ndjson_trailer.
+    """
+    return await open_stream(_ndjson_chunks(query, params, batch_size, is_disconnected))
@@ -0,0 +1,111 @@
+"""
+Framework overhead benchmark: the full app in-process on the memory backend.
+
+Seeds an InMemoryRepository with the synthetic graph, then drives the same
+weighted endpoint mix as `loadgen` through httpx's ASGI transport. No socket,
+no Postgres: what remains is routing, auth, validation, middleware, the
+service layer and serialization, so regressions there are not hidden by
+database latency.
+
+    python -m benchmarks.framework_overhead --users 2000 --requests 20000
+    python -m benchmarks.framework_overhead --concurrency 1 --mix "friend_status=1" --requests 5000
+
+Compare against a `loadgen` run on the real stack to see how much of each
+endpoint's latency is the framework versus the database.
+"""
+import os
+
+# Must be set before the app (and its settings) are imported
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Required settings; never used against a real database or auth service here
+os.environ.setdefault("DATABASE_URL", "postgresql://unused@localhost/unused")
+os.environ.setdefault("JWT_SECRET_KEY", "framework-overhead")
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+import httpx
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+from benchmarks.loadgen import Stats, Traffic, apply_mix, build_endpoints, fire, mint_tokens, print_summary
+from benchmarks.synthetic_graph import EMAIL_DOMAIN, SyntheticGraph, generate
+
+def seed_repository(graph: SyntheticGraph) -> InMemoryRepository:
+    """Mirror of what benchmarks/seed_graph.py writes to Postgres"""
+    repo = InMemoryRepository()
+    for i, uid in enumerate(graph.user_ids):
+        repo.add_user(
+            uid, f"loadgen_user_{i}", "Load", f"User {i}",
+            email=f"user{i}@{EMAIL_DOMAIN}",
+            subscription_level="premium" if i in graph.premium else "free",
+            is_verified=i % 10 == 0
+        )
+    for a, b in graph.friendships:
+        repo.add_friendship(graph.user_ids[a], graph.user_ids[b])
+    for requester, target in graph.pending:
+        repo.add_friendship(graph.user_ids[requester], graph.user_ids[target], status="pending",
+                            initiated_by=graph.user_ids[requester])
+    for blocker, blocked in graph.blocks:
+        repo.add_block(graph.user_ids[blocker], graph.user_ids[blocked])
+    for favoriting, favorited in graph.favorites:
+        repo.add_favorite(graph.user_ids[favoriting], graph.user_ids[favorited])
+    return repo
+
+async def run(args) -> Dict:
+    from app.main import app
+
+    graph = generate(args.users, args.avg_friends, args.seed)
+    seeded = time.perf_counter()
+    set_repository(seed_repository(graph))
+    print(f"seeded {args.users} users in {time.perf_counter() - seeded:.2f}s")
+
+    traffic = Traffic(graph, args.seed)
+    endpoints = apply_mix(build_endpoints(traffic), args.mix)
+    weights = [endpoint.weight for endpoint in endpoints]
+    tokens = mint_tokens(graph, args.full_claims)
+    stats = Stats(args.report_interval)
+    remaining = args.requests
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await fire(client, endpoints, weights, traffic, tokens, stats)
+
+    async def reporter():
+        while remaining > 0:
+            await asyncio.sleep(args.report_interval)
+            stats.roll_window()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        report_task = asyncio.create_task(reporter())
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        report_task.cancel()
+
+    return stats.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure in-process framework overhead on the memory backend")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--mix", help='weight overrides, e.g. "friend_status=50,search=0"')
+    parser.add_argument("--full-claims", action="store_true", help="embed email/subscription in tokens")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--avg-friends", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON summary to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Traffic-replay load generator for a local social-api stack.
+
+Replays a weighted mix of the 21 core endpoints (friendships, blocks,
+favorites, profile views, search) against --base-url, either open-loop at a
+target --rps or closed-loop with --concurrency workers. Actors and targets are
+drawn from the synthetic graph written by benchmarks/seed_graph.py (pass the
+same --users / --avg-friends / --seed), with targets skewed towards popular
+users. Tokens are minted locally with JWT_SECRET_KEY.
+
+    python -m benchmarks.seed_graph --users 10000 --reset
+    python -m benchmarks.loadgen --rps 200 --duration 60
+    python -m benchmarks.loadgen --concurrency 50 --duration 60 --mix "friends_list=50,search=0"
+
+Run the API with RATE_LIMIT_ENABLED=false, otherwise the per-IP limits
+dominate the results. Reports per-interval throughput while running and,
+at the end, latency percentiles per endpoint plus the error mix.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+from jose import jwt
+from app.config import get_settings
+from benchmarks.synthetic_graph import SyntheticGraph, generate
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    weight: float
+    # (actor index) -> (path, params, json body)
+    build: Callable[[int], Tuple[str, Optional[Dict], Optional[Dict]]]
+
+class Traffic:
+    """Picks actors and targets from the synthetic graph"""
+
+    def __init__(self, graph: SyntheticGraph, seed: int):
+        self.graph = graph
+        self.rng = random.Random(seed + 1)
+        self.friends: Dict[int, List[int]] = defaultdict(list)
+        for a, b in graph.friendships:
+            self.friends[a].append(b)
+            self.friends[b].append(a)
+        self.received: Dict[int, List[int]] = defaultdict(list)
+        for requester, target in graph.pending:
+            self.received[target].append(requester)
+        self.population = range(len(graph.user_ids))
+        self.cum_popularity = list(itertools.accumulate(graph.popularity))
+
+    def actor(self) -> int:
+        return self.rng.randrange(len(self.graph.user_ids))
+
+    def popular(self) -> int:
+        return self.rng.choices(self.population, cum_weights=self.cum_popularity)[0]
+
+    def target(self, actor: int) -> int:
+        friends = self.friends.get(actor)
+        if friends and self.rng.random() < 0.5:
+            return self.rng.choice(friends)
+        target = self.popular()
+        return target if target != actor else (target + 1) % len(self.graph.user_ids)
+
+    def uid(self, index: int) -> str:
+        return self.graph.user_ids[index]
+
+def build_endpoints(traffic: Traffic) -> List[Endpoint]:
+    t = traffic
+    page = lambda: {"limit": 50, "offset": 0}
+
+    def search(actor: int):
+        return "/social/users/search", {"q": f"user {t.rng.randrange(1000)}", "limit": 20}, None
+
+    def accept(actor: int):
+        requesters = t.received.get(actor)
+        requester = t.rng.choice(requesters) if requesters else t.popular()
+        return "/social/friends/accept", None, {"requester_user_id": t.uid(requester)}
+
+    def decline(actor: int):
+        requesters = t.received.get(actor)
+        requester = t.rng.choice(requesters) if requesters else t.popular()
+        return "/social/friends/decline", None, {"requester_user_id": t.uid(requester)}
+
+    return [
+        # Reads
+        Endpoint("friend_status", "GET", 20, lambda a: (f"/social/friends/status/{t.uid(t.target(a))}", None, None)),
+        Endpoint("can_interact", "GET", 15, lambda a: (f"/social/blocks/can-interact/{t.uid(t.target(a))}", None, None)),
+        Endpoint("friends_list", "GET", 12, lambda a: ("/social/friends", page(), None)),
+        Endpoint("profile_view_count", "GET", 8, lambda a: ("/social/profile-views/my-count", None, None)),
+        Endpoint("block_status", "GET", 6, lambda a: (f"/social/blocks/status/{t.uid(t.target(a))}", None, None)),
+        Endpoint("favorite_status", "GET", 6, lambda a: (f"/social/favorites/status/{t.uid(t.target(a))}", None, None)),
+        Endpoint("search", "GET", 5, search),
+        Endpoint("requests_received", "GET", 4, lambda a: ("/social/friends/requests/received", page(), None)),
+        Endpoint("requests_sent", "GET", 2, lambda a: ("/social/friends/requests/sent", page(), None)),
+        Endpoint("my_favorites", "GET", 3, lambda a: ("/social/favorites/mine", page(), None)),
+        Endpoint("who_favorited_me", "GET", 2, lambda a: ("/social/favorites/who-favorited-me", page(), None)),
+        Endpoint("who_viewed_me", "GET", 3, lambda a: ("/social/profile-views/who-viewed-me", page(), None)),
+        Endpoint("blocked_list", "GET", 1, lambda a: ("/social/blocks", page(), None)),
+        # Writes
+        Endpoint("record_view", "POST", 6, lambda a: ("/social/profile-views", None, {"viewed_user_id": t.uid(t.target(a))})),
+        Endpoint("send_request", "POST", 2, lambda a: ("/social/friends/request", None, {"target_user_id": t.uid(t.popular())})),
+        Endpoint("accept_request", "POST", 1, accept),
+        Endpoint("decline_request", "POST", 0.5, decline),
+        Endpoint("favorite", "POST", 1, lambda a: ("/social/favorites", None, {"favorited_user_id": t.uid(t.popular())})),
+        Endpoint("unfavorite", "DELETE", 0.5, lambda a: (f"/social/favorites/{t.uid(t.popular())}", None, None)),
+        Endpoint("block", "POST", 0.3, lambda a: ("/social/blocks", None, {"blocked_user_id": t.uid(t.popular())})),
+        Endpoint("unblock", "DELETE", 0.2, lambda a: (f"/social/blocks/{t.uid(t.popular())}", None, None)),
+    ]
+
+def apply_mix(endpoints: List[Endpoint], mix: Optional[str]) -> List[Endpoint]:
+    """Override weights with "name=weight,..." (weight 0 drops the endpoint)"""
+    if mix:
+        overrides = {name.strip(): float(weight) for name, weight in (item.split("=") for item in mix.split(","))}
+        unknown = set(overrides) - {endpoint.name for endpoint in endpoints}
+        if unknown:
+            raise SystemExit(f"unknown endpoint(s) in --mix: {', '.join(sorted(unknown))}")
+        for endpoint in endpoints:
+            endpoint.weight = overrides.get(endpoint.name, endpoint.weight)
+    return [endpoint for endpoint in endpoints if endpoint.weight > 0]
+
+def mint_tokens(graph: SyntheticGraph, full_claims: bool, ttl_hours: int = 12) -> List[str]:
+    """
+    Tokens without email force the API's per-request user lookup (the current
+    Auth API format); --full-claims embeds email/subscription like the old one.
+    """
+    settings = get_settings()
+    expires = datetime.now(timezone.utc) + timedelta(hours=ttl_hours)
+    tokens = []
+    for index, uid in enumerate(graph.user_ids):
+        claims = {"sub": uid, "exp": expires}
+        if full_claims:
+            claims["email"] = f"user{index}@loadgen.test"
+            claims["subscription_level"] = "premium" if index in graph.premium else "free"
+        tokens.append(jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM))
+    return tokens
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class Stats:
+    def __init__(self, report_interval: float):
+        self.report_interval = report_interval
+        self.started = time.perf_counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self.timeline: List[Dict] = []
+        self._window: List[float] = []
+        self._window_errors = 0
+        self.dropped = 0
+
+    def record(self, endpoint: str, latency_ms: float, outcome: str):
+        self.latencies[endpoint].append(latency_ms)
+        self.outcomes[endpoint][outcome] += 1
+        self._window.append(latency_ms)
+        if not outcome.startswith("2"):
+            self._window_errors += 1
+
+    def roll_window(self):
+        window = sorted(self._window)
+        entry = {
+            "t": round(time.perf_counter() - self.started, 1),
+            "rps": round(len(window) / self.report_interval, 1),
+            "p50_ms": round(percentile(window, 50), 1),
+            "p99_ms": round(percentile(window, 99), 1),
+            "errors": self._window_errors,
+        }
+        self.timeline.append(entry)
+        self._window, self._window_errors = [], 0
+        print(
+            f"t={entry['t']:>6}s  rps={entry['rps']:>8}  p50={entry['p50_ms']:>7}ms  "
+            f"p99={entry['p99_ms']:>7}ms  errors={entry['errors']}"
+        )
+
+    def summary(self) -> Dict:
+        elapsed = time.perf_counter() - self.started
+        endpoints = {}
+        all_latencies = []
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            all_latencies.extend(values)
+            endpoints[name] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p90_ms": round(percentile(values, 90), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(values[-1], 1),
+                "outcomes": dict(self.outcomes[name]),
+            }
+        all_latencies.sort()
+        error_mix = Counter()
+        for outcomes in self.outcomes.values():
+            error_mix.update({k: v for k, v in outcomes.items() if not k.startswith("2")})
+        return {
+            "duration_s": round(elapsed, 1),
+            "requests": len(all_latencies),
+            "throughput_rps": round(len(all_latencies) / elapsed, 1) if elapsed else 0,
+            "p50_ms": round(percentile(all_latencies, 50), 1),
+            "p90_ms": round(percentile(all_latencies, 90), 1),
+            "p99_ms": round(percentile(all_latencies, 99), 1),
+            "dropped": self.dropped,
+            "error_mix": dict(error_mix),
+            "endpoints": endpoints,
+            "timeline": self.timeline,
+        }
+
+async def fire(client: httpx.AsyncClient, endpoints: List[Endpoint], weights: List[float],
+               traffic: Traffic, tokens: List[str], stats: Stats):
+    endpoint = traffic.rng.choices(endpoints, weights)[0]
+    actor = traffic.actor()
+    path, params, body = endpoint.build(actor)
+    started = time.perf_counter()
+    try:
+        response = await client.request(
+            endpoint.method, path, params=params, json=body,
+            headers={"Authorization": f"Bearer {tokens[actor]}"}
+        )
+        outcome = str(response.status_code)
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    stats.record(endpoint.name, (time.perf_counter() - started) * 1000, outcome)
+
+async def run(args) -> Dict:
+    graph = generate(args.users, args.avg_friends, args.seed)
+    traffic = Traffic(graph, args.seed)
+    endpoints = apply_mix(build_endpoints(traffic), args.mix)
+    weights = [endpoint.weight for endpoint in endpoints]
+    tokens = mint_tokens(graph, args.full_claims)
+    stats = Stats(args.report_interval)
+    deadline = time.perf_counter() + args.duration
+
+    async def reporter():
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(args.report_interval)
+            stats.roll_window()
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        report_task = asyncio.create_task(reporter())
+
+        if args.rps:
+            # Open loop: arrivals follow the schedule regardless of latency,
+            # requests beyond --max-in-flight are counted as dropped
+            in_flight = set()
+            interval = 1.0 / args.rps
+            next_at = time.perf_counter()
+            while next_at < deadline:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_at += interval
+                if len(in_flight) >= args.max_in_flight:
+                    stats.dropped += 1
+                    continue
+                task = asyncio.create_task(fire(client, endpoints, weights, traffic, tokens, stats))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.wait(in_flight)
+        else:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await fire(client, endpoints, weights, traffic, tokens, stats)
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+        report_task.cancel()
+
+    return stats.summary()
+
+def print_summary(summary: Dict):
+    print()
+    print(
+        f"{summary['requests']} requests in {summary['duration_s']}s = {summary['throughput_rps']} rps  "
+        f"p50={summary['p50_ms']}ms p90={summary['p90_ms']}ms p99={summary['p99_ms']}ms  "
+        f"dropped={summary['dropped']}"
+    )
+    print(f"error mix: {summary['error_mix'] or 'none'}")
+    print()
+    print(f"{'endpoint':<20} {'count':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  outcomes")
+    for name, row in summary["endpoints"].items():
+        print(
+            f"{name:<20} {row['count']:>7} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+            f"{row['p99_ms']:>8} {row['max_ms']:>8}  {row['outcomes']}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a weighted endpoint mix against social-api")
+    parser.add_argument("--base-url", default="http://localhost:8005")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, help="open-loop target requests per second")
+    mode.add_argument("--concurrency", type=int, default=20, help="closed-loop workers (default)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--mix", help='weight overrides, e.g. "friend_status=50,search=0"')
+    parser.add_argument("--full-claims", action="store_true", help="embed email/subscription in tokens")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--avg-friends", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON summary to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Logging overhead benchmark: what one log line costs the request path.
+
+Emits request_completed-shaped events from several threads under each
+pipeline and reports the time spent in the caller (what a request pays) and
+the time until everything is written (drain):
+
+    inline-json     the previous setup: stdlib json rendered and written inline
+    inline-orjson   orjson rendered and written inline (LOG_QUEUE_ENABLED=false)
+    queue           rendered and written by the LogWriter thread (the default)
+    queue-sampled   as queue, with request_completed sampled at 1%
+
+    python -m benchmarks.logging_overhead --events 100000 --threads 8
+
+Output goes to /dev/null unless --output is given, so disk speed is not
+part of the number.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Dict
+import structlog
+from app.core import logging_config
+from app.core.logging_config import get_logger, setup_logging
+
+MODES = ["inline-json", "inline-orjson", "queue", "queue-sampled"]
+
+def configure(mode: str, stream, queue_size: int):
+    if mode == "inline-json":
+        # The pipeline before the queue/orjson change, kept here as the baseline
+        logging_config._stop_writer()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        structlog.configure(
+            processors=[
+                structlog.contextvars.merge_contextvars,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.add_logger_name,
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.JSONRenderer(),
+            ],
+            wrapper_class=structlog.stdlib.BoundLogger,
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            cache_logger_on_first_use=True,
+        )
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        return
+    setup_logging(
+        "production",
+        use_queue=mode.startswith("queue"),
+        queue_size=queue_size,
+        sample_rules="request_completed=0.01" if mode == "queue-sampled" else "",
+        stream=stream
+    )
+
+def run_mode(mode: str, events: int, threads: int, stream, queue_size: int) -> Dict:
+    configure(mode, stream, queue_size)
+    logger = get_logger(f"benchmarks.logging_overhead.{mode}")
+    per_thread = events // threads
+    caller_seconds = [0.0] * threads
+
+    def worker(index: int):
+        structlog.contextvars.bind_contextvars(
+            correlation_id=f"bench-{index}", path="/social/friends/status/x", method="GET"
+        )
+        started = time.perf_counter()
+        for _ in range(per_thread):
+            logger.info("request_completed", status_code=200, duration_ms=1.23)
+        caller_seconds[index] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    logging_config._stop_writer()  # waits for the queue to drain
+    total = time.perf_counter() - started
+
+    emitted = per_thread * threads
+    return {
+        "mode": mode,
+        "events": emitted,
+        "caller_us_per_event": round(sum(caller_seconds) / emitted * 1e6, 2),
+        "drained_seconds": round(total, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-event cost of the logging pipelines")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=1000000, help="large enough that nothing is dropped")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--output", default=os.devnull)
+    args = parser.parse_args()
+
+    with open(args.output, "w") as stream:
+        results = [run_mode(mode, args.events, args.threads, stream, args.queue_size) for mode in args.modes.split(",")]
+
+    print(f"{'mode':<16}{'events':>10}{'caller us/event':>18}{'drained s':>12}")
+    for result in results:
+        print(f"{result['mode']:<16}{result['events']:>10}{result['caller_us_per_event']:>18}{result['drained_seconds']:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Seed Postgres with the synthetic graph used by benchmarks/loadgen.py.
+
+    python -m benchmarks.seed_graph --users 10000 --avg-friends 20 --seed 42
+
+Users are created with emails @loadgen.test; --reset deletes them first
+(friendships, blocks, favorites and views cascade). Rows are loaded with COPY,
+so the row triggers (suggestion queue, invalidation NOTIFY) still fire.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+import psycopg
+from app.config import get_settings
+from benchmarks.synthetic_graph import EMAIL_DOMAIN, generate
+
+def seed(database_url: str, users: int, avg_friends: int, seed_value: int, reset: bool):
+    graph = generate(users, avg_friends, seed_value)
+    ids = graph.user_ids
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    with psycopg.connect(database_url) as conn:
+        with conn.cursor() as cursor:
+            if reset:
+                cursor.execute("DELETE FROM activity.users WHERE email LIKE %s", (f"%@{EMAIL_DOMAIN}",))
+
+            with cursor.copy(
+                "COPY activity.users (user_id, email, username, password_hash, first_name, last_name, "
+                "subscription_level, is_verified) FROM STDIN"
+            ) as copy:
+                for i, uid in enumerate(ids):
+                    copy.write_row((
+                        uid, f"user{i}@{EMAIL_DOMAIN}", f"loadgen_user_{i}", "!", "Load", f"User {i}",
+                        "premium" if i in graph.premium else "free", i % 10 == 0
+                    ))
+
+            with cursor.copy(
+                "COPY activity.friendships (user_id_1, user_id_2, status, initiated_by, created_at, accepted_at) "
+                "FROM STDIN"
+            ) as copy:
+                for n, (a, b) in enumerate(graph.friendships):
+                    created_at = now - timedelta(minutes=n)
+                    copy.write_row((
+                        min(ids[a], ids[b]), max(ids[a], ids[b]), "accepted", ids[a], created_at, created_at
+                    ))
+                for n, (requester, target) in enumerate(graph.pending):
+                    copy.write_row((
+                        min(ids[requester], ids[target]), max(ids[requester], ids[target]), "pending",
+                        ids[requester], now - timedelta(minutes=n), None
+                    ))
+
+            with cursor.copy("COPY activity.user_blocks (blocker_user_id, blocked_user_id) FROM STDIN") as copy:
+                for blocker, blocked in graph.blocks:
+                    copy.write_row((ids[blocker], ids[blocked]))
+
+            with cursor.copy(
+                "COPY activity.user_favorites (favoriting_user_id, favorited_user_id) FROM STDIN"
+            ) as copy:
+                for favoriting, favorited in graph.favorites:
+                    copy.write_row((ids[favoriting], ids[favorited]))
+
+        conn.commit()
+
+    print(
+        f"seeded {len(ids)} users, {len(graph.friendships)} friendships, {len(graph.pending)} pending, "
+        f"{len(graph.blocks)} blocks, {len(graph.favorites)} favorites in {time.perf_counter() - started:.1f}s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the synthetic load-test graph")
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--avg-friends", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded users first")
+    args = parser.parse_args()
+    seed(args.database_url or get_settings().DATABASE_URL, args.users, args.avg_friends, args.seed, args.reset)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Deterministic synthetic social graph shared by the seeder and the load generator.
+
+User ids are uuid5 values derived from the user index and the edges come from a
+seeded RNG, so `loadgen` can rebuild exactly the graph `seed_graph` wrote
+(same --users / --avg-friends / --seed) without reading it back from Postgres.
+Degrees are skewed (Pareto popularity weights) so a few users are "hot", like
+in production.
+"""
+import itertools
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Set, Tuple
+
+NAMESPACE = uuid.UUID("5d1c5c3e-6f7a-4c1e-9b0e-2f52a8f3e0a1")
+EMAIL_DOMAIN = "loadgen.test"
+
+def user_id(index: int) -> str:
+    return str(uuid.uuid5(NAMESPACE, f"loadgen-user-{index}"))
+
+@dataclass
+class SyntheticGraph:
+    user_ids: List[str]
+    popularity: List[float] = field(default_factory=list)
+    premium: Set[int] = field(default_factory=set)
+    friendships: List[Tuple[int, int]] = field(default_factory=list)  # accepted, unordered
+    pending: List[Tuple[int, int]] = field(default_factory=list)  # (requester, target)
+    blocks: List[Tuple[int, int]] = field(default_factory=list)  # (blocker, blocked)
+    favorites: List[Tuple[int, int]] = field(default_factory=list)  # (favoriting, favorited)
+
+def generate(users: int, avg_friends: int = 20, seed: int = 42,
+             pending_ratio: float = 0.1, block_ratio: float = 0.02,
+             favorite_ratio: float = 0.1, premium_ratio: float = 0.2) -> SyntheticGraph:
+    rng = random.Random(seed)
+    graph = SyntheticGraph(user_ids=[user_id(i) for i in range(users)])
+    graph.premium = {i for i in range(users) if rng.random() < premium_ratio}
+
+    population = range(users)
+    graph.popularity = [rng.paretovariate(1.5) for _ in population]
+    cum_weights = list(itertools.accumulate(graph.popularity))
+
+    def sample_pairs(count: int, taken: Set[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        pairs = []
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            source = rng.randrange(users)
+            target = rng.choices(population, cum_weights=cum_weights)[0]
+            key = (min(source, target), max(source, target))
+            if source == target or key in taken:
+                continue
+            taken.add(key)
+            pairs.append((source, target))
+        return pairs
+
+    taken: Set[Tuple[int, int]] = set()
+    graph.friendships = sample_pairs(users * avg_friends // 2, taken)
+    graph.pending = sample_pairs(int(len(graph.friendships) * pending_ratio), taken)
+    graph.blocks = sample_pairs(int(len(graph.friendships) * block_ratio), taken)
+    # Favorites may overlap with friendships but never with blocks
+    blocked = {(min(a, b), max(a, b)) for a, b in graph.blocks}
+    graph.favorites = sample_pairs(int(len(graph.friendships) * favorite_ratio), set(blocked))
+    return graph
@@ -1,5 +1,5 @@
 -- ============================================================================
--- FRIENDSHIPS MODULE - 8 STORED PROCEDURES
+-- FRIENDSHIPS MODULE - 10 STORED PROCEDURES
 -- ============================================================================
 
 -- SP 1: Send Friend Request
@@ -82,6 +82,9 @@ BEGIN
         v_user_id_1, v_user_id_2, 'pending', p_requester_user_id, NOW()
     );
 
+    -- Notification outbox (sql/10_social_event_outbox.sql)
+    PERFORM activity.fn_social_enqueue_event(p_target_user_id, p_requester_user_id, 'friend_request');
+
     -- Return success response
     RETURN jsonb_build_object(
         'friendship_id', v_user_id_1::TEXT || ':' || v_user_id_2::TEXT,
@@ -140,6 +143,8 @@ BEGIN
     WHERE user_id_1 = v_user_id_1
     AND user_id_2 = v_user_id_2;
 
+    PERFORM activity.fn_social_enqueue_event(p_requester_user_id, p_accepting_user_id, 'friend_accepted');
+
     RETURN jsonb_build_object(
         'friendship_id', v_user_id_1::TEXT || ':' || v_user_id_2::TEXT,
         'user_id_1', v_user_id_1,
@@ -258,37 +263,35 @@ DECLARE
     v_friends JSONB;
     v_total_count INT;
 BEGIN
+    -- Index-only scans of idx_friendship_edges_status_accepted (sql/17)
     SELECT COUNT(*)
     INTO v_total_count
-    FROM activity.friendships f
-    WHERE (f.user_id_1 = p_user_id OR f.user_id_2 = p_user_id)
-    AND f.status = 'accepted';
+    FROM activity.friendship_edges e
+    WHERE e.user_id = p_user_id
+    AND e.status = 'accepted';
 
-    SELECT COALESCE(jsonb_agg(friend_data), '[]'::jsonb)
-    INTO v_friends
-    FROM (
-        SELECT jsonb_build_object(
+    SELECT COALESCE(jsonb_agg(
+        jsonb_build_object(
             'user_id', u.user_id,
             'username', u.username,
             'first_name', u.first_name,
             'last_name', u.last_name,
             'main_photo_url', u.main_photo_url,
             'is_verified', u.is_verified,
-            'friendship_since', f.accepted_at
-        ) AS friend_data
-        FROM activity.friendships f
-        JOIN activity.users u ON (
-            CASE
-                WHEN f.user_id_1 = p_user_id THEN u.user_id = f.user_id_2
-                ELSE u.user_id = f.user_id_1
-            END
-        )
-        WHERE (f.user_id_1 = p_user_id OR f.user_id_2 = p_user_id)
-        AND f.status = 'accepted'
-        ORDER BY f.accepted_at DESC
+            'friendship_since', page.accepted_at
+        ) ORDER BY page.accepted_at DESC
+    ), '[]'::jsonb)
+    INTO v_friends
+    FROM (
+        SELECT e.other_user_id, e.accepted_at
+        FROM activity.friendship_edges e
+        WHERE e.user_id = p_user_id
+        AND e.status = 'accepted'
+        ORDER BY e.accepted_at DESC
         LIMIT p_limit
         OFFSET p_offset
-    ) friends;
+    ) page
+    JOIN activity.users u ON u.user_id = page.other_user_id;
 
     RETURN jsonb_build_object(
         'friends', v_friends,
@@ -315,34 +318,37 @@ DECLARE
     v_requests JSONB;
     v_total_count INT;
 BEGIN
+    -- Index-only scans of idx_friendship_edges_pending (sql/17)
     SELECT COUNT(*)
     INTO v_total_count
-    FROM activity.friendships f
-    WHERE (f.user_id_1 = p_user_id OR f.user_id_2 = p_user_id)
-    AND f.status = 'pending'
-    AND f.initiated_by != p_user_id;
+    FROM activity.friendship_edges e
+    WHERE e.user_id = p_user_id
+    AND e.status = 'pending'
+    AND e.is_initiator = false;
 
-    SELECT COALESCE(jsonb_agg(request_data), '[]'::jsonb)
-    INTO v_requests
-    FROM (
-        SELECT jsonb_build_object(
+    SELECT COALESCE(jsonb_agg(
+        jsonb_build_object(
             'requester_user_id', u.user_id,
             'username', u.username,
             'first_name', u.first_name,
             'last_name', u.last_name,
             'main_photo_url', u.main_photo_url,
             'is_verified', u.is_verified,
-            'requested_at', f.created_at
-        ) AS request_data
-        FROM activity.friendships f
-        JOIN activity.users u ON u.user_id = f.initiated_by
-        WHERE (f.user_id_1 = p_user_id OR f.user_id_2 = p_user_id)
-        AND f.status = 'pending'
-        AND f.initiated_by != p_user_id
-        ORDER BY f.created_at DESC
+            'requested_at', page.created_at
+        ) ORDER BY page.created_at DESC
+    ), '[]'::jsonb)
+    INTO v_requests
+    FROM (
+        SELECT e.other_user_id, e.created_at
+        FROM activity.friendship_edges e
+        WHERE e.user_id = p_user_id
+        AND e.status = 'pending'
+        AND e.is_initiator = false
+        ORDER BY e.created_at DESC
         LIMIT p_limit
         OFFSET p_offset
-    ) requests;
+    ) page
+    JOIN activity.users u ON u.user_id = page.other_user_id;
 
     RETURN jsonb_build_object(
         'requests', v_requests,
@@ -369,37 +375,37 @@ DECLARE
     v_requests JSONB;
     v_total_count INT;
 BEGIN
+    -- Index-only scans of idx_friendship_edges_pending (sql/17)
     SELECT COUNT(*)
     INTO v_total_count
-    FROM activity.friendships f
-    WHERE f.status = 'pending'
-    AND f.initiated_by = p_user_id;
+    FROM activity.friendship_edges e
+    WHERE e.user_id = p_user_id
+    AND e.status = 'pending'
+    AND e.is_initiator = true;
 
-    SELECT COALESCE(jsonb_agg(request_data), '[]'::jsonb)
-    INTO v_requests
-    FROM (
-        SELECT jsonb_build_object(
+    SELECT COALESCE(jsonb_agg(
+        jsonb_build_object(
             'target_user_id', u.user_id,
             'username', u.username,
             'first_name', u.first_name,
             'last_name', u.last_name,
             'main_photo_url', u.main_photo_url,
             'is_verified', u.is_verified,
-            'requested_at', f.created_at
-        ) AS request_data
-        FROM activity.friendships f
-        JOIN activity.users u ON (
-            CASE
-                WHEN f.user_id_1 = p_user_id THEN u.user_id = f.user_id_2
-                ELSE u.user_id = f.user_id_1
-            END
-        )
-        WHERE f.status = 'pending'
-        AND f.initiated_by = p_user_id
-        ORDER BY f.created_at DESC
+            'requested_at', page.created_at
+        ) ORDER BY page.created_at DESC
+    ), '[]'::jsonb)
+    INTO v_requests
+    FROM (
+        SELECT e.other_user_id, e.created_at
+        FROM activity.friendship_edges e
+        WHERE e.user_id = p_user_id
+        AND e.status = 'pending'
+        AND e.is_initiator = true
+        ORDER BY e.created_at DESC
         LIMIT p_limit
         OFFSET p_offset
-    ) requests;
+    ) page
+    JOIN activity.users u ON u.user_id = page.other_user_id;
 
     RETURN jsonb_build_object(
         'requests', v_requests,
@@ -454,3 +460,127 @@ EXCEPTION
         RAISE;
 END;
 $$;
+
+-- SP 9: Get Mutual Friends
+-- Set-based intersection of both friend sets; each side is a pair of index
+-- scans on (user_id_x, status), so cost is bounded by the two degrees.
+CREATE OR REPLACE FUNCTION activity.sp_social_get_mutual_friends(
+    p_user_id UUID,
+    p_target_user_id UUID,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_mutual_ids UUID[];
+    v_friends JSONB;
+BEGIN
+    IF p_user_id = p_target_user_id THEN
+        RAISE EXCEPTION 'SELF_FRIEND_ERROR: Cannot get mutual friends with yourself';
+    END IF;
+
+    SELECT COALESCE(array_agg(friend_id), '{}')
+    INTO v_mutual_ids
+    FROM (
+        (
+            SELECT f.user_id_2 AS friend_id FROM activity.friendships f
+            WHERE f.user_id_1 = p_user_id AND f.status = 'accepted'
+            UNION ALL
+            SELECT f.user_id_1 FROM activity.friendships f
+            WHERE f.user_id_2 = p_user_id AND f.status = 'accepted'
+        )
+        INTERSECT
+        (
+            SELECT f.user_id_2 FROM activity.friendships f
+            WHERE f.user_id_1 = p_target_user_id AND f.status = 'accepted'
+            UNION ALL
+            SELECT f.user_id_1 FROM activity.friendships f
+            WHERE f.user_id_2 = p_target_user_id AND f.status = 'accepted'
+        )
+    ) mutual;
+
+    SELECT COALESCE(jsonb_agg(friend_data), '[]'::jsonb)
+    INTO v_friends
+    FROM (
+        SELECT jsonb_build_object(
+            'user_id', u.user_id,
+            'username', u.username,
+            'first_name', u.first_name,
+            'last_name', u.last_name,
+            'main_photo_url', u.main_photo_url,
+            'is_verified', u.is_verified
+        ) AS friend_data
+        FROM activity.users u
+        WHERE u.user_id = ANY(v_mutual_ids)
+        ORDER BY u.username ASC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) friends;
+
+    RETURN jsonb_build_object(
+        'target_user_id', p_target_user_id,
+        'mutual_friends', v_friends,
+        'total_count', cardinality(v_mutual_ids),
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 10: Get Mutual Friend Counts (batch)
+-- One hash semi-join of the targets' edges against the caller's friend set.
+CREATE OR REPLACE FUNCTION activity.sp_social_get_mutual_friend_counts(
+    p_user_id UUID,
+    p_target_user_ids UUID[]
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_counts JSONB;
+BEGIN
+    WITH my_friends AS (
+        SELECT f.user_id_2 AS friend_id FROM activity.friendships f
+        WHERE f.user_id_1 = p_user_id AND f.status = 'accepted'
+        UNION ALL
+        SELECT f.user_id_1 FROM activity.friendships f
+        WHERE f.user_id_2 = p_user_id AND f.status = 'accepted'
+    ),
+    targets AS (
+        SELECT DISTINCT t.target_id
+        FROM unnest(p_target_user_ids) AS t(target_id)
+        WHERE t.target_id != p_user_id
+    ),
+    target_edges AS (
+        SELECT t.target_id, f.user_id_2 AS friend_id
+        FROM targets t
+        JOIN activity.friendships f ON f.user_id_1 = t.target_id AND f.status = 'accepted'
+        UNION ALL
+        SELECT t.target_id, f.user_id_1
+        FROM targets t
+        JOIN activity.friendships f ON f.user_id_2 = t.target_id AND f.status = 'accepted'
+    ),
+    mutual_counts AS (
+        SELECT e.target_id, COUNT(*) AS mutual_count
+        FROM target_edges e
+        WHERE e.friend_id IN (SELECT friend_id FROM my_friends)
+        GROUP BY e.target_id
+    )
+    SELECT COALESCE(jsonb_object_agg(t.target_id, COALESCE(m.mutual_count, 0)), '{}'::jsonb)
+    INTO v_counts
+    FROM targets t
+    LEFT JOIN mutual_counts m ON m.target_id = t.target_id;
+
+    RETURN jsonb_build_object(
+        'counts', v_counts
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
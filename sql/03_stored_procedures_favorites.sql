@@ -57,6 +57,9 @@ BEGIN
         p_favoriting_user_id, p_favorited_user_id, NOW()
     );
 
+    -- Notification outbox (sql/10_social_event_outbox.sql)
+    PERFORM activity.fn_social_enqueue_event(p_favorited_user_id, p_favoriting_user_id, 'new_favorite');
+
     -- Return success response
     RETURN jsonb_build_object(
         'favoriting_user_id', p_favoriting_user_id,
@@ -3,10 +3,16 @@
 -- ============================================================================
 
 -- SP 1: Record Profile View
+-- Upserts the (viewer, viewed) aggregate (sql/12). A view is counted (and
+-- logged to profile_views / notified) at most once per p_dedup_window_seconds;
+-- repeat views inside the window only refresh last_viewed_at.
+DROP FUNCTION IF EXISTS activity.sp_social_record_profile_view(UUID, UUID, BOOLEAN);
+
 CREATE OR REPLACE FUNCTION activity.sp_social_record_profile_view(
     p_viewer_user_id UUID,
     p_viewed_user_id UUID,
-    p_ghost_mode BOOLEAN
+    p_ghost_mode BOOLEAN,
+    p_dedup_window_seconds INT DEFAULT 3600
 )
 RETURNS JSONB
 LANGUAGE plpgsql
@@ -15,6 +21,9 @@ DECLARE
     v_user_exists BOOLEAN;
     v_any_block_exists BOOLEAN;
     v_view_id UUID;
+    v_now TIMESTAMP WITH TIME ZONE := NOW();
+    v_counted BOOLEAN;
+    v_view_count INT;
 BEGIN
     -- Validation 1: Cannot view your own profile
     IF p_viewer_user_id = p_viewed_user_id THEN
@@ -49,21 +58,47 @@ BEGIN
         );
     END IF;
 
-    -- Normal Mode: Record the view
-    v_view_id := gen_random_uuid();
-
-    INSERT INTO activity.profile_views (
-        view_id, viewer_user_id, viewed_user_id, viewed_at
+    -- Normal Mode: Upsert the pair aggregate
+    INSERT INTO activity.profile_view_aggregates AS a (
+        viewer_user_id, viewed_user_id, view_count, first_viewed_at, last_viewed_at, last_counted_at
     ) VALUES (
-        v_view_id, p_viewer_user_id, p_viewed_user_id, NOW()
-    );
+        p_viewer_user_id, p_viewed_user_id, 1, v_now, v_now, v_now
+    )
+    ON CONFLICT (viewer_user_id, viewed_user_id) DO UPDATE
+    SET
+        view_count = a.view_count + CASE
+            WHEN a.last_counted_at <= v_now - make_interval(secs => p_dedup_window_seconds) THEN 1
+            ELSE 0
+        END,
+        last_counted_at = CASE
+            WHEN a.last_counted_at <= v_now - make_interval(secs => p_dedup_window_seconds) THEN v_now
+            ELSE a.last_counted_at
+        END,
+        last_viewed_at = v_now
+    RETURNING a.last_counted_at = v_now, a.view_count
+    INTO v_counted, v_view_count;
+
+    IF v_counted THEN
+        v_view_id := gen_random_uuid();
+
+        INSERT INTO activity.profile_views (
+            view_id, viewer_user_id, viewed_user_id, viewed_at
+        ) VALUES (
+            v_view_id, p_viewer_user_id, p_viewed_user_id, v_now
+        );
+
+        -- Notification outbox (sql/10_social_event_outbox.sql)
+        PERFORM activity.fn_social_enqueue_event(p_viewed_user_id, p_viewer_user_id, 'profile_view');
+    END IF;
 
     RETURN jsonb_build_object(
         'view_recorded', TRUE,
+        'view_counted', v_counted,
         'view_id', v_view_id,
         'viewer_user_id', p_viewer_user_id,
         'viewed_user_id', p_viewed_user_id,
-        'viewed_at', NOW()
+        'view_count', v_view_count,
+        'viewed_at', v_now
     );
 EXCEPTION
     WHEN OTHERS THEN
@@ -91,38 +126,32 @@ BEGIN
         RAISE EXCEPTION 'PREMIUM_REQUIRED: This feature requires Premium or Club subscription';
     END IF;
 
-    -- Get total views count
-    SELECT COUNT(*)
-    INTO v_total_views
-    FROM activity.profile_views
-    WHERE viewed_user_id = p_user_id;
-
-    -- Get unique viewers count
-    SELECT COUNT(DISTINCT viewer_user_id)
-    INTO v_total_viewers
-    FROM activity.profile_views
+    -- Totals from the pair aggregates (one row per viewer)
+    SELECT COUNT(*), COALESCE(SUM(view_count), 0)
+    INTO v_total_viewers, v_total_views
+    FROM activity.profile_view_aggregates
     WHERE viewed_user_id = p_user_id;
 
-    -- Get viewers with aggregated data
-    SELECT COALESCE(jsonb_agg(viewer_data), '[]'::jsonb)
+    -- Most recent viewers straight off idx_profile_view_aggregates_viewed
+    SELECT COALESCE(jsonb_agg(viewer_data ORDER BY last_viewed_at DESC), '[]'::jsonb)
     INTO v_viewers
     FROM (
-        SELECT jsonb_build_object(
-            'viewer_user_id', u.user_id,
-            'username', u.username,
-            'first_name', u.first_name,
-            'last_name', u.last_name,
-            'main_photo_url', u.main_photo_url,
-            'is_verified', u.is_verified,
-            'last_viewed_at', MAX(pv.viewed_at),
-            'view_count', COUNT(pv.view_id)
-        ) AS viewer_data
-        FROM activity.profile_views pv
-        JOIN activity.users u ON u.user_id = pv.viewer_user_id
-        WHERE pv.viewed_user_id = p_user_id
-        GROUP BY u.user_id, u.username, u.first_name, u.last_name,
-                 u.main_photo_url, u.is_verified
-        ORDER BY MAX(pv.viewed_at) DESC
+        SELECT
+            jsonb_build_object(
+                'viewer_user_id', u.user_id,
+                'username', u.username,
+                'first_name', u.first_name,
+                'last_name', u.last_name,
+                'main_photo_url', u.main_photo_url,
+                'is_verified', u.is_verified,
+                'last_viewed_at', a.last_viewed_at,
+                'view_count', a.view_count
+            ) AS viewer_data,
+            a.last_viewed_at
+        FROM activity.profile_view_aggregates a
+        JOIN activity.users u ON u.user_id = a.viewer_user_id
+        WHERE a.viewed_user_id = p_user_id
+        ORDER BY a.last_viewed_at DESC
         LIMIT p_limit
         OFFSET p_offset
     ) viewers;
@@ -151,16 +180,9 @@ DECLARE
     v_total_views INT;
     v_unique_viewers INT;
 BEGIN
-    -- Get total views
-    SELECT COUNT(*)
-    INTO v_total_views
-    FROM activity.profile_views
-    WHERE viewed_user_id = p_user_id;
-
-    -- Get unique viewers
-    SELECT COUNT(DISTINCT viewer_user_id)
-    INTO v_unique_viewers
-    FROM activity.profile_views
+    SELECT COALESCE(SUM(view_count), 0), COUNT(*)
+    INTO v_total_views, v_unique_viewers
+    FROM activity.profile_view_aggregates
     WHERE viewed_user_id = p_user_id;
 
     RETURN jsonb_build_object(
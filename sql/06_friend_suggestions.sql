@@ -0,0 +1,300 @@
+-- ============================================================================
+-- FRIEND SUGGESTIONS MODULE - 2 TABLES, 2 TRIGGERS, 4 STORED PROCEDURES
+-- ============================================================================
+-- "People you may know" is precomputed: a background job scores 2-hop
+-- candidates into activity.friend_suggestions, and the endpoint reads the
+-- top-K rows for a user with a single index scan.
+
+CREATE TABLE IF NOT EXISTS activity.friend_suggestions (
+    user_id UUID NOT NULL REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    suggested_user_id UUID NOT NULL REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    mutual_count INT NOT NULL DEFAULT 0,
+    shared_activity_count INT NOT NULL DEFAULT 0,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (user_id, suggested_user_id),
+    CONSTRAINT check_not_self_suggestion CHECK (user_id != suggested_user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_friend_suggestions_user_score
+    ON activity.friend_suggestions(user_id, score DESC);
+
+COMMENT ON TABLE activity.friend_suggestions IS 'Precomputed top-K friend suggestions per user (2-hop candidates)';
+
+-- Users whose suggestions must be recomputed; drained by the background job
+CREATE TABLE IF NOT EXISTS activity.friend_suggestion_refresh_queue (
+    user_id UUID PRIMARY KEY REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    enqueued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_friend_suggestion_refresh_queue_enqueued
+    ON activity.friend_suggestion_refresh_queue(enqueued_at);
+
+-- Trigger: friendship changes drop the pair from suggestions and queue both users.
+-- When the pair becomes or stops being friends, the 2-hop candidates of every
+-- friend of either user change too (a mutual friend appears or goes), so
+-- their accepted friends are queued as well.
+CREATE OR REPLACE FUNCTION activity.trg_friend_suggestions_on_friendship()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_row RECORD;
+    v_was_accepted BOOLEAN := FALSE;
+    v_is_accepted BOOLEAN := FALSE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+        DELETE FROM activity.friend_suggestions
+        WHERE (user_id = v_row.user_id_1 AND suggested_user_id = v_row.user_id_2)
+        OR (user_id = v_row.user_id_2 AND suggested_user_id = v_row.user_id_1);
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        v_was_accepted := OLD.status = 'accepted';
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_is_accepted := NEW.status = 'accepted';
+    END IF;
+
+    INSERT INTO activity.friend_suggestion_refresh_queue (user_id)
+    VALUES (v_row.user_id_1), (v_row.user_id_2)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    IF v_was_accepted <> v_is_accepted THEN
+        INSERT INTO activity.friend_suggestion_refresh_queue (user_id)
+        SELECT friend_id FROM (
+            SELECT f.user_id_2 AS friend_id FROM activity.friendships f
+            WHERE f.user_id_1 IN (v_row.user_id_1, v_row.user_id_2) AND f.status = 'accepted'
+            UNION
+            SELECT f.user_id_1 FROM activity.friendships f
+            WHERE f.user_id_2 IN (v_row.user_id_1, v_row.user_id_2) AND f.status = 'accepted'
+        ) friends
+        WHERE friend_id NOT IN (v_row.user_id_1, v_row.user_id_2)
+        ON CONFLICT (user_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS friend_suggestions_on_friendship ON activity.friendships;
+CREATE TRIGGER friend_suggestions_on_friendship
+    AFTER INSERT OR UPDATE OF status OR DELETE ON activity.friendships
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_friend_suggestions_on_friendship();
+
+-- Trigger: a new block removes the pair immediately; an unblock queues both users
+CREATE OR REPLACE FUNCTION activity.trg_friend_suggestions_on_block()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        DELETE FROM activity.friend_suggestions
+        WHERE (user_id = NEW.blocker_user_id AND suggested_user_id = NEW.blocked_user_id)
+        OR (user_id = NEW.blocked_user_id AND suggested_user_id = NEW.blocker_user_id);
+    ELSE
+        INSERT INTO activity.friend_suggestion_refresh_queue (user_id)
+        VALUES (OLD.blocker_user_id), (OLD.blocked_user_id)
+        ON CONFLICT (user_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS friend_suggestions_on_block ON activity.user_blocks;
+CREATE TRIGGER friend_suggestions_on_block
+    AFTER INSERT OR DELETE ON activity.user_blocks
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_friend_suggestions_on_block();
+
+-- SP 1: Refresh Friend Suggestions (single user)
+CREATE OR REPLACE FUNCTION activity.sp_social_refresh_friend_suggestions(
+    p_user_id UUID,
+    p_top_k INT DEFAULT 50,
+    p_mutual_weight REAL DEFAULT 1.0,
+    p_activity_weight REAL DEFAULT 0.5
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_inserted INT;
+BEGIN
+    DELETE FROM activity.friend_suggestions
+    WHERE user_id = p_user_id;
+
+    WITH my_friends AS (
+        SELECT f.user_id_2 AS friend_id FROM activity.friendships f
+        WHERE f.user_id_1 = p_user_id AND f.status = 'accepted'
+        UNION ALL
+        SELECT f.user_id_1 FROM activity.friendships f
+        WHERE f.user_id_2 = p_user_id AND f.status = 'accepted'
+    ),
+    second_hop AS (
+        SELECT f.user_id_2 AS candidate_id
+        FROM my_friends m
+        JOIN activity.friendships f ON f.user_id_1 = m.friend_id AND f.status = 'accepted'
+        UNION ALL
+        SELECT f.user_id_1
+        FROM my_friends m
+        JOIN activity.friendships f ON f.user_id_2 = m.friend_id AND f.status = 'accepted'
+    ),
+    candidates AS (
+        SELECT s.candidate_id, COUNT(*) AS mutual_count
+        FROM second_hop s
+        WHERE s.candidate_id != p_user_id
+        -- Existing friendships and pending requests in either direction
+        AND NOT EXISTS (
+            SELECT 1 FROM activity.friendships f
+            WHERE f.user_id_1 = LEAST(p_user_id, s.candidate_id)
+            AND f.user_id_2 = GREATEST(p_user_id, s.candidate_id)
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM activity.user_blocks b
+            WHERE (b.blocker_user_id = p_user_id AND b.blocked_user_id = s.candidate_id)
+            OR (b.blocker_user_id = s.candidate_id AND b.blocked_user_id = p_user_id)
+        )
+        GROUP BY s.candidate_id
+    ),
+    shared_activities AS (
+        SELECT other.user_id AS candidate_id, COUNT(*) AS shared_activity_count
+        FROM activity.participants mine
+        JOIN activity.participants other
+            ON other.activity_id = mine.activity_id
+            AND other.participation_status = 'registered'
+        WHERE mine.user_id = p_user_id
+        AND mine.participation_status = 'registered'
+        AND other.user_id IN (SELECT candidate_id FROM candidates)
+        GROUP BY other.user_id
+    )
+    INSERT INTO activity.friend_suggestions (
+        user_id, suggested_user_id, score, mutual_count, shared_activity_count, computed_at
+    )
+    SELECT
+        p_user_id,
+        c.candidate_id,
+        c.mutual_count * p_mutual_weight + COALESCE(s.shared_activity_count, 0) * p_activity_weight,
+        c.mutual_count,
+        COALESCE(s.shared_activity_count, 0),
+        NOW()
+    FROM candidates c
+    LEFT JOIN shared_activities s ON s.candidate_id = c.candidate_id
+    ORDER BY 3 DESC, c.candidate_id
+    LIMIT p_top_k;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    RETURN v_inserted;
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Refresh Queued Friend Suggestions (background job)
+-- SKIP LOCKED lets several workers drain the queue concurrently.
+CREATE OR REPLACE FUNCTION activity.sp_social_refresh_queued_friend_suggestions(
+    p_batch_size INT DEFAULT 100,
+    p_top_k INT DEFAULT 50
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_id UUID;
+    v_users_refreshed INT := 0;
+    v_suggestions_written INT := 0;
+BEGIN
+    FOR v_user_id IN
+        DELETE FROM activity.friend_suggestion_refresh_queue
+        WHERE user_id IN (
+            SELECT user_id FROM activity.friend_suggestion_refresh_queue
+            ORDER BY enqueued_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING user_id
+    LOOP
+        v_suggestions_written := v_suggestions_written
+            + activity.sp_social_refresh_friend_suggestions(v_user_id, p_top_k);
+        v_users_refreshed := v_users_refreshed + 1;
+    END LOOP;
+
+    RETURN jsonb_build_object(
+        'users_refreshed', v_users_refreshed,
+        'suggestions_written', v_suggestions_written
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 3: Enqueue All Users (full rebuild, e.g. nightly)
+CREATE OR REPLACE FUNCTION activity.sp_social_enqueue_all_friend_suggestions()
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_enqueued INT;
+BEGIN
+    INSERT INTO activity.friend_suggestion_refresh_queue (user_id)
+    SELECT user_id_1 FROM activity.friendships WHERE status = 'accepted'
+    UNION
+    SELECT user_id_2 FROM activity.friendships WHERE status = 'accepted'
+    ON CONFLICT (user_id) DO NOTHING;
+
+    GET DIAGNOSTICS v_enqueued = ROW_COUNT;
+
+    RETURN jsonb_build_object('users_enqueued', v_enqueued);
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 4: Get Friend Suggestions
+CREATE OR REPLACE FUNCTION activity.sp_social_get_friend_suggestions(
+    p_user_id UUID,
+    p_limit INT DEFAULT 20
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_suggestions JSONB;
+BEGIN
+    SELECT COALESCE(jsonb_agg(suggestion_data), '[]'::jsonb)
+    INTO v_suggestions
+    FROM (
+        SELECT jsonb_build_object(
+            'user_id', u.user_id,
+            'username', u.username,
+            'first_name', u.first_name,
+            'last_name', u.last_name,
+            'main_photo_url', u.main_photo_url,
+            'is_verified', u.is_verified,
+            'mutual_count', s.mutual_count,
+            'shared_activity_count', s.shared_activity_count,
+            'score', s.score
+        ) AS suggestion_data
+        FROM activity.friend_suggestions s
+        JOIN activity.users u ON u.user_id = s.suggested_user_id
+        WHERE s.user_id = p_user_id
+        ORDER BY s.score DESC
+        LIMIT p_limit
+    ) suggestions;
+
+    RETURN jsonb_build_object(
+        'suggestions', v_suggestions,
+        'limit', p_limit
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
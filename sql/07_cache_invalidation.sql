@@ -0,0 +1,66 @@
+-- ============================================================================
+-- CACHE INVALIDATION - NOTIFY TRIGGERS
+-- ============================================================================
+-- Every change to a table that workers cache state for emits a compact
+-- NOTIFY on channel 'social_invalidation':
+--
+--     <kind>:<op>:<user_id>[:<user_id>]
+--
+-- kind: f = friendships (user_id_1, user_id_2)
+--       b = user_blocks (blocker_user_id, blocked_user_id)
+--       v = user_favorites (favoriting_user_id, favorited_user_id)
+--       s = user_settings (user_id)
+-- op:   I / U / D
+--
+-- Payloads stay far below the 8000 byte NOTIFY limit. Notifications are
+-- delivered on commit only, so rolled back writes never invalidate.
+
+CREATE OR REPLACE FUNCTION activity.trg_notify_social_invalidation()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_row RECORD;
+    v_payload TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    -- Separate branches: record fields are resolved per statement
+    IF TG_TABLE_NAME = 'friendships' THEN
+        v_payload := 'f:' || left(TG_OP, 1) || ':' || v_row.user_id_1 || ':' || v_row.user_id_2;
+    ELSIF TG_TABLE_NAME = 'user_blocks' THEN
+        v_payload := 'b:' || left(TG_OP, 1) || ':' || v_row.blocker_user_id || ':' || v_row.blocked_user_id;
+    ELSIF TG_TABLE_NAME = 'user_favorites' THEN
+        v_payload := 'v:' || left(TG_OP, 1) || ':' || v_row.favoriting_user_id || ':' || v_row.favorited_user_id;
+    ELSE
+        v_payload := 's:' || left(TG_OP, 1) || ':' || v_row.user_id;
+    END IF;
+
+    PERFORM pg_notify('social_invalidation', v_payload);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS notify_social_invalidation ON activity.friendships;
+CREATE TRIGGER notify_social_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON activity.friendships
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_notify_social_invalidation();
+
+DROP TRIGGER IF EXISTS notify_social_invalidation ON activity.user_blocks;
+CREATE TRIGGER notify_social_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON activity.user_blocks
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_notify_social_invalidation();
+
+DROP TRIGGER IF EXISTS notify_social_invalidation ON activity.user_favorites;
+CREATE TRIGGER notify_social_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON activity.user_favorites
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_notify_social_invalidation();
+
+DROP TRIGGER IF EXISTS notify_social_invalidation ON activity.user_settings;
+CREATE TRIGGER notify_social_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON activity.user_settings
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_notify_social_invalidation();
@@ -0,0 +1,130 @@
+-- ============================================================================
+-- BULK BLOCKING MODULE - 1 TABLE, 2 STORED PROCEDURES
+-- ============================================================================
+
+-- Staging for bulk block targets, loaded with COPY and consumed in the same
+-- transaction. UNLOGGED: rows never outlive the request that wrote them.
+CREATE UNLOGGED TABLE IF NOT EXISTS activity.bulk_block_staging (
+    batch_id UUID NOT NULL,
+    position INT NOT NULL,
+    blocked_user_id UUID NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bulk_block_staging_batch
+    ON activity.bulk_block_staging(batch_id);
+
+-- SP 1: Bulk Block Users
+-- Applies every staged block and the friendship removals they imply in one
+-- set-based statement, returning one outcome per staged target (in order):
+-- blocked | already_blocked | duplicate | self | user_not_found
+CREATE OR REPLACE FUNCTION activity.sp_social_bulk_block_users(
+    p_blocker_user_id UUID,
+    p_batch_id UUID,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_result JSONB;
+BEGIN
+    WITH staged AS (
+        SELECT
+            s.position,
+            s.blocked_user_id,
+            ROW_NUMBER() OVER (PARTITION BY s.blocked_user_id ORDER BY s.position) AS occurrence
+        FROM activity.bulk_block_staging s
+        WHERE s.batch_id = p_batch_id
+    ),
+    classified AS (
+        SELECT
+            s.position,
+            s.blocked_user_id,
+            CASE
+                WHEN s.occurrence > 1 THEN 'duplicate'
+                WHEN s.blocked_user_id = p_blocker_user_id THEN 'self'
+                WHEN NOT EXISTS (SELECT 1 FROM activity.users u WHERE u.user_id = s.blocked_user_id) THEN 'user_not_found'
+                WHEN EXISTS (
+                    SELECT 1 FROM activity.user_blocks b
+                    WHERE b.blocker_user_id = p_blocker_user_id
+                    AND b.blocked_user_id = s.blocked_user_id
+                ) THEN 'already_blocked'
+                ELSE 'blocked'
+            END AS outcome
+        FROM staged s
+    ),
+    inserted AS (
+        INSERT INTO activity.user_blocks (blocker_user_id, blocked_user_id, created_at, reason)
+        SELECT p_blocker_user_id, c.blocked_user_id, NOW(), p_reason
+        FROM classified c
+        WHERE c.outcome = 'blocked'
+        ON CONFLICT (blocker_user_id, blocked_user_id) DO NOTHING
+        RETURNING blocked_user_id
+    ),
+    removed AS (
+        DELETE FROM activity.friendships f
+        USING inserted i
+        WHERE f.user_id_1 = LEAST(p_blocker_user_id, i.blocked_user_id)
+        AND f.user_id_2 = GREATEST(p_blocker_user_id, i.blocked_user_id)
+        RETURNING i.blocked_user_id
+    ),
+    outcomes AS (
+        SELECT
+            c.position,
+            c.blocked_user_id,
+            -- Lost a race with a concurrent single block
+            CASE WHEN c.outcome = 'blocked' AND i.blocked_user_id IS NULL
+                 THEN 'already_blocked' ELSE c.outcome END AS outcome,
+            r.blocked_user_id IS NOT NULL AS friendship_removed
+        FROM classified c
+        LEFT JOIN inserted i ON i.blocked_user_id = c.blocked_user_id AND c.outcome = 'blocked'
+        LEFT JOIN removed r ON r.blocked_user_id = c.blocked_user_id AND c.outcome = 'blocked'
+    )
+    SELECT jsonb_build_object(
+        'blocker_user_id', p_blocker_user_id,
+        'results', COALESCE(jsonb_agg(jsonb_build_object(
+            'blocked_user_id', o.blocked_user_id,
+            'outcome', o.outcome,
+            'friendship_removed', o.friendship_removed
+        ) ORDER BY o.position), '[]'::jsonb),
+        'total_count', COUNT(*),
+        'blocked_count', COUNT(*) FILTER (WHERE o.outcome = 'blocked'),
+        'friendships_removed_count', COUNT(*) FILTER (WHERE o.friendship_removed),
+        'blocked_at', NOW()
+    )
+    INTO v_result
+    FROM outcomes o;
+
+    DELETE FROM activity.bulk_block_staging
+    WHERE batch_id = p_batch_id;
+
+    RETURN v_result;
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Export Blocked Users (streaming)
+-- Set-returning SQL function so a server-side cursor can fetch it in batches.
+CREATE OR REPLACE FUNCTION activity.sp_social_export_blocked_users(
+    p_blocker_user_id UUID
+)
+RETURNS SETOF JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'blocked_user_id', u.user_id,
+        'username', u.username,
+        'first_name', u.first_name,
+        'last_name', u.last_name,
+        'main_photo_url', u.main_photo_url,
+        'blocked_at', b.created_at,
+        'reason', b.reason
+    )
+    FROM activity.user_blocks b
+    JOIN activity.users u ON u.user_id = b.blocked_user_id
+    WHERE b.blocker_user_id = p_blocker_user_id
+    ORDER BY b.created_at DESC;
+$$;
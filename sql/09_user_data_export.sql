@@ -0,0 +1,84 @@
+-- ============================================================================
+-- USER DATA EXPORT MODULE - 1 STORED PROCEDURE
+-- ============================================================================
+
+-- SP 1: Export User Social Data (streaming)
+-- One JSON object per record, tagged with `type`. Set-returning SQL function
+-- without a global ORDER BY, so a server-side cursor streams it in batches
+-- without materializing the result.
+-- Who favorited or viewed the user is a Premium/Club feature (see
+-- sp_social_get_who_favorited_me / sp_social_get_who_viewed_my_profile): for
+-- other subscription levels those records are exported without `user_id`.
+DROP FUNCTION IF EXISTS activity.sp_social_export_user_data(UUID);
+
+CREATE OR REPLACE FUNCTION activity.sp_social_export_user_data(
+    p_user_id UUID,
+    p_subscription_level TEXT
+)
+RETURNS SETOF JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'type', 'friendship',
+        'user_id', CASE WHEN f.user_id_1 = p_user_id THEN f.user_id_2 ELSE f.user_id_1 END,
+        'status', f.status,
+        'initiated_by', f.initiated_by,
+        'created_at', f.created_at,
+        'accepted_at', f.accepted_at
+    )
+    FROM activity.friendships f
+    WHERE f.user_id_1 = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'friendship',
+        'user_id', f.user_id_1,
+        'status', f.status,
+        'initiated_by', f.initiated_by,
+        'created_at', f.created_at,
+        'accepted_at', f.accepted_at
+    )
+    FROM activity.friendships f
+    WHERE f.user_id_2 = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'favorite_given',
+        'user_id', fav.favorited_user_id,
+        'created_at', fav.created_at
+    )
+    FROM activity.user_favorites fav
+    WHERE fav.favoriting_user_id = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'favorite_received',
+        'user_id', CASE WHEN p_subscription_level IN ('premium', 'club') THEN fav.favoriting_user_id END,
+        'created_at', fav.created_at
+    )
+    FROM activity.user_favorites fav
+    WHERE fav.favorited_user_id = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'block',
+        'user_id', b.blocked_user_id,
+        'reason', b.reason,
+        'created_at', b.created_at
+    )
+    FROM activity.user_blocks b
+    WHERE b.blocker_user_id = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'profile_view_made',
+        'user_id', pv.viewed_user_id,
+        'viewed_at', pv.viewed_at
+    )
+    FROM activity.profile_views pv
+    WHERE pv.viewer_user_id = p_user_id
+    UNION ALL
+    SELECT jsonb_build_object(
+        'type', 'profile_view_received',
+        'user_id', CASE WHEN p_subscription_level IN ('premium', 'club') THEN pv.viewer_user_id END,
+        'viewed_at', pv.viewed_at
+    )
+    FROM activity.profile_views pv
+    WHERE pv.viewed_user_id = p_user_id;
+$$;
@@ -0,0 +1,146 @@
+-- ============================================================================
+-- SOCIAL EVENT OUTBOX - 1 TABLE, 1 HELPER, 2 STORED PROCEDURES
+-- ============================================================================
+-- Write SPs append notification-worthy events here in their own transaction;
+-- a background dispatcher drains the outbox in batches into
+-- activity.notifications (or another sink), so request latency does not
+-- depend on notification fan-out.
+
+-- ALTER TYPE ... ADD VALUE cannot be used in the transaction that adds it:
+-- run this file with psql autocommit (the default).
+ALTER TYPE activity.notification_type ADD VALUE IF NOT EXISTS 'friend_request';
+ALTER TYPE activity.notification_type ADD VALUE IF NOT EXISTS 'friend_accepted';
+
+CREATE TABLE IF NOT EXISTS activity.social_event_outbox (
+    event_id BIGSERIAL PRIMARY KEY,
+    recipient_user_id UUID NOT NULL,
+    actor_user_id UUID NOT NULL,
+    event_type activity.notification_type NOT NULL,
+    -- Events with the same recipient and dedup key collapse into one notification
+    dedup_key TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE activity.social_event_outbox IS 'Transactional outbox for social notifications, drained by the notification dispatcher';
+
+-- Helper: append one event (called from the write SPs)
+CREATE OR REPLACE FUNCTION activity.fn_social_enqueue_event(
+    p_recipient_user_id UUID,
+    p_actor_user_id UUID,
+    p_event_type activity.notification_type
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO activity.social_event_outbox (recipient_user_id, actor_user_id, event_type, dedup_key)
+    VALUES (p_recipient_user_id, p_actor_user_id, p_event_type, p_event_type || ':' || p_actor_user_id);
+$$;
+
+-- SP 1: Claim Outbox Events
+-- Removes up to p_batch_size of the oldest events and returns them in order.
+-- The DELETE only commits together with the sink's writes; SKIP LOCKED lets
+-- several dispatchers run side by side.
+CREATE OR REPLACE FUNCTION activity.sp_social_claim_outbox_events(
+    p_batch_size INT DEFAULT 500
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_events JSONB;
+BEGIN
+    WITH claimed AS (
+        DELETE FROM activity.social_event_outbox
+        WHERE event_id IN (
+            SELECT event_id FROM activity.social_event_outbox
+            ORDER BY event_id
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'event_id', c.event_id,
+        'recipient_user_id', c.recipient_user_id,
+        'actor_user_id', c.actor_user_id,
+        'event_type', c.event_type,
+        'dedup_key', c.dedup_key,
+        'created_at', c.created_at
+    ) ORDER BY c.event_id), '[]'::jsonb)
+    INTO v_events
+    FROM claimed c;
+
+    RETURN v_events;
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Insert Notifications (database sink)
+-- Skips events that already have an unread notification with the same dedup
+-- key for the recipient (hash_value holds md5 of the dedup key). Who viewed or
+-- favorited a user is a Premium/Club feature: for other recipients those
+-- notifications are stored without the actor. The outbox keeps events of
+-- actors deleted since; they are stored without the actor too, since
+-- notifications.actor_user_id references activity.users.
+CREATE OR REPLACE FUNCTION activity.sp_social_insert_notifications(
+    p_events JSONB
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_inserted INT;
+BEGIN
+    INSERT INTO activity.notifications (
+        user_id, actor_user_id, notification_type, target_type, target_id,
+        title, status, created_at, hash_value
+    )
+    SELECT
+        e.recipient_user_id,
+        CASE WHEN v.actor_visible THEN e.actor_user_id END,
+        e.event_type::activity.notification_type,
+        'user',
+        CASE WHEN v.actor_visible THEN e.actor_user_id END,
+        CASE e.event_type
+            WHEN 'friend_request' THEN 'New friend request'
+            WHEN 'friend_accepted' THEN 'Friend request accepted'
+            WHEN 'new_favorite' THEN 'Someone added you to their favorites'
+            WHEN 'profile_view' THEN 'Someone viewed your profile'
+            ELSE 'New activity'
+        END,
+        'unread',
+        e.created_at,
+        md5(e.dedup_key)
+    FROM jsonb_to_recordset(p_events) AS e(
+        event_id BIGINT,
+        recipient_user_id UUID,
+        actor_user_id UUID,
+        event_type TEXT,
+        dedup_key TEXT,
+        created_at TIMESTAMP WITH TIME ZONE
+    )
+    JOIN activity.users r ON r.user_id = e.recipient_user_id
+    LEFT JOIN activity.users a ON a.user_id = e.actor_user_id
+    CROSS JOIN LATERAL (
+        SELECT a.user_id IS NOT NULL
+            AND (e.event_type NOT IN ('profile_view', 'new_favorite')
+                OR r.subscription_level IN ('premium', 'club')) AS actor_visible
+    ) v
+    WHERE NOT EXISTS (
+        SELECT 1 FROM activity.notifications n
+        WHERE n.user_id = e.recipient_user_id
+        AND n.status = 'unread'
+        AND n.hash_value = md5(e.dedup_key)
+    )
+    ORDER BY e.event_id;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    RETURN v_inserted;
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
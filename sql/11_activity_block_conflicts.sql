@@ -0,0 +1,117 @@
+-- ============================================================================
+-- ACTIVITY BLOCK CONFLICTS MODULE - 1 STORED PROCEDURE
+-- ============================================================================
+
+-- SP 1: Get Activity Block Conflicts
+-- Every blocking pair among the registered participants of an activity in one
+-- join (participants PK -> idx_user_blocks_blocker -> participants PK) instead
+-- of N^2 can-interact checks. Pairs are returned compactly as indexes into the
+-- "users" array: [[blocker_index, blocked_index], ...]. Blocking does not apply
+-- to XXL activities, so they always report no conflicts.
+-- Block relationships between other users are private: only the organizer
+-- and registered co-organizers get the full matrix ("scope": "full"); other
+-- registered participants get just the pairs they are part of ("own").
+CREATE OR REPLACE FUNCTION activity.sp_social_get_activity_block_conflicts(
+    p_user_id UUID,
+    p_activity_id UUID
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_activity_type activity.activity_type;
+    v_organizer_user_id UUID;
+    v_participant_count INT;
+    v_full_matrix BOOLEAN;
+    v_users JSONB;
+    v_pairs JSONB;
+BEGIN
+    SELECT activity_type, organizer_user_id
+    INTO v_activity_type, v_organizer_user_id
+    FROM activity.activities
+    WHERE activity_id = p_activity_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'ACTIVITY_NOT_FOUND: Activity does not exist';
+    END IF;
+
+    IF p_user_id = v_organizer_user_id THEN
+        v_full_matrix := TRUE;
+    ELSE
+        SELECT role IN ('organizer', 'co_organizer')
+        INTO v_full_matrix
+        FROM activity.participants
+        WHERE activity_id = p_activity_id
+        AND user_id = p_user_id
+        AND participation_status = 'registered';
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'NOT_ACTIVITY_PARTICIPANT: Only the organizer and registered participants can view block conflicts';
+        END IF;
+    END IF;
+
+    SELECT COUNT(*) INTO v_participant_count
+    FROM activity.participants
+    WHERE activity_id = p_activity_id
+    AND participation_status = 'registered';
+
+    -- XXL EXCEPTION: Blocking does NOT apply to XXL activities
+    IF v_activity_type = 'xxl' THEN
+        RETURN jsonb_build_object(
+            'activity_id', p_activity_id,
+            'activity_type', v_activity_type,
+            'participant_count', v_participant_count,
+            'xxl_exception', TRUE,
+            'scope', CASE WHEN v_full_matrix THEN 'full' ELSE 'own' END,
+            'users', '[]'::jsonb,
+            'pairs', '[]'::jsonb,
+            'pair_count', 0
+        );
+    END IF;
+
+    WITH conflicts AS (
+        SELECT b.blocker_user_id, b.blocked_user_id
+        FROM activity.participants blocker
+        JOIN activity.user_blocks b ON b.blocker_user_id = blocker.user_id
+        JOIN activity.participants blocked
+            ON blocked.activity_id = blocker.activity_id
+            AND blocked.user_id = b.blocked_user_id
+            AND blocked.participation_status = 'registered'
+        WHERE blocker.activity_id = p_activity_id
+        AND blocker.participation_status = 'registered'
+        AND (v_full_matrix OR p_user_id IN (b.blocker_user_id, b.blocked_user_id))
+    ),
+    involved AS (
+        SELECT user_id, (ROW_NUMBER() OVER (ORDER BY user_id) - 1)::INT AS idx
+        FROM (
+            SELECT blocker_user_id AS user_id FROM conflicts
+            UNION
+            SELECT blocked_user_id FROM conflicts
+        ) u
+    )
+    SELECT
+        COALESCE((SELECT jsonb_agg(user_id ORDER BY idx) FROM involved), '[]'::jsonb),
+        COALESCE((
+            SELECT jsonb_agg(jsonb_build_array(ib.idx, id.idx) ORDER BY ib.idx, id.idx)
+            FROM conflicts c
+            JOIN involved ib ON ib.user_id = c.blocker_user_id
+            JOIN involved id ON id.user_id = c.blocked_user_id
+        ), '[]'::jsonb)
+    INTO v_users, v_pairs;
+
+    RETURN jsonb_build_object(
+        'activity_id', p_activity_id,
+        'activity_type', v_activity_type,
+        'participant_count', v_participant_count,
+        'xxl_exception', FALSE,
+        'scope', CASE WHEN v_full_matrix THEN 'full' ELSE 'own' END,
+        'users', v_users,
+        'pairs', v_pairs,
+        'pair_count', jsonb_array_length(v_pairs)
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
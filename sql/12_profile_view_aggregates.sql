@@ -0,0 +1,41 @@
+-- ============================================================================
+-- PROFILE VIEW AGGREGATES - 1 TABLE + BACKFILL
+-- ============================================================================
+
+-- One row per (viewer, viewed) pair, upserted by sp_social_record_profile_view
+-- (sql/04). Repeat views inside the dedup window only move last_viewed_at;
+-- view_count and the raw activity.profile_views log grow once per window.
+-- Who-viewed-me and the view count read this table, never GROUP BY the log.
+CREATE TABLE IF NOT EXISTS activity.profile_view_aggregates (
+    viewer_user_id UUID NOT NULL REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    viewed_user_id UUID NOT NULL REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    view_count INT NOT NULL DEFAULT 1,
+    first_viewed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_viewed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- Start of the current dedup window (the last view that was counted)
+    last_counted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (viewer_user_id, viewed_user_id),
+    CONSTRAINT check_not_self_view_aggregate CHECK (viewer_user_id != viewed_user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_profile_view_aggregates_viewed
+    ON activity.profile_view_aggregates(viewed_user_id, last_viewed_at DESC);
+
+COMMENT ON TABLE activity.profile_view_aggregates IS 'Per (viewer, viewed) profile view totals, maintained by sp_social_record_profile_view';
+
+-- Backfill from the raw log (idempotent). Historical views were not deduplicated,
+-- so their counts are taken as-is.
+INSERT INTO activity.profile_view_aggregates (
+    viewer_user_id, viewed_user_id, view_count, first_viewed_at, last_viewed_at, last_counted_at
+)
+SELECT
+    viewer_user_id,
+    viewed_user_id,
+    COUNT(*),
+    MIN(viewed_at),
+    MAX(viewed_at),
+    MAX(viewed_at)
+FROM activity.profile_views
+GROUP BY viewer_user_id, viewed_user_id
+ON CONFLICT (viewer_user_id, viewed_user_id) DO NOTHING;
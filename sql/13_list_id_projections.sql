@@ -0,0 +1,297 @@
+-- ============================================================================
+-- LIST ID PROJECTIONS - 6 STORED PROCEDURES
+-- ============================================================================
+
+-- `fields=ids` variants of the list SPs. Same filters, ordering and paging as
+-- the full lists, but they return a flat array of UUIDs and never join
+-- activity.users (search excepted: it matches on user columns, but still skips
+-- building per-row objects).
+
+-- SP 1: Get Friend Ids
+CREATE OR REPLACE FUNCTION activity.sp_social_get_friend_ids(
+    p_user_id UUID,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_count INT;
+BEGIN
+    -- Index-only scans of idx_friendship_edges_status_accepted (sql/17)
+    SELECT COUNT(*)
+    INTO v_total_count
+    FROM activity.friendship_edges e
+    WHERE e.user_id = p_user_id
+    AND e.status = 'accepted';
+
+    SELECT COALESCE(jsonb_agg(other_user_id ORDER BY accepted_at DESC), '[]'::jsonb)
+    INTO v_user_ids
+    FROM (
+        SELECT e.other_user_id, e.accepted_at
+        FROM activity.friendship_edges e
+        WHERE e.user_id = p_user_id
+        AND e.status = 'accepted'
+        ORDER BY e.accepted_at DESC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) friends;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_count', v_total_count,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Get Blocked User Ids
+CREATE OR REPLACE FUNCTION activity.sp_social_get_blocked_user_ids(
+    p_blocker_user_id UUID,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_count INT;
+BEGIN
+    SELECT COUNT(*)
+    INTO v_total_count
+    FROM activity.user_blocks
+    WHERE blocker_user_id = p_blocker_user_id;
+
+    SELECT COALESCE(jsonb_agg(blocked_user_id ORDER BY created_at DESC), '[]'::jsonb)
+    INTO v_user_ids
+    FROM (
+        SELECT b.blocked_user_id, b.created_at
+        FROM activity.user_blocks b
+        WHERE b.blocker_user_id = p_blocker_user_id
+        ORDER BY b.created_at DESC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) blocked;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_count', v_total_count,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 3: Get My Favorite Ids
+CREATE OR REPLACE FUNCTION activity.sp_social_get_my_favorite_ids(
+    p_user_id UUID,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_count INT;
+BEGIN
+    SELECT COUNT(*)
+    INTO v_total_count
+    FROM activity.user_favorites
+    WHERE favoriting_user_id = p_user_id;
+
+    SELECT COALESCE(jsonb_agg(favorited_user_id ORDER BY created_at DESC), '[]'::jsonb)
+    INTO v_user_ids
+    FROM (
+        SELECT f.favorited_user_id, f.created_at
+        FROM activity.user_favorites f
+        WHERE f.favoriting_user_id = p_user_id
+        ORDER BY f.created_at DESC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) favorites;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_count', v_total_count,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 4: Get Who Favorited Me Ids (Premium Feature)
+CREATE OR REPLACE FUNCTION activity.sp_social_get_who_favorited_me_ids(
+    p_user_id UUID,
+    p_subscription_level TEXT,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_count INT;
+BEGIN
+    IF p_subscription_level NOT IN ('premium', 'club') THEN
+        RAISE EXCEPTION 'PREMIUM_REQUIRED: This feature requires Premium or Club subscription';
+    END IF;
+
+    SELECT COUNT(*)
+    INTO v_total_count
+    FROM activity.user_favorites
+    WHERE favorited_user_id = p_user_id;
+
+    SELECT COALESCE(jsonb_agg(favoriting_user_id ORDER BY created_at DESC), '[]'::jsonb)
+    INTO v_user_ids
+    FROM (
+        SELECT f.favoriting_user_id, f.created_at
+        FROM activity.user_favorites f
+        WHERE f.favorited_user_id = p_user_id
+        ORDER BY f.created_at DESC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) favorited_by;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_count', v_total_count,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 5: Get Who Viewed My Profile Ids (Premium Feature)
+CREATE OR REPLACE FUNCTION activity.sp_social_get_who_viewed_my_profile_ids(
+    p_user_id UUID,
+    p_subscription_level TEXT,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_viewers INT;
+BEGIN
+    IF p_subscription_level NOT IN ('premium', 'club') THEN
+        RAISE EXCEPTION 'PREMIUM_REQUIRED: This feature requires Premium or Club subscription';
+    END IF;
+
+    SELECT COUNT(*)
+    INTO v_total_viewers
+    FROM activity.profile_view_aggregates
+    WHERE viewed_user_id = p_user_id;
+
+    SELECT COALESCE(jsonb_agg(viewer_user_id ORDER BY last_viewed_at DESC), '[]'::jsonb)
+    INTO v_user_ids
+    FROM (
+        SELECT a.viewer_user_id, a.last_viewed_at
+        FROM activity.profile_view_aggregates a
+        WHERE a.viewed_user_id = p_user_id
+        ORDER BY a.last_viewed_at DESC
+        LIMIT p_limit
+        OFFSET p_offset
+    ) viewers;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_viewers', v_total_viewers,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 6: Search User Ids
+CREATE OR REPLACE FUNCTION activity.sp_social_search_user_ids(
+    p_searcher_user_id UUID,
+    p_search_query TEXT,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids JSONB;
+    v_total_count INT;
+    v_search_pattern TEXT;
+BEGIN
+    IF LENGTH(TRIM(p_search_query)) < 2 THEN
+        RAISE EXCEPTION 'INVALID_QUERY: Search query must be at least 2 characters';
+    END IF;
+
+    v_search_pattern := '%' || LOWER(TRIM(p_search_query)) || '%';
+
+    WITH matches AS (
+        SELECT
+            u.user_id,
+            u.is_verified,
+            u.username,
+            CASE
+                WHEN LOWER(u.username) = LOWER(TRIM(p_search_query)) THEN 1
+                WHEN LOWER(u.first_name) = LOWER(TRIM(p_search_query)) THEN 2
+                WHEN LOWER(u.last_name) = LOWER(TRIM(p_search_query)) THEN 3
+                ELSE 4
+            END AS match_rank
+        FROM activity.users u
+        WHERE (
+            LOWER(u.username) LIKE v_search_pattern
+            OR LOWER(u.first_name) LIKE v_search_pattern
+            OR LOWER(u.last_name) LIKE v_search_pattern
+            OR LOWER(CONCAT(u.first_name, ' ', u.last_name)) LIKE v_search_pattern
+        )
+        AND u.user_id != p_searcher_user_id
+        AND NOT EXISTS (
+            SELECT 1 FROM activity.user_blocks
+            WHERE (blocker_user_id = p_searcher_user_id AND blocked_user_id = u.user_id)
+            OR (blocker_user_id = u.user_id AND blocked_user_id = p_searcher_user_id)
+        )
+    ),
+    page AS (
+        SELECT user_id, ROW_NUMBER() OVER (ORDER BY is_verified DESC, match_rank, username ASC) AS position
+        FROM matches
+        ORDER BY position
+        LIMIT p_limit
+        OFFSET p_offset
+    )
+    SELECT
+        (SELECT COUNT(*) FROM matches),
+        COALESCE((SELECT jsonb_agg(user_id ORDER BY position) FROM page), '[]'::jsonb)
+    INTO v_total_count, v_user_ids;
+
+    RETURN jsonb_build_object(
+        'user_ids', v_user_ids,
+        'total_count', v_total_count,
+        'search_query', p_search_query,
+        'limit', p_limit,
+        'offset', p_offset
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
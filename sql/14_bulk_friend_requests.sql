@@ -0,0 +1,179 @@
+-- ============================================================================
+-- BULK FRIEND REQUESTS MODULE - 2 STORED PROCEDURES
+-- ============================================================================
+
+-- Both SPs take either an explicit requester list (outcomes in request order)
+-- or NULL for every pending request the user has received (oldest first), and
+-- apply the change in one set-based statement.
+
+-- SP 1: Bulk Accept Friend Requests
+-- Outcomes: accepted | blocked | not_found | duplicate | self
+-- A block in either direction leaves the request pending and reports "blocked".
+CREATE OR REPLACE FUNCTION activity.sp_social_bulk_accept_friend_requests(
+    p_accepting_user_id UUID,
+    p_requester_user_ids UUID[] DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_now TIMESTAMP WITH TIME ZONE := NOW();
+    v_results JSONB;
+    v_accepted UUID[];
+BEGIN
+    WITH requested AS (
+        SELECT
+            r.requester_user_id,
+            r.position,
+            ROW_NUMBER() OVER (PARTITION BY r.requester_user_id ORDER BY r.position) AS occurrence
+        FROM unnest(p_requester_user_ids) WITH ORDINALITY AS r(requester_user_id, position)
+        WHERE p_requester_user_ids IS NOT NULL
+        UNION ALL
+        SELECT
+            f.initiated_by,
+            ROW_NUMBER() OVER (ORDER BY f.created_at),
+            1::BIGINT
+        FROM activity.friendships f
+        WHERE p_requester_user_ids IS NULL
+        AND (f.user_id_1 = p_accepting_user_id OR f.user_id_2 = p_accepting_user_id)
+        AND f.status = 'pending'
+        AND f.initiated_by <> p_accepting_user_id
+    ),
+    classified AS (
+        SELECT
+            rq.requester_user_id,
+            rq.position,
+            f.created_at,
+            CASE
+                WHEN rq.requester_user_id = p_accepting_user_id THEN 'self'
+                WHEN rq.occurrence > 1 THEN 'duplicate'
+                WHEN f.user_id_1 IS NULL THEN 'not_found'
+                WHEN EXISTS (
+                    SELECT 1 FROM activity.user_blocks b
+                    WHERE (b.blocker_user_id = p_accepting_user_id AND b.blocked_user_id = rq.requester_user_id)
+                    OR (b.blocker_user_id = rq.requester_user_id AND b.blocked_user_id = p_accepting_user_id)
+                ) THEN 'blocked'
+                ELSE 'accepted'
+            END AS outcome
+        FROM requested rq
+        LEFT JOIN activity.friendships f
+            ON f.user_id_1 = LEAST(p_accepting_user_id, rq.requester_user_id)
+            AND f.user_id_2 = GREATEST(p_accepting_user_id, rq.requester_user_id)
+            AND f.status = 'pending'
+            AND f.initiated_by = rq.requester_user_id
+    ),
+    updated AS (
+        UPDATE activity.friendships f
+        SET status = 'accepted',
+            accepted_at = v_now,
+            updated_at = v_now
+        FROM classified c
+        WHERE c.outcome = 'accepted'
+        AND f.user_id_1 = LEAST(p_accepting_user_id, c.requester_user_id)
+        AND f.user_id_2 = GREATEST(p_accepting_user_id, c.requester_user_id)
+        AND f.status = 'pending'
+        AND f.initiated_by = c.requester_user_id
+        RETURNING c.requester_user_id
+    )
+    SELECT
+        COALESCE(jsonb_agg(
+            jsonb_build_object(
+                'requester_user_id', c.requester_user_id,
+                -- Changed by a concurrent transaction between classify and update
+                'outcome', CASE WHEN c.outcome = 'accepted' AND u.requester_user_id IS NULL THEN 'not_found' ELSE c.outcome END,
+                'created_at', c.created_at
+            ) ORDER BY c.position
+        ), '[]'::jsonb),
+        array_agg(u.requester_user_id) FILTER (WHERE u.requester_user_id IS NOT NULL)
+    INTO v_results, v_accepted
+    FROM classified c
+    LEFT JOIN updated u ON u.requester_user_id = c.requester_user_id AND c.outcome = 'accepted';
+
+    -- Notification outbox (sql/10_social_event_outbox.sql)
+    PERFORM activity.fn_social_enqueue_event(r.requester_user_id, p_accepting_user_id, 'friend_accepted')
+    FROM unnest(v_accepted) AS r(requester_user_id);
+
+    RETURN jsonb_build_object(
+        'results', v_results,
+        'total_count', jsonb_array_length(v_results),
+        'accepted_count', COALESCE(array_length(v_accepted, 1), 0),
+        'accepted_at', v_now
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Bulk Decline Friend Requests
+-- Outcomes: declined | not_found | duplicate | self
+-- Declining only removes a pending request, so it is allowed regardless of blocks.
+CREATE OR REPLACE FUNCTION activity.sp_social_bulk_decline_friend_requests(
+    p_declining_user_id UUID,
+    p_requester_user_ids UUID[] DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_now TIMESTAMP WITH TIME ZONE := NOW();
+    v_results JSONB;
+    v_declined_count INT;
+BEGIN
+    WITH requested AS (
+        SELECT
+            r.requester_user_id,
+            r.position,
+            ROW_NUMBER() OVER (PARTITION BY r.requester_user_id ORDER BY r.position) AS occurrence
+        FROM unnest(p_requester_user_ids) WITH ORDINALITY AS r(requester_user_id, position)
+        WHERE p_requester_user_ids IS NOT NULL
+        UNION ALL
+        SELECT
+            f.initiated_by,
+            ROW_NUMBER() OVER (ORDER BY f.created_at),
+            1::BIGINT
+        FROM activity.friendships f
+        WHERE p_requester_user_ids IS NULL
+        AND (f.user_id_1 = p_declining_user_id OR f.user_id_2 = p_declining_user_id)
+        AND f.status = 'pending'
+        AND f.initiated_by <> p_declining_user_id
+    ),
+    deleted AS (
+        DELETE FROM activity.friendships f
+        USING requested rq
+        WHERE rq.occurrence = 1
+        AND rq.requester_user_id <> p_declining_user_id
+        AND f.user_id_1 = LEAST(p_declining_user_id, rq.requester_user_id)
+        AND f.user_id_2 = GREATEST(p_declining_user_id, rq.requester_user_id)
+        AND f.status = 'pending'
+        AND f.initiated_by = rq.requester_user_id
+        RETURNING f.initiated_by AS requester_user_id
+    )
+    SELECT
+        COALESCE(jsonb_agg(
+            jsonb_build_object(
+                'requester_user_id', rq.requester_user_id,
+                'outcome', CASE
+                    WHEN rq.requester_user_id = p_declining_user_id THEN 'self'
+                    WHEN rq.occurrence > 1 THEN 'duplicate'
+                    WHEN d.requester_user_id IS NULL THEN 'not_found'
+                    ELSE 'declined'
+                END
+            ) ORDER BY rq.position
+        ), '[]'::jsonb),
+        COUNT(d.requester_user_id)
+    INTO v_results, v_declined_count
+    FROM requested rq
+    LEFT JOIN deleted d ON d.requester_user_id = rq.requester_user_id AND rq.occurrence = 1;
+
+    RETURN jsonb_build_object(
+        'results', v_results,
+        'total_count', jsonb_array_length(v_results),
+        'declined_count', v_declined_count,
+        'declined_at', v_now
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
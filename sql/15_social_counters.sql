@@ -0,0 +1,459 @@
+-- ============================================================================
+-- SOCIAL COUNTERS - 1 TABLE, 4 TRIGGERS, 2 STORED PROCEDURES
+-- ============================================================================
+-- One row per user with the counts the home screen shows, so the summary is a
+-- single primary key read instead of a COUNT per social table. Triggers keep
+-- the row in step with every write in the same transaction (including bulk
+-- accept/decline/block, which change many rows per statement); the
+-- reconciliation SP walks users in batches and repairs any drift.
+
+CREATE TABLE IF NOT EXISTS activity.user_social_counters (
+    user_id UUID PRIMARY KEY REFERENCES activity.users(user_id) ON DELETE CASCADE,
+    friend_count INT NOT NULL DEFAULT 0,
+    pending_received_count INT NOT NULL DEFAULT 0,
+    pending_sent_count INT NOT NULL DEFAULT 0,
+    favorites_given_count INT NOT NULL DEFAULT 0,
+    favorites_received_count INT NOT NULL DEFAULT 0,
+    blocked_count INT NOT NULL DEFAULT 0,
+    profile_view_count INT NOT NULL DEFAULT 0,
+    unique_viewer_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE activity.user_social_counters IS 'Per-user social counts, maintained by triggers and repaired by sp_social_reconcile_social_counters';
+
+DO $$
+BEGIN
+    CREATE TYPE activity.social_counter_delta AS (
+        user_id UUID,
+        friend_count INT,
+        pending_received_count INT,
+        pending_sent_count INT,
+        favorites_given_count INT,
+        favorites_received_count INT,
+        blocked_count INT,
+        profile_view_count INT,
+        unique_viewer_count INT
+    );
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END;
+$$;
+
+-- Sum the deltas per user and add them to the counter rows. Rows are written
+-- in user_id order so concurrent writers (and the reconciler) lock them in the
+-- same order. Users deleted in this transaction (ON DELETE CASCADE of their
+-- friendships etc.) are skipped; their counter row goes with them.
+CREATE OR REPLACE FUNCTION activity.fn_social_counters_apply(p_deltas activity.social_counter_delta[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO activity.user_social_counters AS c (
+        user_id, friend_count, pending_received_count, pending_sent_count,
+        favorites_given_count, favorites_received_count, blocked_count,
+        profile_view_count, unique_viewer_count, updated_at
+    )
+    SELECT
+        d.user_id,
+        SUM(d.friend_count),
+        SUM(d.pending_received_count),
+        SUM(d.pending_sent_count),
+        SUM(d.favorites_given_count),
+        SUM(d.favorites_received_count),
+        SUM(d.blocked_count),
+        SUM(d.profile_view_count),
+        SUM(d.unique_viewer_count),
+        NOW()
+    FROM unnest(p_deltas) d
+    WHERE EXISTS (SELECT 1 FROM activity.users u WHERE u.user_id = d.user_id)
+    GROUP BY d.user_id
+    HAVING SUM(d.friend_count) <> 0
+        OR SUM(d.pending_received_count) <> 0
+        OR SUM(d.pending_sent_count) <> 0
+        OR SUM(d.favorites_given_count) <> 0
+        OR SUM(d.favorites_received_count) <> 0
+        OR SUM(d.blocked_count) <> 0
+        OR SUM(d.profile_view_count) <> 0
+        OR SUM(d.unique_viewer_count) <> 0
+    ORDER BY d.user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET
+        friend_count = c.friend_count + EXCLUDED.friend_count,
+        pending_received_count = c.pending_received_count + EXCLUDED.pending_received_count,
+        pending_sent_count = c.pending_sent_count + EXCLUDED.pending_sent_count,
+        favorites_given_count = c.favorites_given_count + EXCLUDED.favorites_given_count,
+        favorites_received_count = c.favorites_received_count + EXCLUDED.favorites_received_count,
+        blocked_count = c.blocked_count + EXCLUDED.blocked_count,
+        profile_view_count = c.profile_view_count + EXCLUDED.profile_view_count,
+        unique_viewer_count = c.unique_viewer_count + EXCLUDED.unique_viewer_count,
+        updated_at = EXCLUDED.updated_at;
+$$;
+
+-- Counter delta of one side (p_user_id) of a friendship row
+CREATE OR REPLACE FUNCTION activity.fn_social_friendship_counter_delta(
+    p_user_id UUID,
+    p_status TEXT,
+    p_initiated_by UUID,
+    p_sign INT
+)
+RETURNS activity.social_counter_delta
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT ROW(
+        p_user_id,
+        CASE WHEN p_status = 'accepted' THEN p_sign ELSE 0 END,
+        CASE WHEN p_status = 'pending' AND p_user_id <> p_initiated_by THEN p_sign ELSE 0 END,
+        CASE WHEN p_status = 'pending' AND p_user_id = p_initiated_by THEN p_sign ELSE 0 END,
+        0, 0, 0, 0, 0
+    )::activity.social_counter_delta;
+$$;
+
+-- Trigger 1: friendships (statement level: one upsert per affected user per statement)
+CREATE OR REPLACE FUNCTION activity.trg_social_counters_on_friendship()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deltas activity.social_counter_delta[] := '{}';
+BEGIN
+    -- Transition tables only exist for their own events
+    IF TG_OP <> 'INSERT' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT activity.fn_social_friendship_counter_delta(x.user_id, o.status, o.initiated_by, -1)
+            FROM old_rows o
+            CROSS JOIN LATERAL (VALUES (o.user_id_1), (o.user_id_2)) AS x(user_id)
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT activity.fn_social_friendship_counter_delta(x.user_id, n.status, n.initiated_by, 1)
+            FROM new_rows n
+            CROSS JOIN LATERAL (VALUES (n.user_id_1), (n.user_id_2)) AS x(user_id)
+        );
+    END IF;
+
+    PERFORM activity.fn_social_counters_apply(v_deltas);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS social_counters_on_friendship_insert ON activity.friendships;
+CREATE TRIGGER social_counters_on_friendship_insert
+    AFTER INSERT ON activity.friendships
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_friendship();
+
+DROP TRIGGER IF EXISTS social_counters_on_friendship_update ON activity.friendships;
+CREATE TRIGGER social_counters_on_friendship_update
+    AFTER UPDATE ON activity.friendships
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_friendship();
+
+DROP TRIGGER IF EXISTS social_counters_on_friendship_delete ON activity.friendships;
+CREATE TRIGGER social_counters_on_friendship_delete
+    AFTER DELETE ON activity.friendships
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_friendship();
+
+-- Trigger 2: favorites (given by favoriting_user_id, received by favorited_user_id)
+CREATE OR REPLACE FUNCTION activity.trg_social_counters_on_favorite()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deltas activity.social_counter_delta[] := '{}';
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT ROW(x.user_id, 0, 0, 0, x.given, x.received, 0, 0, 0)::activity.social_counter_delta
+            FROM old_rows o
+            CROSS JOIN LATERAL (VALUES (o.favoriting_user_id, -1, 0), (o.favorited_user_id, 0, -1)) AS x(user_id, given, received)
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT ROW(x.user_id, 0, 0, 0, x.given, x.received, 0, 0, 0)::activity.social_counter_delta
+            FROM new_rows n
+            CROSS JOIN LATERAL (VALUES (n.favoriting_user_id, 1, 0), (n.favorited_user_id, 0, 1)) AS x(user_id, given, received)
+        );
+    END IF;
+
+    PERFORM activity.fn_social_counters_apply(v_deltas);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS social_counters_on_favorite_insert ON activity.user_favorites;
+CREATE TRIGGER social_counters_on_favorite_insert
+    AFTER INSERT ON activity.user_favorites
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_favorite();
+
+DROP TRIGGER IF EXISTS social_counters_on_favorite_update ON activity.user_favorites;
+CREATE TRIGGER social_counters_on_favorite_update
+    AFTER UPDATE ON activity.user_favorites
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_favorite();
+
+DROP TRIGGER IF EXISTS social_counters_on_favorite_delete ON activity.user_favorites;
+CREATE TRIGGER social_counters_on_favorite_delete
+    AFTER DELETE ON activity.user_favorites
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_favorite();
+
+-- Trigger 3: blocks (counted for the blocker only)
+CREATE OR REPLACE FUNCTION activity.trg_social_counters_on_block()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deltas activity.social_counter_delta[] := '{}';
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT ROW(o.blocker_user_id, 0, 0, 0, 0, 0, -1, 0, 0)::activity.social_counter_delta
+            FROM old_rows o
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_deltas := v_deltas || ARRAY(
+            SELECT ROW(n.blocker_user_id, 0, 0, 0, 0, 0, 1, 0, 0)::activity.social_counter_delta
+            FROM new_rows n
+        );
+    END IF;
+
+    PERFORM activity.fn_social_counters_apply(v_deltas);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS social_counters_on_block_insert ON activity.user_blocks;
+CREATE TRIGGER social_counters_on_block_insert
+    AFTER INSERT ON activity.user_blocks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_block();
+
+DROP TRIGGER IF EXISTS social_counters_on_block_update ON activity.user_blocks;
+CREATE TRIGGER social_counters_on_block_update
+    AFTER UPDATE ON activity.user_blocks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_block();
+
+DROP TRIGGER IF EXISTS social_counters_on_block_delete ON activity.user_blocks;
+CREATE TRIGGER social_counters_on_block_delete
+    AFTER DELETE ON activity.user_blocks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_social_counters_on_block();
+
+-- Trigger 4: profile view aggregates (sql/12). Row level with a WHEN clause:
+-- views inside the dedup window only move last_viewed_at and must not pay
+-- for a counter write.
+CREATE OR REPLACE FUNCTION activity.trg_social_counters_on_profile_view()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM activity.fn_social_counters_apply(ARRAY[
+            ROW(NEW.viewed_user_id, 0, 0, 0, 0, 0, 0, NEW.view_count, 1)::activity.social_counter_delta
+        ]);
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM activity.fn_social_counters_apply(ARRAY[
+            ROW(OLD.viewed_user_id, 0, 0, 0, 0, 0, 0, -OLD.view_count, -1)::activity.social_counter_delta,
+            ROW(NEW.viewed_user_id, 0, 0, 0, 0, 0, 0, NEW.view_count, 1)::activity.social_counter_delta
+        ]);
+    ELSE
+        PERFORM activity.fn_social_counters_apply(ARRAY[
+            ROW(OLD.viewed_user_id, 0, 0, 0, 0, 0, 0, -OLD.view_count, -1)::activity.social_counter_delta
+        ]);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS social_counters_on_profile_view_insert ON activity.profile_view_aggregates;
+CREATE TRIGGER social_counters_on_profile_view_insert
+    AFTER INSERT ON activity.profile_view_aggregates
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_social_counters_on_profile_view();
+
+DROP TRIGGER IF EXISTS social_counters_on_profile_view_update ON activity.profile_view_aggregates;
+CREATE TRIGGER social_counters_on_profile_view_update
+    AFTER UPDATE ON activity.profile_view_aggregates
+    FOR EACH ROW
+    WHEN (OLD.view_count IS DISTINCT FROM NEW.view_count OR OLD.viewed_user_id IS DISTINCT FROM NEW.viewed_user_id)
+    EXECUTE FUNCTION activity.trg_social_counters_on_profile_view();
+
+DROP TRIGGER IF EXISTS social_counters_on_profile_view_delete ON activity.profile_view_aggregates;
+CREATE TRIGGER social_counters_on_profile_view_delete
+    AFTER DELETE ON activity.profile_view_aggregates
+    FOR EACH ROW EXECUTE FUNCTION activity.trg_social_counters_on_profile_view();
+
+-- Counts recomputed from the source tables (reconciliation and backfill)
+CREATE OR REPLACE FUNCTION activity.fn_social_counters_actual(p_user_ids UUID[])
+RETURNS SETOF activity.social_counter_delta
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT ROW(
+        t.user_id,
+        (SELECT COUNT(*) FROM activity.friendships f WHERE f.user_id_1 = t.user_id AND f.status = 'accepted')
+            + (SELECT COUNT(*) FROM activity.friendships f WHERE f.user_id_2 = t.user_id AND f.status = 'accepted'),
+        (SELECT COUNT(*) FROM activity.friendships f
+            WHERE f.user_id_1 = t.user_id AND f.status = 'pending' AND f.initiated_by <> t.user_id)
+            + (SELECT COUNT(*) FROM activity.friendships f
+            WHERE f.user_id_2 = t.user_id AND f.status = 'pending' AND f.initiated_by <> t.user_id),
+        (SELECT COUNT(*) FROM activity.friendships f
+            WHERE f.user_id_1 = t.user_id AND f.status = 'pending' AND f.initiated_by = t.user_id)
+            + (SELECT COUNT(*) FROM activity.friendships f
+            WHERE f.user_id_2 = t.user_id AND f.status = 'pending' AND f.initiated_by = t.user_id),
+        (SELECT COUNT(*) FROM activity.user_favorites v WHERE v.favoriting_user_id = t.user_id),
+        (SELECT COUNT(*) FROM activity.user_favorites v WHERE v.favorited_user_id = t.user_id),
+        (SELECT COUNT(*) FROM activity.user_blocks b WHERE b.blocker_user_id = t.user_id),
+        (SELECT COALESCE(SUM(a.view_count), 0) FROM activity.profile_view_aggregates a WHERE a.viewed_user_id = t.user_id),
+        (SELECT COUNT(*) FROM activity.profile_view_aggregates a WHERE a.viewed_user_id = t.user_id)
+    )::activity.social_counter_delta
+    FROM unnest(p_user_ids) AS t(user_id);
+$$;
+
+-- SP 1: Get Social Summary
+-- Every home screen count in one primary key read; zeros until the user's
+-- first social write creates the row.
+CREATE OR REPLACE FUNCTION activity.sp_social_get_social_summary(
+    p_user_id UUID
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_counters RECORD;
+BEGIN
+    SELECT * INTO v_counters
+    FROM activity.user_social_counters
+    WHERE user_id = p_user_id;
+
+    RETURN jsonb_build_object(
+        'user_id', p_user_id,
+        'friend_count', COALESCE(v_counters.friend_count, 0),
+        'pending_received_count', COALESCE(v_counters.pending_received_count, 0),
+        'pending_sent_count', COALESCE(v_counters.pending_sent_count, 0),
+        'favorites_given_count', COALESCE(v_counters.favorites_given_count, 0),
+        'favorites_received_count', COALESCE(v_counters.favorites_received_count, 0),
+        'blocked_count', COALESCE(v_counters.blocked_count, 0),
+        'profile_view_count', COALESCE(v_counters.profile_view_count, 0),
+        'unique_viewer_count', COALESCE(v_counters.unique_viewer_count, 0),
+        'updated_at', v_counters.updated_at
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- SP 2: Reconcile Social Counters
+-- Checks the next p_batch_size users after p_after_user_id (NULL = start) and
+-- rewrites rows that drifted. The rows are locked first, in user_id order, and
+-- the counts are taken afterwards: every write committed before the lock is in
+-- the recount and every later one queues behind it and applies its delta on
+-- top, so the repair itself cannot lose an update. next_after_user_id is NULL
+-- once the last batch has been checked.
+CREATE OR REPLACE FUNCTION activity.sp_social_reconcile_social_counters(
+    p_after_user_id UUID DEFAULT NULL,
+    p_batch_size INT DEFAULT 1000
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids UUID[];
+    v_repaired UUID[];
+BEGIN
+    SELECT COALESCE(array_agg(u.user_id ORDER BY u.user_id), '{}')
+    INTO v_user_ids
+    FROM (
+        SELECT user_id
+        FROM activity.users
+        WHERE p_after_user_id IS NULL OR user_id > p_after_user_id
+        ORDER BY user_id
+        LIMIT p_batch_size
+    ) u;
+
+    INSERT INTO activity.user_social_counters (user_id)
+    SELECT t.user_id FROM unnest(v_user_ids) AS t(user_id)
+    ORDER BY t.user_id
+    ON CONFLICT (user_id) DO NOTHING;
+
+    PERFORM 1
+    FROM activity.user_social_counters
+    WHERE user_id = ANY(v_user_ids)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    WITH repaired AS (
+        UPDATE activity.user_social_counters c
+        SET
+            friend_count = a.friend_count,
+            pending_received_count = a.pending_received_count,
+            pending_sent_count = a.pending_sent_count,
+            favorites_given_count = a.favorites_given_count,
+            favorites_received_count = a.favorites_received_count,
+            blocked_count = a.blocked_count,
+            profile_view_count = a.profile_view_count,
+            unique_viewer_count = a.unique_viewer_count,
+            updated_at = NOW()
+        FROM activity.fn_social_counters_actual(v_user_ids) a
+        WHERE c.user_id = a.user_id
+        AND (
+            c.friend_count, c.pending_received_count, c.pending_sent_count,
+            c.favorites_given_count, c.favorites_received_count, c.blocked_count,
+            c.profile_view_count, c.unique_viewer_count
+        ) IS DISTINCT FROM (
+            a.friend_count, a.pending_received_count, a.pending_sent_count,
+            a.favorites_given_count, a.favorites_received_count, a.blocked_count,
+            a.profile_view_count, a.unique_viewer_count
+        )
+        RETURNING c.user_id
+    )
+    SELECT COALESCE(array_agg(user_id), '{}')
+    INTO v_repaired
+    FROM repaired;
+
+    RETURN jsonb_build_object(
+        'checked_count', cardinality(v_user_ids),
+        'repaired_count', cardinality(v_repaired),
+        'repaired_user_ids', to_jsonb(v_repaired),
+        'next_after_user_id', CASE
+            WHEN cardinality(v_user_ids) < p_batch_size THEN NULL
+            ELSE v_user_ids[cardinality(v_user_ids)]
+        END
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
+
+-- Backfill (idempotent). The triggers above are already live, so writes that
+-- race with this statement may be off by one until the next reconciliation pass.
+INSERT INTO activity.user_social_counters AS c (
+    user_id, friend_count, pending_received_count, pending_sent_count,
+    favorites_given_count, favorites_received_count, blocked_count,
+    profile_view_count, unique_viewer_count
+)
+SELECT
+    a.user_id, a.friend_count, a.pending_received_count, a.pending_sent_count,
+    a.favorites_given_count, a.favorites_received_count, a.blocked_count,
+    a.profile_view_count, a.unique_viewer_count
+FROM activity.fn_social_counters_actual(ARRAY(SELECT user_id FROM activity.users)) a
+ON CONFLICT (user_id) DO UPDATE
+SET
+    friend_count = EXCLUDED.friend_count,
+    pending_received_count = EXCLUDED.pending_received_count,
+    pending_sent_count = EXCLUDED.pending_sent_count,
+    favorites_given_count = EXCLUDED.favorites_given_count,
+    favorites_received_count = EXCLUDED.favorites_received_count,
+    blocked_count = EXCLUDED.blocked_count,
+    profile_view_count = EXCLUDED.profile_view_count,
+    unique_viewer_count = EXCLUDED.unique_viewer_count,
+    updated_at = NOW();
@@ -0,0 +1,45 @@
+-- ============================================================================
+-- BLOCK SET EXPORT - 1 INDEX, 1 STORED PROCEDURE
+-- ============================================================================
+
+-- Everyone a user blocked and everyone who blocked them, for services that
+-- cache the set and filter locally (GET /social/blocks/set). Both directions
+-- are index-only scans: the primary key covers blocker -> blocked, the index
+-- below covers blocked -> blocker.
+CREATE INDEX IF NOT EXISTS idx_user_blocks_blocked_blocker
+    ON activity.user_blocks(blocked_user_id) INCLUDE (blocker_user_id);
+
+-- SP 1: Get Block Set
+-- UUIDs are sorted by value (byte order) so the API can encode them without
+-- re-sorting. Blocking does not apply to XXL activities; consumers apply that
+-- exception themselves.
+CREATE OR REPLACE FUNCTION activity.sp_social_get_block_set(
+    p_user_id UUID
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_blocked JSONB;
+    v_blocked_by JSONB;
+BEGIN
+    SELECT COALESCE(jsonb_agg(b.blocked_user_id ORDER BY b.blocked_user_id), '[]'::jsonb)
+    INTO v_blocked
+    FROM activity.user_blocks b
+    WHERE b.blocker_user_id = p_user_id;
+
+    SELECT COALESCE(jsonb_agg(b.blocker_user_id ORDER BY b.blocker_user_id), '[]'::jsonb)
+    INTO v_blocked_by
+    FROM activity.user_blocks b
+    WHERE b.blocked_user_id = p_user_id;
+
+    RETURN jsonb_build_object(
+        'blocked', v_blocked,
+        'blocked_by', v_blocked_by
+    );
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE;
+END;
+$$;
@@ -0,0 +1,137 @@
+-- ============================================================================
+-- FRIENDSHIP EDGES - 1 TABLE, 3 TRIGGERS + BACKFILL
+-- ============================================================================
+-- activity.friendships stores each pair once (user_id_1 < user_id_2), so a
+-- per-user list has to match `user_id_1 = $1 OR user_id_2 = $1` and cannot
+-- read an index in list order. friendship_edges holds the same rows once per
+-- direction, keyed by the user whose list they belong to. The friends,
+-- friend ids, received and sent request SPs (sql/01, sql/13) read it with
+-- index-only scans in list order, so a page of a high-degree user's list
+-- reads only that page from the index.
+--
+-- Statement-level triggers keep it in step with friendships in the same
+-- transaction (bulk accept/decline/block included). Rows disappear with their
+-- friendship, which also covers ON DELETE CASCADE from activity.users, so the
+-- table needs no foreign keys of its own.
+--
+-- Run this file in one transaction (psql -1 -f ...): friendship writes wait
+-- for it, so no write is missed between the backfill and the triggers.
+
+CREATE TABLE IF NOT EXISTS activity.friendship_edges (
+    user_id UUID NOT NULL,
+    other_user_id UUID NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    -- user_id sent the request (initiated_by = user_id)
+    is_initiator BOOLEAN NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    accepted_at TIMESTAMP WITH TIME ZONE,
+
+    PRIMARY KEY (user_id, other_user_id)
+);
+
+-- Friends list / friend ids: ORDER BY accepted_at DESC for one user
+CREATE INDEX IF NOT EXISTS idx_friendship_edges_status_accepted
+    ON activity.friendship_edges(user_id, status, accepted_at DESC) INCLUDE (other_user_id);
+
+-- Received (is_initiator = false) and sent (true) requests: ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_friendship_edges_pending
+    ON activity.friendship_edges(user_id, is_initiator, created_at DESC) INCLUDE (other_user_id)
+    WHERE status = 'pending';
+
+COMMENT ON TABLE activity.friendship_edges IS 'activity.friendships once per direction, maintained by triggers; read by the friendship list SPs';
+
+CREATE OR REPLACE FUNCTION activity.trg_friendship_edges_on_friendship()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Transition tables only exist for their own events
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM activity.friendship_edges e
+        USING old_rows o
+        CROSS JOIN LATERAL (VALUES (o.user_id_1, o.user_id_2), (o.user_id_2, o.user_id_1)) AS x(user_id, other_user_id)
+        WHERE e.user_id = x.user_id
+        AND e.other_user_id = x.other_user_id;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        -- The SPs never change a pair's users, but an UPDATE that does must not leave edges behind
+        DELETE FROM activity.friendship_edges e
+        USING old_rows o
+        CROSS JOIN LATERAL (VALUES (o.user_id_1, o.user_id_2), (o.user_id_2, o.user_id_1)) AS x(user_id, other_user_id)
+        WHERE e.user_id = x.user_id
+        AND e.other_user_id = x.other_user_id
+        AND NOT EXISTS (
+            SELECT 1 FROM new_rows n
+            WHERE n.user_id_1 = o.user_id_1 AND n.user_id_2 = o.user_id_2
+        );
+    END IF;
+
+    -- Edges written in key order so concurrent statements lock them in the same order
+    INSERT INTO activity.friendship_edges AS e (
+        user_id, other_user_id, status, is_initiator, created_at, accepted_at
+    )
+    SELECT x.user_id, x.other_user_id, n.status, n.initiated_by = x.user_id, n.created_at, n.accepted_at
+    FROM new_rows n
+    CROSS JOIN LATERAL (VALUES (n.user_id_1, n.user_id_2), (n.user_id_2, n.user_id_1)) AS x(user_id, other_user_id)
+    ORDER BY x.user_id, x.other_user_id
+    ON CONFLICT (user_id, other_user_id) DO UPDATE SET
+        status = EXCLUDED.status,
+        is_initiator = EXCLUDED.is_initiator,
+        created_at = EXCLUDED.created_at,
+        accepted_at = EXCLUDED.accepted_at;
+
+    RETURN NULL;
+END;
+$$;
+
+-- Serialize with friendship writes until the triggers below are live
+LOCK TABLE activity.friendships IN SHARE MODE;
+
+DROP TRIGGER IF EXISTS friendship_edges_on_friendship_insert ON activity.friendships;
+CREATE TRIGGER friendship_edges_on_friendship_insert
+    AFTER INSERT ON activity.friendships
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_friendship_edges_on_friendship();
+
+DROP TRIGGER IF EXISTS friendship_edges_on_friendship_update ON activity.friendships;
+CREATE TRIGGER friendship_edges_on_friendship_update
+    AFTER UPDATE ON activity.friendships
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_friendship_edges_on_friendship();
+
+DROP TRIGGER IF EXISTS friendship_edges_on_friendship_delete ON activity.friendships;
+CREATE TRIGGER friendship_edges_on_friendship_delete
+    AFTER DELETE ON activity.friendships
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION activity.trg_friendship_edges_on_friendship();
+
+-- Backfill (idempotent): rebuild every edge from the friendships it mirrors
+DELETE FROM activity.friendship_edges e
+WHERE NOT EXISTS (
+    SELECT 1 FROM activity.friendships f
+    WHERE f.user_id_1 = LEAST(e.user_id, e.other_user_id)
+    AND f.user_id_2 = GREATEST(e.user_id, e.other_user_id)
+);
+
+INSERT INTO activity.friendship_edges AS e (
+    user_id, other_user_id, status, is_initiator, created_at, accepted_at
+)
+SELECT x.user_id, x.other_user_id, f.status, f.initiated_by = x.user_id, f.created_at, f.accepted_at
+FROM activity.friendships f
+CROSS JOIN LATERAL (VALUES (f.user_id_1, f.user_id_2), (f.user_id_2, f.user_id_1)) AS x(user_id, other_user_id)
+ON CONFLICT (user_id, other_user_id) DO UPDATE SET
+    status = EXCLUDED.status,
+    is_initiator = EXCLUDED.is_initiator,
+    created_at = EXCLUDED.created_at,
+    accepted_at = EXCLUDED.accepted_at
+WHERE (e.status, e.is_initiator, e.created_at, e.accepted_at)
+    IS DISTINCT FROM (EXCLUDED.status, EXCLUDED.is_initiator, EXCLUDED.created_at, EXCLUDED.accepted_at);
+
+ANALYZE activity.friendship_edges;
+
+-- Index-only scans skip the heap only for pages the visibility map marks
+-- all-visible. VACUUM cannot run inside the transaction, so afterwards run:
+--   VACUUM activity.friendship_edges;
+-- Autovacuum keeps the map current from then on.
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.security import get_current_user
+from app.main import app
+from app.models.requests import BatchOperationName
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+from app.services.batch_service import OPERATIONS
+from typing import get_args
+
+ME = "550e8400-e29b-41d4-a716-446655440000"
+ANNA = "660e8400-e29b-41d4-a716-446655440000"
+
+class CountingRepository(InMemoryRepository):
+    def __init__(self):
+        super().__init__()
+        self.rounds = []
+
+    def call_many(self, calls):
+        self.rounds.append([sp_name for sp_name, _ in calls])
+        return super().call_many(calls)
+
+@pytest.fixture
+def repo():
+    repository = CountingRepository()
+    repository.add_user(ME, "me")
+    repository.add_user(ANNA, "anna", "Anna", "Berg")
+    repository.add_friendship(ME, ANNA)
+    set_repository(repository)
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": ME, "email": "me@example.com", "subscription_level": "free", "ghost_mode": False
+    }
+    yield repository
+    app.dependency_overrides.clear()
+    set_repository(None)
+
+def test_operations_match_request_model():
+    assert set(OPERATIONS) == set(get_args(BatchOperationName))
+
+def test_batch_runs_in_one_round_with_per_item_errors(repo):
+    response = TestClient(app).post("/social/batch", json={"operations": [
+        {"op": "friendship_status", "target_user_id": ANNA},
+        {"op": "friends", "limit": 10},
+        {"op": "favorited_by"},
+        {"op": "summary"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["op"] for item in results] == ["friendship_status", "friends", "favorited_by", "summary"]
+    assert results[0]["result"]["status"] == "accepted"
+    assert results[1]["result"]["friends"][0]["user_id"] == ANNA
+    assert results[2]["status"] == 403 and "error" in results[2]
+    assert results[3]["result"]["friend_count"] == 1
+    assert len(repo.rounds) == 1 and len(repo.rounds[0]) == 4
+
+def test_batch_validation(repo):
+    client = TestClient(app)
+    assert client.post("/social/batch", json={"operations": [{"op": "friendship_status"}]}).status_code == 422
+    assert client.post("/social/batch", json={"operations": [{"op": "unknown"}]}).status_code == 422
+    assert client.post("/social/batch", json={"operations": []}).status_code == 422
+
+def test_duplicate_coalesced_operations_complete(repo):
+    status = {"op": "friendship_status", "target_user_id": ANNA}
+    response = TestClient(app).post("/social/batch", json={"operations": [status, {"op": "summary"}, status]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == results[2] and results[0]["result"]["status"] == "accepted"
+    assert len(repo.rounds) == 1 and len(repo.rounds[0]) == 2
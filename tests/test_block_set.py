@@ -0,0 +1,88 @@
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.config import get_settings
+from app.core.security import get_current_user
+from app.main import app
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+from app.utils import response_cache
+from app.utils.block_set import BloomFilter, binary_contains, encode_bloom, sorted_uuid_bytes
+
+ME = "550e8400-e29b-41d4-a716-446655440000"
+ANNA = "660e8400-e29b-41d4-a716-446655440000"
+BOB = "770e8400-e29b-41d4-a716-446655440000"
+CARL = "880e8400-e29b-41d4-a716-446655440000"
+
+@pytest.fixture
+def client():
+    repository = InMemoryRepository()
+    for user_id, username in ((ME, "me"), (ANNA, "anna"), (BOB, "bob"), (CARL, "carl")):
+        repository.add_user(user_id, username)
+    repository.add_block(ME, ANNA)
+    repository.add_block(BOB, ME)
+    set_repository(repository)
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": ME, "email": "me@example.com", "subscription_level": "free", "ghost_mode": False
+    }
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    set_repository(None)
+
+def test_binary_block_set_with_etag(client):
+    response = client.get("/social/blocks/set")
+    assert response.status_code == 200
+    assert response.headers["X-Block-Set-Format"] == "binary"
+    assert response.content == uuid.UUID(ANNA).bytes + uuid.UUID(BOB).bytes
+    assert binary_contains(response.content, BOB) and not binary_contains(response.content, CARL)
+
+    etag = response.headers["ETag"]
+    assert client.get("/social/blocks/set", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/social/blocks", json={"blocked_user_id": CARL})
+    changed = client.get("/social/blocks/set", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.headers["X-Block-Set-Count"] == "3"
+
+def test_unblock_with_mixed_case_id_changes_both_versions(client, monkeypatch):
+    """The cached set of both users is invalidated however the path id is spelled"""
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "true")
+    monkeypatch.setattr(response_cache, "_cache", None)
+    get_settings.cache_clear()
+    caller = {"user_id": ME, "email": "me@example.com", "subscription_level": "free", "ghost_mode": False}
+    app.dependency_overrides[get_current_user] = lambda: caller
+    try:
+        def version_of(user_id):
+            caller["user_id"] = user_id
+            return client.get("/social/blocks/set").headers["X-Block-Set-Version"]
+
+        before = {user_id: version_of(user_id) for user_id in (ME, ANNA)}
+        caller["user_id"] = ME
+        assert client.delete(f"/social/blocks/{ANNA.upper()}").status_code == 200
+        after = {user_id: version_of(user_id) for user_id in (ME, ANNA)}
+        assert after[ME] != before[ME] and after[ANNA] != before[ANNA]
+    finally:
+        monkeypatch.undo()
+        get_settings.cache_clear()
+
+def test_blocked_users_export_ends_with_trailer(client):
+    lines = [json.loads(line) for line in client.get("/social/blocks/export").text.splitlines()]
+    assert len(lines) == 2
+    assert lines[-1] == {"type": "end", "rows": 1}
+
+def test_json_and_bloom_formats(client):
+    body = client.get("/social/blocks/set", params={"format": "json"}).json()
+    assert body["blocked"] == [ANNA] and body["blocked_by"] == [BOB]
+
+    response = client.get("/social/blocks/set", params={"format": "bloom"})
+    bloom = BloomFilter(int(response.headers["X-Bloom-Bits"]), int(response.headers["X-Bloom-Hashes"]), response.content)
+    assert ANNA in bloom and BOB in bloom
+    assert client.get("/social/blocks/set", params={"format": "csv"}).status_code == 422
+
+def test_bloom_false_positive_rate():
+    members = [str(uuid.uuid4()) for _ in range(5000)]
+    bloom = encode_bloom(sorted_uuid_bytes(members), 0.01)
+    assert all(member in bloom for member in members)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(20000))
+    assert false_positives < 20000 * 0.02
@@ -0,0 +1,83 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.deadline import RequestDeadline, current_deadline, parse_deadline, statement_timeout_ms
+from app.core.metrics import metrics
+from app.core.security import get_current_user
+from app.main import app
+from app.middleware.deadline import DeadlineMiddleware
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+
+ME = "550e8400-e29b-41d4-a716-446655440000"
+
+@pytest.fixture
+def memory_client():
+    repository = InMemoryRepository()
+    repository.add_user(ME, "me")
+    set_repository(repository)
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": ME, "email": "me@example.com", "subscription_level": "free", "ghost_mode": False
+    }
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    set_repository(None)
+
+def test_statement_timeout_from_budget_and_deadline():
+    assert statement_timeout_ms(["sp_social_get_friends_list"]) is None
+    assert statement_timeout_ms(["sp_social_search_users"]) == 2000
+
+    token = current_deadline.set(RequestDeadline(time.monotonic() + 0.5))
+    try:
+        assert 0 < statement_timeout_ms(["sp_social_search_users"]) <= 500
+        assert 0 < statement_timeout_ms(["sp_social_get_friends_list"]) <= 500
+    finally:
+        current_deadline.reset(token)
+
+def test_parse_deadline_takes_the_earliest():
+    now = time.monotonic()
+    expires_at = parse_deadline("5000", str((time.time() + 1) * 1000), 0)
+    assert now + 0.9 < expires_at < now + 1.1
+    assert parse_deadline("soon", None, 0) is None
+
+def test_expired_deadlines_answer_504(memory_client):
+    past = str((time.time() - 1) * 1000)
+    assert memory_client.get("/social/friends", headers={"X-Request-Deadline": past}).status_code == 504
+
+    # Still alive on arrival, gone by the time the SP would run
+    response = memory_client.get("/social/friends", headers={"X-Request-Timeout": "0.001"})
+    assert response.status_code == 504
+    assert memory_client.get("/social/friends", headers={"X-Request-Timeout": "5000"}).status_code == 200
+
+def test_client_disconnect_cancels_running_queries():
+    metrics.reset()
+    cancelled = []
+
+    class RunningQuery:
+        def cancel(self):
+            cancelled.append(True)
+
+    async def slow_endpoint(scope, receive, send):
+        deadline = current_deadline.get()
+        deadline.attach(RunningQuery())
+        await receive()
+        while not deadline.cancelled:
+            await asyncio.sleep(0.001)
+
+    async def run():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def receive():
+            await asyncio.sleep(0.01)
+            return messages.pop(0)
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+        await asyncio.wait_for(DeadlineMiddleware(slow_endpoint, watch_after_ms=0)(scope, receive, send), timeout=5)
+
+    asyncio.run(run())
+    assert cancelled == [True]
+    assert metrics.get("requests_client_disconnected") == 1
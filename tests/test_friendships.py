@@ -34,3 +34,20 @@ def test_get_friends_list_auth_required(client):
     assert response.status_code == 403
 
 # Add more tests following same pattern...
+
+def test_mutual_friend_counts_rejects_oversized_batch(client):
+    """Mutual friend counts accepts at most 100 user ids"""
+    user_ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(101)]
+    response = client.post("/social/friends/mutual/counts", json={"user_ids": user_ids})
+    assert response.status_code == 422
+
+def test_bulk_accept_requires_exactly_one_target(client):
+    """Either requester_user_ids or all_pending must be given, not both or neither"""
+    response = client.post("/social/friends/accept/bulk", json={})
+    assert response.status_code == 422
+
+    response = client.post("/social/friends/accept/bulk", json={
+        "requester_user_ids": ["00000000-0000-0000-0000-000000000001"],
+        "all_pending": True
+    })
+    assert response.status_code == 422
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Request, Response
+from app.core import idempotency
+from app.core.idempotency import InMemoryIdempotencyStore, idempotent
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.setattr(idempotency, "_store", InMemoryIdempotencyStore())
+
+def make_request(body: bytes, key: str = "retry-1") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/social/favorites",
+        "headers": [(b"idempotency-key", key.encode())],
+        "query_string": b"",
+    }
+    return Request(scope, receive)
+
+def test_replay_returns_stored_response_without_running_handler():
+    """A retry with the same key and body is answered from the store"""
+    calls = []
+
+    def handler():
+        calls.append(1)
+        return {"favorited_at": "2026-01-01T00:00:00"}
+
+    first = asyncio.run(idempotent(make_request(b'{"a":1}'), Response(), "u1", handler))
+    replay_response = Response()
+    second = asyncio.run(idempotent(make_request(b'{"a":1}'), replay_response, "u1", handler))
+
+    assert first == second
+    assert len(calls) == 1
+    assert replay_response.headers["Idempotent-Replayed"] == "true"
+
+def test_key_reused_for_different_body_is_rejected():
+    asyncio.run(idempotent(make_request(b'{"a":1}'), Response(), "u1", lambda: {"ok": True}))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(idempotent(make_request(b'{"a":2}'), Response(), "u1", lambda: {"ok": True}))
+    assert exc.value.status_code == 422
+
+def test_failed_request_releases_key():
+    """Errors are not stored, so the retry runs again"""
+    def failing():
+        raise HTTPException(status_code=409, detail="Already favorited")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(idempotent(make_request(b"{}"), Response(), "u1", failing))
+    assert asyncio.run(idempotent(make_request(b"{}"), Response(), "u1", lambda: {"ok": True})) == {"ok": True}
+
+def test_keys_are_scoped_per_user():
+    calls = []
+    handler = lambda: calls.append(1) or {"ok": True}
+    asyncio.run(idempotent(make_request(b"{}"), Response(), "u1", handler))
+    asyncio.run(idempotent(make_request(b"{}"), Response(), "u2", handler))
+    assert len(calls) == 2
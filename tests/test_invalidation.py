@@ -0,0 +1,40 @@
+from app.core.invalidation import InvalidationBus, InvalidationEvent, parse_payload
+
+class RecordingCache:
+    def __init__(self):
+        self.events = []
+        self.flushes = 0
+
+    def invalidate(self, event):
+        self.events.append(event)
+
+    def flush(self):
+        self.flushes += 1
+
+class BrokenCache:
+    def invalidate(self, event):
+        raise RuntimeError("boom")
+
+    def flush(self):
+        raise RuntimeError("boom")
+
+def test_parse_payload():
+    """Trigger payloads decode into kind, op and user ids"""
+    assert parse_payload("f:I:a:b") == InvalidationEvent("friendship", "I", ("a", "b"))
+    assert parse_payload("s:U:a") == InvalidationEvent("settings", "U", ("a",))
+    assert parse_payload("x:I:a") is None
+    assert parse_payload("garbage") is None
+
+def test_dispatch_isolates_failing_caches():
+    """A failing cache does not stop the others from being invalidated or flushed"""
+    bus = InvalidationBus()
+    cache = RecordingCache()
+    bus.register(BrokenCache())
+    bus.register(cache)
+
+    event = parse_payload("b:D:a:b")
+    bus.dispatch(event)
+    bus.flush_all()
+
+    assert cache.events == [event]
+    assert cache.flushes == 1
@@ -0,0 +1,51 @@
+import io
+import json
+import pytest
+from app.core import logging_config
+from app.core.logging_config import get_logger, parse_sample_rules, setup_logging
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    setup_logging(
+        "production",
+        sample_rules="request_completed@/social/friends/status=0,request_completed@/social=1",
+        stream=stream
+    )
+    yield stream
+    setup_logging("development")
+
+def read_events(stream):
+    logging_config._stop_writer()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_parse_sample_rules():
+    assert parse_sample_rules("request_completed@/health=0.01, cache_hit=0.5") == {
+        "request_completed": [("/health", 0.01)],
+        "cache_hit": [(None, 0.5)],
+    }
+
+def test_sampling_keeps_errors_and_failed_requests(log_stream):
+    logger = get_logger("test")
+    logger.info("request_completed", path="/social/friends/status/u2", status_code=200)
+    logger.info("request_completed", path="/social/friends/status/u2", status_code=500)
+    logger.warning("request_completed", path="/social/friends/status/u2", status_code=200)
+    logger.info("request_completed", path="/social/blocks", status_code=200)
+
+    events = read_events(log_stream)
+    assert [(e["status_code"], e["level"], e["path"]) for e in events] == [
+        (500, "info", "/social/friends/status/u2"),
+        (200, "warning", "/social/friends/status/u2"),
+        (200, "info", "/social/blocks"),
+    ]
+    assert all("timestamp" in e and e["logger"] == "test" for e in events)
+
+def test_exceptions_are_rendered_by_the_writer(log_stream):
+    logger = get_logger("test")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("request_failed")
+
+    [event] = read_events(log_stream)
+    assert "ValueError: boom" in event["exception"]
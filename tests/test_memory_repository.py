@@ -0,0 +1,101 @@
+import pytest
+from app.main import app
+from app.core.security import get_current_user
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+from app.services.block_service import BlockService
+from app.services.friendship_service import FriendshipService
+from app.services.user_search_service import UserSearchService
+from fastapi.testclient import TestClient
+
+ME = "550e8400-e29b-41d4-a716-446655440000"
+ANNA = "660e8400-e29b-41d4-a716-446655440000"
+BOB = "770e8400-e29b-41d4-a716-446655440000"
+
+@pytest.fixture
+def repo():
+    repository = InMemoryRepository()
+    repository.add_user(ME, "me")
+    repository.add_user(ANNA, "anna", "Anna", "Berg", is_verified=True)
+    repository.add_user(BOB, "bob", "Bob", "Anders")
+    return repository
+
+@pytest.fixture
+def memory_client(repo):
+    set_repository(repo)
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": ME, "email": "me@example.com", "subscription_level": "free", "ghost_mode": False
+    }
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    set_repository(None)
+
+def test_friend_request_lifecycle(repo):
+    service = FriendshipService(repo)
+    service.send_friend_request(ME, ANNA)
+    assert service.get_sent_friend_requests(ME)["requests"][0]["target_user_id"] == ANNA
+    assert FriendshipService(repo).get_pending_friend_requests(ANNA)["total_count"] == 1
+
+    with pytest.raises(Exception, match="FRIENDSHIP_EXISTS"):
+        service.send_friend_request(ANNA, ME)
+
+    service.accept_friend_request(ANNA, ME)
+    friends = service.get_friends_list(ME)
+    assert friends["total_count"] == 1
+    assert friends["friends"][0]["username"] == "anna"
+    assert service.get_friend_ids(ANNA)["user_ids"] == [ME]
+
+def test_block_removes_friendship_and_hides_from_search(repo):
+    repo.add_friendship(ME, BOB)
+    result = BlockService(repo).block_user(ME, BOB)
+    assert result["friendship_removed"] is True
+    assert repo.sp_social_check_friendship_status(ME, BOB) == {"status": "none"}
+    assert [u["username"] for u in UserSearchService(repo).search_users(ME, "an")["users"]] == ["anna"]
+
+def test_bulk_block_outcomes(repo):
+    result = BlockService(repo).bulk_block_users(ME, [ANNA, ANNA, ME, "00000000-0000-0000-0000-000000000001"])
+    assert [item["outcome"] for item in result["results"]] == ["blocked", "duplicate", "self", "user_not_found"]
+
+def test_api_maps_sp_errors(memory_client):
+    response = memory_client.post("/social/friends/request", json={"target_user_id": ME})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot send friend request to yourself"
+
+    response = memory_client.get("/social/favorites/who-favorited-me")
+    assert response.status_code == 403
+
+def test_api_flow_against_memory_backend(memory_client, repo):
+    assert memory_client.post("/social/favorites", json={"favorited_user_id": ANNA}).status_code == 201
+    response = memory_client.get("/social/favorites/mine", params={"fields": "ids"})
+    assert response.json()["user_ids"] == [ANNA]
+
+    response = memory_client.get("/social/users/search", params={"q": "berg"})
+    assert response.status_code == 200
+    assert response.json()["total_count"] == 1
+
+def test_social_summary(memory_client, repo):
+    repo.add_friendship(ME, ANNA)
+    repo.add_friendship(BOB, ME, status="pending", initiated_by=BOB)
+    repo.add_favorite(BOB, ME)
+    response = memory_client.get("/social/summary")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["friend_count"] == 1
+    assert summary["pending_received_count"] == 1
+    assert summary["pending_sent_count"] == 0
+    assert summary["favorites_received_count"] == 1
+
+def test_block_conflicts_hide_third_party_pairs(repo):
+    carl = "880e8400-e29b-41d4-a716-446655440000"
+    repo.add_user(carl, "carl")
+    activity = "990e8400-e29b-41d4-a716-446655440000"
+    repo.add_activity(activity, carl, participants={ME: "registered", ANNA: "registered", BOB: "registered"},
+                      roles={ANNA: "co_organizer"})
+    repo.add_block(ANNA, BOB)
+    repo.add_block(BOB, ME)
+    service = BlockService(repo)
+
+    assert service.get_activity_block_conflicts(carl, activity)["pair_count"] == 2
+    assert service.get_activity_block_conflicts(ANNA, activity)["scope"] == "full"
+    own = service.get_activity_block_conflicts(ME, activity)
+    assert own["scope"] == "own" and own["users"] == sorted([ME, BOB]) and own["pair_count"] == 1
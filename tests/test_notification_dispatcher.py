@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+import pytest
+from app.jobs import notification_dispatcher
+from app.jobs.notification_dispatcher import LogNotificationSink, dedupe_events, get_sink
+
+def event(event_id, recipient, dedup_key):
+    return {"event_id": event_id, "recipient_user_id": recipient, "dedup_key": dedup_key}
+
+def test_dedupe_keeps_latest_per_recipient_and_key():
+    """Repeated events collapse to the latest one, order by event_id is kept"""
+    events = [
+        event(1, "a", "profile_view:x"),
+        event(2, "b", "profile_view:x"),
+        event(3, "a", "friend_request:y"),
+        event(4, "a", "profile_view:x"),
+    ]
+    assert [e["event_id"] for e in dedupe_events(events)] == [2, 3, 4]
+
+def test_get_sink_by_name_and_import_path():
+    assert isinstance(get_sink("log"), LogNotificationSink)
+    assert isinstance(get_sink("app.jobs.notification_dispatcher:LogNotificationSink"), LogNotificationSink)
+
+class FakeConnection:
+    """Claims the given events; savepoints roll back the sink's writes"""
+
+    def __init__(self, events):
+        self.events = events
+        self.pending = []
+        self.committed = []
+
+    @contextmanager
+    def cursor(self):
+        class Cursor:
+            def execute(_, sql, params):
+                pass
+
+            def fetchone(_):
+                return [self.events]
+        yield Cursor()
+
+    @contextmanager
+    def transaction(self):
+        mark = len(self.pending)
+        try:
+            yield
+        except Exception:
+            del self.pending[mark:]
+            raise
+
+    def commit(self):
+        self.committed.extend(self.pending)
+
+    def rollback(self):
+        self.pending.clear()
+
+class RejectingSink:
+    def __init__(self, rejected):
+        self.rejected = rejected
+
+    def deliver(self, conn, events):
+        for event in events:
+            conn.pending.append(event["event_id"])
+            if event["event_id"] in self.rejected:
+                raise RuntimeError("foreign key violation")
+        return len(events)
+
+def run_batch(monkeypatch, conn, sink):
+    @contextmanager
+    def get_db_connection():
+        yield conn
+    monkeypatch.setattr(notification_dispatcher, "get_db_connection", get_db_connection)
+    return notification_dispatcher.dispatch_batch(sink, 10)
+
+def test_one_bad_event_does_not_block_the_batch(monkeypatch):
+    conn = FakeConnection([event(1, "a", "x"), event(2, "b", "x"), event(3, "c", "x")])
+    result = run_batch(monkeypatch, conn, RejectingSink({2}))
+    assert result == {"claimed": 3, "delivered": 2}
+    assert conn.committed == [1, 3]
+
+def test_batch_stays_when_every_event_fails(monkeypatch):
+    conn = FakeConnection([event(1, "a", "x"), event(2, "b", "x")])
+    with pytest.raises(RuntimeError):
+        run_batch(monkeypatch, conn, RejectingSink({1, 2}))
+    assert conn.committed == []
@@ -0,0 +1,47 @@
+import json
+import os
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+from app.core.profiling import current_sp_timings
+from app.middleware.profiling import ProfilingMiddleware
+
+def make_client(output_dir, **options) -> TestClient:
+    app = FastAPI()
+
+    def sp_call():
+        timings = current_sp_timings.get()
+        if timings is not None:
+            timings.append(("sp_social_get_friends", 1.5))
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return await run_in_threadpool(sp_call)
+
+    app.add_middleware(ProfilingMiddleware, output_dir=str(output_dir), **options)
+    return TestClient(app)
+
+def test_admin_token_profiles_request(tmp_path):
+    client = make_client(tmp_path, admin_token="secret")
+
+    assert "X-Profile-File" not in client.get("/ping").headers
+    assert "X-Profile-File" not in client.get("/ping", headers={"X-Profile-Token": "wrong"}).headers
+    assert os.listdir(tmp_path) == []
+
+    response = client.get("/ping", headers={"X-Profile-Token": "secret"})
+    name = response.headers["X-Profile-File"]
+    with open(tmp_path / f"{name}.json") as f:
+        meta = json.load(f)
+    assert meta["status"] == 200
+    assert meta["path"] == "/ping"
+    assert meta["sp_timings"] == [{"sp": "sp_social_get_friends", "ms": 1.5}]
+    assert any(f.startswith(name) and not f.endswith(".json") for f in os.listdir(tmp_path))
+
+def test_sampling_and_retention(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, max_files=2)
+    for _ in range(3):
+        response = client.get("/ping")
+        assert "X-Profile-File" not in response.headers
+
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".json")]) <= 2
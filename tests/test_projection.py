@@ -0,0 +1,35 @@
+import pytest
+from app.utils.projection import is_ids_only, project_list
+
+def friends_result():
+    return {
+        "friends": [{
+            "user_id": "u2",
+            "username": "anna",
+            "first_name": "Anna",
+            "last_name": "B",
+            "main_photo_url": None,
+            "is_verified": True,
+            "friendship_since": "2026-01-01T00:00:00"
+        }],
+        "total_count": 1,
+        "limit": 100,
+        "offset": 0
+    }
+
+def test_project_list_keeps_requested_fields_and_id():
+    result = project_list(friends_result(), "friends", "username, is_verified")
+    assert result["friends"] == [{"user_id": "u2", "username": "anna", "is_verified": True}]
+    assert result["total_count"] == 1
+
+def test_project_list_without_fields_is_unchanged():
+    assert project_list(friends_result(), "friends", None) == friends_result()
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError, match="INVALID_FIELDS"):
+        project_list(friends_result(), "friends", "password_hash")
+
+def test_ids_mode():
+    assert is_ids_only("ids")
+    assert not is_ids_only("user_id")
+    assert not is_ids_only(None)
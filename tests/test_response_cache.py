@@ -0,0 +1,125 @@
+import pytest
+from app.core.invalidation import InvalidationEvent
+from app.core.metrics import metrics
+from app.utils.response_cache import InMemoryResponseStore, RedisResponseStore, ResponseCache
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+def make_cache(max_entries: int = 100) -> ResponseCache:
+    return ResponseCache(InMemoryResponseStore(max_entries), ttl_seconds=60, max_entry_bytes=1024)
+
+def test_hit_after_miss_and_bump_invalidates():
+    cache = make_cache()
+    calls = []
+    compute = lambda: calls.append(1) or {"friends": [], "total_count": len(calls)}
+
+    assert cache.get_or_compute("friends", "u1", ("100", "0"), compute)["total_count"] == 1
+    assert cache.get_or_compute("friends", "u1", ("100", "0"), compute)["total_count"] == 1
+    assert metrics.get("response_cache_hits", route="friends") == 1
+
+    cache.invalidate(InvalidationEvent("friendship", "I", ("u1", "u2")))
+    assert cache.get_or_compute("friends", "u1", ("100", "0"), compute)["total_count"] == 2
+    assert metrics.get("response_cache_misses", route="friends") == 2
+
+def test_bump_matches_reads_whatever_the_id_case():
+    """Write routes pass path ids through as sent; the bump must still reach the reader's entries"""
+    cache = make_cache()
+    user_id = "6f1c3b0e-3c1a-4f7e-9a53-2d4b1e0c9a11"
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_compute("friends", user_id, ("100", "0"), compute) == 1
+    cache.bump(user_id.upper())
+    assert cache.get_or_compute("friends", user_id, ("100", "0"), compute) == 2
+
+def test_result_computed_during_a_write_is_not_served():
+    """The version is taken before the SP runs, so a concurrent bump orphans the entry"""
+    cache = make_cache()
+
+    def compute_while_writing():
+        cache.bump("u1")
+        return {"total_count": 0}
+
+    cache.get_or_compute("friends", "u1", (), compute_while_writing)
+    assert cache.get_or_compute("friends", "u1", (), lambda: {"total_count": 1}) == {"total_count": 1}
+
+def test_entries_are_bounded():
+    cache = make_cache(max_entries=2)
+    for offset in range(3):
+        cache.get_or_compute("friends", "u1", (str(offset),), lambda: {"offset": offset})
+    assert metrics.get("response_cache_evictions") == 1
+
+    cache.get_or_compute("friends", "u1", ("x",), lambda: {"big": "x" * 2048})
+    assert metrics.get("response_cache_oversized", route="friends") == 1
+
+def test_evicted_versions_do_not_resurrect_entries():
+    store = InMemoryResponseStore(max_entries=1)
+    cache = ResponseCache(store, ttl_seconds=60, max_entry_bytes=1024)
+    cache.get_or_compute("friends", "u1", (), lambda: {"v": "old"})
+    cache.bump("u1")
+    cache.bump("u2")  # evicts u1's version
+    assert cache.get_or_compute("friends", "u1", (), lambda: {"v": "new"}) == {"v": "new"}
+
+class ExpiringRedis:
+    """Just enough of redis for RedisResponseStore, with a manual clock for key expiry"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.data = {}
+
+    def _get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.now:
+            self.data.pop(key)
+            return None
+        return value
+
+    def mget(self, *keys):
+        return [self._get(key) for key in keys]
+
+    def incr(self, key):
+        value = int(self._get(key) or 0) + 1
+        self.data[key] = (str(value), self.data.get(key, (None, None))[1])
+        return value
+
+    def set(self, key, value, px=None, nx=False):
+        if nx and self._get(key) is not None:
+            return None
+        self.data[key] = (str(value), self.now + px / 1000 if px else None)
+        return True
+
+    def pexpire(self, key, ms):
+        if self._get(key) is not None:
+            self.data[key] = (self.data[key][0], self.now + ms / 1000)
+
+    def pipeline(self, transaction=False):
+        redis, calls = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+        return Pipeline()
+
+def test_redis_versions_never_repeat_after_expiry(monkeypatch):
+    redis = ExpiringRedis()
+    monkeypatch.setattr("app.core.redis_client.get_sync_redis", lambda: redis)
+    cache = ResponseCache(RedisResponseStore(ttl=60), ttl_seconds=60, max_entry_bytes=1024)
+
+    cache.bump("u1")
+    redis.now = 90
+    cache.get_or_compute("friends", "u1", (), lambda: {"page": "stale"})
+    # The version key would have expired at 120s; saving at 90s extended it past the entry
+    redis.now = 149
+    cache.bump("u1")
+    assert cache.get_or_compute("friends", "u1", (), lambda: {"page": "fresh"}) == {"page": "fresh"}
+
+    # Even once every key has expired, a new version is never an old one
+    redis.now = 1000
+    cache.get_or_compute("friends", "u1", (), lambda: {"page": "cold"})
+    cache.bump("u1")
+    assert cache.get_or_compute("friends", "u1", (), lambda: {"page": "new"}) == {"page": "new"}
@@ -0,0 +1,89 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from app.utils import singleflight
+from app.core.invalidation import InvalidationEvent
+from app.core.metrics import metrics
+from app.utils.singleflight import SingleFlight, coalesced
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+def test_concurrent_calls_share_one_execution():
+    """Callers arriving while the leader is in flight get the leader's result"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    executions = []
+
+    def query():
+        executions.append(1)
+        started.set()
+        release.wait(2)
+        return {"views": 42}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("sp", ("u1",), query)))
+    leader.start()
+    started.wait(2)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("sp", ("u1",), query))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(2)
+
+    assert executions == [1]
+    assert results == [{"views": 42}] * 6
+    assert metrics.get("singleflight_coalesced", sp="sp") == 5
+
+def test_without_ttl_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    calls = []
+    flight.do("sp", ("u1",), lambda: calls.append(1))
+    flight.do("sp", ("u1",), lambda: calls.append(1))
+    assert len(calls) == 2
+
+def test_ttl_reuses_result_until_invalidated():
+    flight = SingleFlight(ttl_seconds=60)
+    calls = []
+    query = lambda: calls.append(1) or len(calls)
+
+    assert flight.do("sp", ("u1", "u2"), query) == 1
+    assert flight.do("sp", ("u1", "u2"), query) == 1
+
+    flight.invalidate(InvalidationEvent("friendship", "U", ("u2", "u3")))
+    assert flight.do("sp", ("u1", "u2"), query) == 2
+
+def test_errors_are_not_cached():
+    flight = SingleFlight(ttl_seconds=60)
+
+    def failing():
+        raise RuntimeError("USER_NOT_FOUND: missing")
+
+    with pytest.raises(RuntimeError):
+        flight.do("sp", ("u1",), failing)
+    assert flight.do("sp", ("u1",), lambda: "ok") == "ok"
+
+def test_coalesced_keys_match_invalidation_ids(monkeypatch):
+    """Path ids in any case are dropped by events carrying canonical lowercase UUIDs"""
+    monkeypatch.setattr(singleflight, "get_settings", lambda: SimpleNamespace(SINGLEFLIGHT_ENABLED=True))
+    monkeypatch.setattr(singleflight, "_singleflight", SingleFlight(ttl_seconds=60))
+    user_id = "6F1C3B0E-3C1A-4F7E-9A53-2D4B1E0C9A11"
+    calls = []
+
+    class Service:
+        @coalesced("sp_social_get_friends_list")
+        def friends(self, user_id, limit=50):
+            calls.append(user_id)
+            return len(calls)
+
+    service = Service()
+    assert service.friends(user_id) == 1
+    assert service.friends(user_id.lower()) == 1
+
+    singleflight.get_singleflight().invalidate(InvalidationEvent("friendship", "U", (user_id.lower(), "u2")))
+    assert service.friends(user_id) == 2
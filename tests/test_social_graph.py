@@ -0,0 +1,123 @@
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.graph.snapshot import FriendshipRecord, SocialGraphSnapshot
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+A, B, C, D, E = sorted(str(uuid.UUID(int=i)) for i in range(1, 6))
+
+def friendship(u, v, status="accepted", initiated_by=None):
+    u, v = min(u, v), max(u, v)
+    accepted_at = NOW + timedelta(hours=1) if status == "accepted" else None
+    return (u, v, status, initiated_by or u, NOW, accepted_at)
+
+@pytest.fixture
+def graph():
+    return SocialGraphSnapshot.build(
+        [
+            friendship(A, B),
+            friendship(A, C, initiated_by=C),
+            friendship(B, C),
+            friendship(C, D),
+            friendship(A, D, status="pending", initiated_by=D),
+        ],
+        [(E, A)]
+    )
+
+def test_friendship_status(graph):
+    """Accepted and pending rows match the SP response shape"""
+    status = graph.friendship_status(C, A)
+    assert status["status"] == "accepted"
+    assert status["initiated_by"] == C
+    assert status["accepted_at"] == NOW + timedelta(hours=1)
+
+    pending = graph.friendship_status(A, D)
+    assert pending == {"status": "pending", "initiated_by": D, "created_at": NOW, "accepted_at": None}
+    assert graph.friendship_status(A, E) == {"status": "none"}
+
+def test_block_checks(graph):
+    """Blocks are directional; can_interact honours the XXL exception"""
+    assert graph.block_status(A, E) == {
+        "user_1_blocked_user_2": False,
+        "user_2_blocked_user_1": True,
+        "any_block_exists": True
+    }
+    assert graph.can_interact(A, E)["can_interact"] is False
+    assert graph.can_interact(A, E, "xxl")["reason"] == "xxl_exception"
+
+def test_degree_and_mutual_counts(graph):
+    """Pending requests do not count as friends"""
+    assert graph.friend_count(A) == 2
+    assert graph.mutual_friend_count(A, B) == 1
+    assert graph.mutual_friend_counts(A, [B, D, A]) == {"counts": {B: 1, D: 1}}
+
+def test_change_feed_and_compaction(graph):
+    """Overlay changes are visible immediately and survive compaction"""
+    graph.set_friendship(A, D, FriendshipRecord("accepted", D, NOW, NOW))
+    graph.set_friendship(A, B, None)
+    graph.set_block(A, C, True)
+    graph.set_block(E, A, False)
+    new_user = str(uuid.UUID(int=99))
+    graph.set_friendship(new_user, A, FriendshipRecord("pending", new_user, NOW, None))
+
+    for snapshot in (graph, graph.compact()):
+        assert snapshot.friend_count(A) == 2
+        assert snapshot.friendship_status(A, B) == {"status": "none"}
+        assert snapshot.block_status(A, C)["user_1_blocked_user_2"] is True
+        assert snapshot.block_status(A, E)["any_block_exists"] is False
+        assert snapshot.friendship_status(A, new_user)["status"] == "pending"
+
+def test_memory_accounting(graph):
+    usage = graph.memory_usage()
+    assert usage["users"] == 5
+    assert usage["friend_edges"] == 8
+    assert usage["total_bytes"] > 0
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="requires TEST_DATABASE_URL")
+def test_snapshot_matches_stored_procedures(monkeypatch):
+    """Snapshot answers agree with the SPs for a sample of user pairs"""
+    from app.config import get_settings
+    from app.graph.manager import SocialGraphManager
+    from app.utils.database import close_pool, get_db_connection
+
+    monkeypatch.setenv("DATABASE_URL", os.environ["TEST_DATABASE_URL"])
+    get_settings.cache_clear()
+    close_pool()
+    manager = SocialGraphManager()
+    manager.load()
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT user_id_1::text, user_id_2::text FROM activity.friendships "
+                "UNION ALL SELECT blocker_user_id::text, blocked_user_id::text FROM activity.user_blocks "
+                "LIMIT 200"
+            )
+            pairs = cursor.fetchall()
+            users = [user for pair in pairs for user in pair]
+            pairs += [tuple(random.sample(users, 2)) for _ in range(min(len(users), 100))]
+            for user_id_1, user_id_2 in pairs:
+                cursor.execute("SELECT activity.sp_social_check_friendship_status(%s, %s)", (user_id_1, user_id_2))
+                expected = cursor.fetchone()[0]
+                actual = manager.friendship_status(user_id_1, user_id_2)
+                assert actual["status"] == expected["status"]
+                if expected["status"] != "none":
+                    assert actual["initiated_by"] == expected["initiated_by"]
+
+                cursor.execute("SELECT activity.sp_social_check_block_status(%s, %s)", (user_id_1, user_id_2))
+                assert manager.block_status(user_id_1, user_id_2) == cursor.fetchone()[0]
+    close_pool()
+    get_settings.cache_clear()
+
+def test_overlay_is_copy_on_write():
+    graph = SocialGraphSnapshot.build([friendship(A, B)], [])
+    graph.set_friendship(A, C, FriendshipRecord("accepted", A, NOW, NOW))
+    before = graph._friend_overlay
+    published = before[graph._ids[A]]
+
+    graph.set_friendship(A, D, FriendshipRecord("accepted", A, NOW, NOW))
+    assert graph._friend_overlay is not before
+    assert graph._ids[D] not in published
+    assert graph.friend_count(A) == 3
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_fresh(code: str) -> subprocess.CompletedProcess:
+    # A new interpreter: earlier tests in this process may already have imported the app or opened the pool
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ),
+        cwd=REPO_ROOT
+    )
+
+def test_import_does_not_open_pool():
+    """Importing the app must not create a connection pool (pre-fork safety)"""
+    result = run_fresh("import app.main; from app.utils import database; print(database._pool is None)")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "True"
+
+def test_import_time_within_budget():
+    """Cold import of app.main stays within the worker startup budget"""
+    code = (
+        "import time; t = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - t)"
+    )
+    result = run_fresh(code)
+    assert result.returncode == 0, result.stderr
+    elapsed = float(result.stdout.strip().splitlines()[-1])
+    assert elapsed < IMPORT_TIME_BUDGET_SECONDS
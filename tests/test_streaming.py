@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+import anyio
+import pytest
+from app.core.deadline import DeadlineExceeded
+from app.utils import streaming
+
+class FakeCursor:
+    def __init__(self, batches, error=None):
+        self.batches = list(batches)
+        self.error = error
+        self.closed = False
+
+    def execute(self, query, params):
+        pass
+
+    def fetchmany(self, size):
+        if self.error is not None:
+            raise self.error
+        return self.batches.pop(0) if self.batches else []
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.released = False
+
+    def cursor(self, name=None):
+        return self._cursor
+
+    def cancel(self):
+        pass
+
+    def rollback(self):
+        pass
+
+def use_connection(monkeypatch, conn):
+    @contextmanager
+    def get_db_connection():
+        try:
+            yield conn
+        finally:
+            conn.released = True
+    monkeypatch.setattr(streaming, "get_db_connection", get_db_connection)
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+def test_complete_stream_ends_with_trailer(monkeypatch):
+    conn = FakeConnection(FakeCursor([[('{"a": 1}',), ('{"a": 2}',)], [('{"a": 3}',)]]))
+    use_connection(monkeypatch, conn)
+
+    async def run():
+        return await collect(await streaming.stream_ndjson("SELECT 1", (), batch_size=2))
+
+    body = anyio.run(run)
+    assert body.decode().splitlines()[-1] == '{"type": "end", "rows": 3}'
+    assert conn.released
+
+def test_setup_errors_raise_before_the_response(monkeypatch):
+    """A failing first fetch (the SP's RAISE) surfaces from stream_ndjson, not mid-body"""
+    conn = FakeConnection(FakeCursor([], error=RuntimeError("USER_NOT_FOUND: missing")))
+    use_connection(monkeypatch, conn)
+    with pytest.raises(RuntimeError):
+        anyio.run(streaming.stream_ndjson, "SELECT 1", ())
+    assert conn.released and conn._cursor.closed
+
+    @contextmanager
+    def no_connection():
+        raise DeadlineExceeded("Request deadline passed waiting for a database connection")
+        yield
+    monkeypatch.setattr(streaming, "get_db_connection", no_connection)
+    with pytest.raises(DeadlineExceeded):
+        anyio.run(streaming.stream_ndjson, "SELECT 1", ())
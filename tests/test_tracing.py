@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.config import settings
+from app.core.tracing import InMemoryExporter, configure_tracing, shutdown_tracing, span
+from app.main import app
+from app.middleware.tracing import TracingMiddleware
+from app.repositories.base import set_repository
+from app.repositories.memory import InMemoryRepository
+
+ME = "550e8400-e29b-41d4-a716-446655440000"
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+@pytest.fixture
+def exporter():
+    repository = InMemoryRepository()
+    repository.add_user(ME, "me")
+    set_repository(repository)
+    exporter = InMemoryExporter()
+    configure_tracing(exporter, sample_rate=0.0)
+    yield exporter
+    shutdown_tracing()
+    set_repository(None)
+
+def get_friends(headers):
+    # No email claim: get_current_user has to look the user up
+    token = jwt.encode({"sub": ME}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    client = TestClient(TracingMiddleware(app))
+    return client.get("/social/friends", headers={"Authorization": f"Bearer {token}", **headers})
+
+def test_incoming_traceparent_is_continued(exporter):
+    response = get_friends({"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+    assert response.status_code == 200
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+    spans = {s["name"]: s for s in exporter.spans}
+    assert {"http.request", "auth.get_current_user", "auth.jwt_decode", "auth.user_lookup",
+            "sp_social_get_friends_list"} <= set(spans)
+    assert all(s["trace_id"] == TRACE_ID for s in spans.values())
+    assert spans["http.request"]["parent_id"] == "00f067aa0ba902b7"
+    assert spans["http.request"]["attributes"]["http.route"] == "/social/friends"
+    assert spans["auth.jwt_decode"]["parent_id"] == spans["auth.get_current_user"]["span_id"]
+    assert spans["sp_social_get_friends_list"]["attributes"]["db.write"] is False
+
+def test_unsampled_requests_record_nothing(exporter):
+    assert "traceparent" not in get_friends({}).headers
+    assert "traceparent" not in get_friends({"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"}).headers
+    assert len(exporter.spans) == 0
+
+    with span("outside_a_trace") as current:
+        assert current is None